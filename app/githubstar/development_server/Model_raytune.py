@@ -1,9 +1,12 @@
+import sys
 import time
 import pickle
 import inspect
+from pathlib import Path
 import numpy as np
 import pandas as pd
 
+from sklearn.base import clone
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 from sklearn.preprocessing import StandardScaler
@@ -19,6 +22,11 @@ from ray import tune
 from ray.tune.schedulers import ASHAScheduler
 from ray.tune import CLIReporter
 
+# the feature spec lives in the repo's src/ package
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from src.features import feature_spec
+from src.models.parallel_train import grow
+
 
 # 1. Load data from CSV and rename
 print("\nStarting Model training...\n")
@@ -28,26 +36,8 @@ df = pd.read_csv("features.csv")
 df = df.rename(columns={"recently_upload": "recently_updated"})
 df["log1p_stars"] = np.log1p(df["stars"])  # log-transform target
 
-# 2. Select and transform features
-original_features = [
-    "issues", "size_kb", "topics", "commits", "commits_per_day",
-    "forks_per_day", "days_since_update", "age_days",
-    "has_homepage", "recently_updated"
-]
-#log-transform
-X = df[original_features].copy()
-X["log1p_issues"] = np.log1p(X["issues"])
-X["log1p_size_kb"] = np.log1p(X["size_kb"])
-X["log1p_commits"] = np.log1p(X["commits"])
-X["log1p_commits_per_day"] = np.log1p(X["commits_per_day"])
-X["log1p_forks_per_day"] = np.log1p(X["forks_per_day"])
-X["log1p_days_since_update"] = np.log1p(X["days_since_update"])
-# Replace with transformed features
-X = X[[
-    "log1p_issues", "log1p_size_kb", "topics",
-    "log1p_commits", "log1p_commits_per_day", "log1p_forks_per_day",
-    "log1p_days_since_update", "age_days", "has_homepage", "recently_updated"
-]]
+# 2. Select and log-transform features (same spec as collect_features)
+X = feature_spec.log_features(df)[feature_spec.CSV_MODEL_FEATURES]
 y = df["log1p_stars"]
 
 # 3. Split data
@@ -76,18 +66,51 @@ baseline_models = {
     ]),
 }
 
+# Boosting rounds (or trees) added between reports, so ASHA can stop a
+# poor trial after a few reports instead of after its full n_estimators
+REPORT_EVERY = 10
+
+
+# Trials are scored on a validation split of the training data; the test
+# set is kept for the final evaluation, so the R² reported there is not the
+# one ASHA and get_best_config selected on
+X_fit, X_val, y_fit, y_val = train_test_split(
+    X_train, y_train, test_size=0.2, random_state=42
+)
+
+# Preprocess once for all trials. tune.with_parameters puts these arrays in
+# the Ray object store a single time and trials read them by reference,
+# instead of each trial refitting the imputer + scaler and getting its own
+# pickled copy of the training data
+tune_preprocessor = clone(preprocessor).fit(X_fit)
+prepared = {
+    "X_fit": tune_preprocessor.transform(X_fit),
+    "y_fit": y_fit.to_numpy(),
+    "X_val": tune_preprocessor.transform(X_val),
+    "y_val": y_val.to_numpy(),
+}
+# the tuned models are refit on the whole training set
+fitted_preprocessor = clone(preprocessor).fit(X_train)
+X_train_prep = fitted_preprocessor.transform(X_train)
+
+
 # 6. Ray Tune wrapper
-def train_model(config, model_cls, model_name):
+def train_model(config, model_cls, model_name, data):
     allowed_keys = inspect.signature(model_cls).parameters.keys()
     filtered_config = {k: v for k, v in config.items() if k in allowed_keys}
-    pipe = Pipeline([
-        ("preprocessor", preprocessor),
-        ("model", model_cls(**filtered_config))
-    ])
-    pipe.fit(X_train, y_train)
-    y_pred = pipe.predict(X_test)
-    r2 = float(r2_score(y_test, y_pred))
-    tune.report({"r2": r2})
+    X_fit_prep, y_fit_, X_val_prep, y_val_ = (
+        data["X_fit"], data["y_fit"], data["X_val"], data["y_val"]
+    )
+
+    total = filtered_config.get("n_estimators")
+    steps = list(range(REPORT_EVERY, total, REPORT_EVERY)) + [total] if total else [None]
+    model = None
+    for rounds in steps:
+        params = dict(filtered_config, n_estimators=rounds) if rounds else filtered_config
+        # continues the previous step's model rather than starting over
+        model = grow(model_cls(), params, X_fit_prep, y_fit_, init=model)
+        r2 = float(r2_score(y_val_, model.predict(X_val_prep)))
+        tune.report({"r2": r2, "n_estimators": rounds or 0})
 
 
 # 7. search space
@@ -118,24 +141,27 @@ search_spaces = {
 tuned_models = {}
 for model_name, setup in search_spaces.items():
     result = tune.run(
-        tune.with_parameters(train_model, model_cls=setup["model_cls"], model_name=model_name),
+        tune.with_parameters(
+            train_model, model_cls=setup["model_cls"], model_name=model_name, data=prepared
+        ),
         config=setup["config"],
         metric="r2",
         mode="max",
         num_samples=20,
-        scheduler=ASHAScheduler(),
+        # one report every REPORT_EVERY rounds: stop the worst two thirds
+        # of the trials at each rung
+        scheduler=ASHAScheduler(grace_period=2, reduction_factor=3),
         progress_reporter=CLIReporter(metric_columns=["r2"]),
         name=f"tune_{model_name.replace(' ', '_')}"
     )
     best_config = result.get_best_config(metric="r2", mode="max")
     allowed_keys = inspect.signature(setup["model_cls"]).parameters.keys()
     filtered_config = {k: v for k, v in best_config.items() if k in allowed_keys}
-    best_pipeline = Pipeline([
-        ("preprocessor", preprocessor),
-        ("model", setup["model_cls"](**filtered_config))
+    best_model = setup["model_cls"](**filtered_config).fit(X_train_prep, y_train)
+    tuned_models[model_name] = Pipeline([
+        ("preprocessor", fitted_preprocessor),
+        ("model", best_model)
     ])
-    best_pipeline.fit(X_train, y_train)
-    tuned_models[model_name] = best_pipeline
 
 
 # 9. Combine all models
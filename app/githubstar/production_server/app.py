@@ -1,64 +1,118 @@
-from flask import Flask, request, render_template
+from flask import Flask, request, render_template, jsonify, redirect, url_for
 import numpy as np
-from workerA import get_predictions
+from celery.exceptions import TimeoutError
+from celery.result import AsyncResult
+from workerA import celery, get_predictions
 
 app = Flask(__name__)
 
+# Longest a result request may block waiting for the worker (long-poll)
+MAX_WAIT_SECONDS = 30
+
 @app.route('/')
 def index():
     # Render the input form
     return render_template('index.html')
 
+def parse_form():
+    features = []
+    names = []
+
+    for i in range(5):
+        # Get repository name from the form
+        name = request.form.get(f'name{i}', f'Repo {i}')
+
+        # Helper to safely parse float values
+        def parse_float(value):
+            try:
+                return float(value)
+            except:
+                return 0.0
+
+        # Extract and parse feature values for each repo
+        row = [
+            parse_float(request.form.get(f"issues{i}")),
+            parse_float(request.form.get(f"size_kb{i}")),
+            parse_float(request.form.get(f"topics{i}")),
+            parse_float(request.form.get(f"commits{i}")),
+            parse_float(request.form.get(f"commits_per_day{i}")),
+            parse_float(request.form.get(f"forks_per_day{i}")),
+            parse_float(request.form.get(f"days_since_update{i}")),
+            parse_float(request.form.get(f"age_days{i}")),
+            parse_float(request.form.get(f"has_homepage{i}")),
+            parse_float(request.form.get(f"recently_updated{i}")),
+        ]
+        features.append(row)
+        names.append(name)
+
+    return np.array(features), names
+
 @app.route('/predict', methods=['POST'])
 def predict():
     try:
-        features = []
-        repos = []
-
-        for i in range(5):
-            # Get repository name from the form
-            name = request.form.get(f'name{i}', f'Repo {i}')
-
-            # Helper to safely parse float values
-            def parse_float(value):
-                try:
-                    return float(value)
-                except:
-                    return 0.0
-
-            # Extract and parse feature values for each repo
-            row = [
-                parse_float(request.form.get(f"issues{i}")),
-                parse_float(request.form.get(f"size_kb{i}")),
-                parse_float(request.form.get(f"topics{i}")),
-                parse_float(request.form.get(f"commits{i}")),
-                parse_float(request.form.get(f"commits_per_day{i}")),
-                parse_float(request.form.get(f"forks_per_day{i}")),
-                parse_float(request.form.get(f"days_since_update{i}")),
-                parse_float(request.form.get(f"age_days{i}")),
-                parse_float(request.form.get(f"has_homepage{i}")),
-                parse_float(request.form.get(f"recently_updated{i}")),
-            ]
-            features.append(row)
-            repos.append({"name": name})
-
-        X = np.array(features)
-
-        # === Call Celery task for predictions ===
-        result = get_predictions(X) 
-
-        # Attach predictions to corresponding repos
-        for i in range(5):
-            repos[i]["predicted_stars"] = int(result[i])
-
-        # Sort repositories by predicted stars in descending order
-        repos_sorted = sorted(repos, key=lambda x: x["predicted_stars"], reverse=True)
-
-        return render_template('result.html', results=repos_sorted)
+        if request.is_json:
+            # API clients: {"features": [[...], ...]} -> 202 + job id
+            X = np.array(request.get_json()["features"], dtype=float)
+            names = None
+        else:
+            X, names = parse_form()
+
+        # === Queue the Celery task; the worker tier does the scoring ===
+        job = get_predictions.delay(X.tolist())
+
+        if names is None:
+            return jsonify(job_id=job.id, result_url=url_for('job_status', job_id=job.id)), 202
+        return redirect(url_for('result', job_id=job.id, name=names))
 
     except Exception as e:
-        # Return error if any exception occurs
-        return f"<h2>Error:</h2><p>{e}</p>"
+        # JSON clients get a JSON error, the form its error page; both a 400
+        if request.is_json:
+            return jsonify(error=str(e)), 400
+        return f"<h2>Error:</h2><p>{e}</p>", 400
+
+def wait_for(job_id, wait):
+    """
+    The job's result once it is ready, blocking up to `wait` seconds.
+    """
+    job = AsyncResult(job_id, app=celery)
+    if wait > 0 and not job.ready():
+        try:
+            job.get(timeout=min(wait, MAX_WAIT_SECONDS), propagate=False)
+        except TimeoutError:
+            pass  # still running; the caller polls again
+    return job
+
+@app.route('/predict/<job_id>')
+def job_status(job_id):
+    # Poll (or long-poll with ?wait=seconds) a queued prediction
+    job = wait_for(job_id, request.args.get('wait', 0, type=float))
+    if not job.ready():
+        return jsonify(job_id=job_id, status=job.status), 202
+    if job.failed():
+        return jsonify(job_id=job_id, status=job.status, error=str(job.result)), 500
+    return jsonify(job_id=job_id, status=job.status, predictions=job.result)
+
+@app.route('/result/<job_id>')
+def result(job_id):
+    job = wait_for(job_id, MAX_WAIT_SECONDS)
+    if not job.ready():
+        # keep the browser polling until the worker is done
+        return render_template('pending.html', job_id=job_id), 202
+    if job.failed():
+        return f"<h2>Error:</h2><p>{job.result}</p>"
+
+    names = request.args.getlist('name')
+    repos = [{"name": name} for name in names]
+
+    # Attach predictions to corresponding repos
+    for repo, predicted in zip(repos, job.result):
+        repo["predicted_stars"] = int(predicted)
+
+    # Sort repositories by predicted stars in descending order
+    repos_sorted = sorted(repos, key=lambda x: x["predicted_stars"], reverse=True)
+
+    return render_template('result.html', results=repos_sorted)
 
 if __name__ == '__main__':
     # Run Flask app
+    app.run(host='0.0.0.0', port=5100, threaded=True)
@@ -0,0 +1,95 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+# How long the first request in a batch waits for others to join it
+BATCH_WAIT_MS = float(os.getenv("BATCH_WAIT_MS", "5"))
+# Upper bound on rows sent to one predict call
+BATCH_MAX_ROWS = int(os.getenv("BATCH_MAX_ROWS", "4096"))
+
+
+class MicroBatcher:
+    """
+    Merges predict requests from concurrent tasks into one model call.
+
+    Task threads call predict(X) and block; a single background thread
+    takes the first waiting request, collects whatever else arrives within
+    max_wait seconds (up to max_rows rows), stacks it into one matrix,
+    calls predict_fn once and hands every caller its own slice back.
+    Needs a worker pool whose tasks run in one process (--pool threads).
+    """
+
+    def __init__(self, predict_fn, max_wait=BATCH_WAIT_MS / 1000, max_rows=BATCH_MAX_ROWS):
+        self.predict_fn = predict_fn
+        self.max_wait = max_wait
+        self.max_rows = max_rows
+        self._queue = queue.Queue()
+        self._thread = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def predict(self, X) -> np.ndarray:
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        if len(X) == 0:
+            return np.empty(0)
+        future = Future()
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+                self._queue.put((X, future))
+        if closed:
+            # replaced while this caller still held it: score alone
+            return np.asarray(self.predict_fn(X))
+        return future.result()
+
+    def close(self):
+        """
+        Stop the background thread once the requests already queued are done.
+        """
+        with self._lock:
+            self._closed = True
+            self._queue.put(None)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        if batch[0] is None:
+            return None
+        rows = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_rows:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if request is None:
+                self._queue.put(None)  # stop after this batch
+                break
+            batch.append(request)
+            rows += len(batch[-1][0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            try:
+                predictions = np.asarray(self.predict_fn(np.vstack([X for X, _ in batch])))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for X, future in batch:
+                future.set_result(predictions[start:start + len(X)])
+                start += len(X)
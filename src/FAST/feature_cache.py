@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+import asyncio
+import os
+import time
+from collections import OrderedDict
+
+# Raw fields kept from the repo detail GET. Only raw fields are cached;
+# time-dependent features (age_days, days_since_update) are recomputed from
+# them on every request.
+DETAIL_FIELDS = (
+    "full_name",
+    "created_at",
+    "updated_at",
+    "size",
+    "homepage",
+    "topics",
+    "stargazers_count",
+    "watchers_count",
+    "forks_count",
+    "open_issues_count",
+)
+# How long each request's fields stay fresh. One GET returns every detail
+# field, slow-moving or not, so each request has a single TTL
+DETAIL_TTL = float(os.getenv("FEATURE_DETAIL_TTL", "900"))
+COMMITS_TTL = float(os.getenv("FEATURE_COMMITS_TTL", "900"))
+# Past its TTL an entry is still served for this long while it is refreshed
+# in the background (stale-while-revalidate); older than that, the request
+# waits for fresh data
+STALE_TTL = float(os.getenv("FEATURE_STALE_TTL", "3600"))
+MAX_ENTRIES = int(os.getenv("FEATURE_CACHE_SIZE", "50000"))
+
+# The two requests behind an entry
+COMMITS = "commits"
+DETAIL = "detail"
+
+
+class RepoFeatureCache:
+    """
+    Raw feature fields per repo (full_name) for the serving path.
+
+    Fields come from two requests: the repo detail GET and the commit
+    count. Each request is redone once its TTL has passed, so a repo whose
+    fields are fresh costs no GitHub calls at all. A stale entry within
+    STALE_TTL is returned at once and refreshed by a background task;
+    concurrent requests for the same repo share one refresh. If a refresh
+    fails the old fields are kept.
+    """
+
+    def __init__(
+        self,
+        fetch_detail,
+        fetch_commits,
+        detail_ttl: float = DETAIL_TTL,
+        commits_ttl: float = COMMITS_TTL,
+        stale_ttl: float = STALE_TTL,
+        max_entries: int = MAX_ENTRIES,
+        clock=time.time,
+    ):
+        self.fetchers = {DETAIL: fetch_detail, COMMITS: fetch_commits}
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.ttls = {DETAIL: detail_ttl, COMMITS: commits_ttl}
+        # full_name -> {"item": {...}, "fetched_at": {source: time}}
+        self._entries = OrderedDict()
+        self._refreshing = {}
+        self._tasks = set()
+
+    async def get(self, full_name: str) -> dict:
+        """
+        The repo's raw fields (REST repo item plus "commits").
+        """
+        entry = self._entries.get(full_name)
+        if entry is None:
+            return await self._refresh(full_name, tuple(self.fetchers))
+        self._entries.move_to_end(full_name)
+
+        now = self.clock()
+        ages = {source: now - entry["fetched_at"].get(source, float("-inf")) for source in self.fetchers}
+        stale = tuple(source for source, age in ages.items() if age > self.ttls[source])
+        if not stale:
+            return entry["item"]
+        if all(ages[source] <= self.ttls[source] + self.stale_ttl for source in stale):
+            self._refresh_in_background(full_name, stale)
+            return entry["item"]
+        return await self._refresh(full_name, stale)
+
+    def _refresh_in_background(self, full_name, sources):
+        if full_name in self._refreshing:
+            return
+        task = asyncio.ensure_future(self._refresh(full_name, sources, quiet=True))
+        # keep a reference so the task is not garbage-collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, full_name, sources, quiet=False):
+        pending = self._refreshing.get(full_name)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch(full_name, sources))
+            self._refreshing[full_name] = pending
+            pending.add_done_callback(lambda _: self._refreshing.pop(full_name, None))
+        try:
+            return await asyncio.shield(pending)
+        except Exception as e:
+            if not quiet:
+                raise
+            print(f"Error: refreshing {full_name}: {e}")
+
+    async def _fetch(self, full_name, sources):
+        results = await asyncio.gather(
+            *(self.fetchers[source](full_name) for source in sources),
+            return_exceptions=True,
+        )
+        entry = self._entries.get(full_name)
+        item = dict(entry["item"]) if entry is not None else {}
+        fetched_at = dict(entry["fetched_at"]) if entry is not None else {}
+        now = self.clock()
+        for source, result in zip(sources, results):
+            if isinstance(result, Exception):
+                if entry is None:
+                    raise result
+                continue  # keep serving what we had
+            if source == COMMITS:
+                item["commits"] = result
+            else:
+                item.update({field: result.get(field) for field in DETAIL_FIELDS})
+            fetched_at[source] = now
+
+        self._entries[full_name] = {"item": item, "fetched_at": fetched_at}
+        self._entries.move_to_end(full_name)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return item
+
+    async def aclose(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
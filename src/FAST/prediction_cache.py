@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+
+try:
+    import redis
+except ImportError:  # the shared tier is optional
+    redis = None
+
+# Feature values are rounded to this many decimals before hashing, so float
+# noise from recomputing the same repo's features still hits the cache
+DECIMALS = int(os.getenv("PREDICTION_CACHE_DECIMALS", "4"))
+MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_SIZE", "100000"))
+# Shared tier, e.g. redis://redis:6379/1; unset keeps the cache in-process
+REDIS_URL = os.getenv("PREDICTION_CACHE_REDIS")
+
+
+def row_keys(X, version: str, decimals: int = DECIMALS) -> list:
+    """
+    One key per row of X: model version plus a hash of the quantized row.
+    """
+    X = np.round(np.asarray(X, dtype=np.float64), decimals) + 0.0  # -0.0 -> 0.0
+    return [
+        f"pred:{version}:{hashlib.sha1(row.tobytes()).hexdigest()}"
+        for row in np.ascontiguousarray(X)
+    ]
+
+
+class PredictionCache:
+    """
+    Model outputs keyed by model version plus a hash of the input row (or
+    any other key, e.g. a repo name), in an in-process LRU backed by an
+    optional Redis tier shared between processes and replicas.
+
+    Values are JSON-serializable. Entries may carry a TTL; keys embed the
+    model version, so a new model never sees an old model's predictions.
+    Redis errors are treated as misses: the cache never fails a request.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, redis_url: str = REDIS_URL, clock=time.time):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._local = OrderedDict()
+        self._lock = Lock()
+        self._redis = None
+        if redis_url and redis is not None:
+            self._redis = redis.Redis.from_url(redis_url)
+
+    @property
+    def shared(self) -> bool:
+        """
+        Whether calls go to Redis (network round trips) or stay in-process.
+        """
+        return self._redis is not None
+
+    def get_many(self, keys: list) -> list:
+        """
+        The cached value for each key, None where it is missing or expired.
+        """
+        now = self.clock()
+        values = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._local.get(key)
+                if entry is not None and (entry[1] is None or entry[1] > now):
+                    self._local.move_to_end(key)
+                    values[i] = entry[0]
+                else:
+                    missing.append(i)
+
+        if missing and self._redis is not None:
+            try:
+                found = self._redis.mget([keys[i] for i in missing])
+            except redis.RedisError:
+                found = []
+            for i, raw in zip(missing, found):
+                if raw is None:
+                    continue
+                value, expires = json.loads(raw)
+                if expires is None or expires > now:
+                    values[i] = value
+                    with self._lock:
+                        self._store(keys[i], value, expires)
+        return values
+
+    def put_many(self, keys: list, values: list, ttl: float = None):
+        expires = self.clock() + ttl if ttl else None
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._store(key, value, expires)
+        if self._redis is not None and keys:
+            try:
+                pipe = self._redis.pipeline()
+                for key, value in zip(keys, values):
+                    pipe.set(key, json.dumps([value, expires]), ex=int(ttl) + 1 if ttl else None)
+                pipe.execute()
+            except redis.RedisError:
+                pass
+
+    def _store(self, key, value, expires):
+        self._local[key] = (value, expires)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    def predict(self, X, predict_fn, version: str) -> np.ndarray:
+        """
+        predict_fn(X) with cached rows filled in from the cache; the misses
+        go to predict_fn in one call and are stored.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        if X.size == 0:
+            return np.empty(0)
+        keys = row_keys(X, version)
+        values = self.get_many(keys)
+        misses = [i for i, value in enumerate(values) if value is None]
+        if misses:
+            predicted = np.asarray(predict_fn(X[misses]), dtype=np.float64)
+            for i, value in zip(misses, predicted.tolist()):
+                values[i] = value
+            self.put_many([keys[i] for i in misses], predicted.tolist())
+        return np.asarray(values, dtype=np.float64)
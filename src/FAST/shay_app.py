@@ -1,116 +1,254 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache, partial
+import os
+from typing import Dict, List
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import JSONResponse
-import joblib
-import requests
 import numpy as np
-import pandas as pd
-from datetime import datetime, timedelta, timezone
-from pathlib import Path
+from pydantic import BaseModel
 import random
 
+from src.FAST.feature_cache import RepoFeatureCache
+from src.FAST.prediction_cache import PredictionCache
+from src.features import feature_spec
+from src.github_api.async_client import AsyncGitHubClient, make_async_client
+from src.models.registry import ModelRegistry, RegistryModel
 
-def fetch_random_repos(n=5):
+TOKEN_PATH = "~/.config/star-predictor/token_shay.txt"
+# The promoted version of MODEL_NAME in the registry (MODEL_REGISTRY), or the
+# pickle at MODEL_PATH when nothing has been promoted yet
+MODEL_NAME = os.environ.get("MODEL_NAME", "stars")
+MODEL_PATH = os.environ.get("MODEL_PATH", "models/artifacts/best_model.pkl")
+
+# Threads for model.predict; bounded so scoring cannot starve the event loop
+PREDICT_WORKERS = int(os.getenv("PREDICT_WORKERS", "2"))
+# How long a repo's cached prediction is served without refetching the repo
+REPO_TTL = float(os.getenv("PREDICTION_REPO_TTL", "600"))
+
+
+async def fetch_random_repos(github: AsyncGitHubClient, n=5):
     # Using a common search query to get trending/popular repos
-    url = "https://api.github.com/search/repositories"
-    params = {
-        "q": "stars:>1000",  # only popular repos
-        "sort": "stars",
-        "order": "desc",
-        "per_page": 100,  # get 100 and sample from it
-        "page": random.randint(1, 10),  # pick a random page for variety
-    }
-    resp = requests.get(url, headers=HEADERS, params=params)
-    items = resp.json().get("items", [])
+    data = await github.search_repositories(
+        "stars:>1000",  # only popular repos
+        page=random.randint(1, 10),  # pick a random page for variety
+        per_page=100,  # get 100 and sample from it
+    )
+    items = data.get("items", [])
     return [item["full_name"] for item in random.sample(items, k=min(n, len(items)))]
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # one connection pool and one predict pool for the life of the process
+    github = make_async_client(TOKEN_PATH)
+    app.state.github = github
+    app.state.predict_pool = ThreadPoolExecutor(max_workers=PREDICT_WORKERS)
+    app.state.prediction_cache = PredictionCache()
+    app.state.feature_cache = RepoFeatureCache(github.get_repo, github.fetch_commit_count)
+    try:
+        yield
+    finally:
+        await app.state.feature_cache.aclose()
+        await app.state.github.aclose()
+        app.state.predict_pool.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+# Loaded on first use so the app can start (and be tested) without it, and
+# swapped for a newly promoted version without a restart
+@lru_cache(maxsize=1)
+def model_source():
+    return RegistryModel(ModelRegistry(), MODEL_NAME, fallback_path=MODEL_PATH)
 
-model = joblib.load("models/artifacts/best_model.pkl")
-TOKEN_PATH = Path("~/.config/star-predictor/token_shay.txt").expanduser()
-GITHUB_TOKEN = TOKEN_PATH.read_text().strip()
-HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
 
-# Feature extraction function
+def get_model():
+    return model_source().get()
 
 
-def fetch_commit_count(full_name: str) -> int:
-    since = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
-    url = f"https://api.github.com/repos/{full_name}/commits"
-    params = {"since": since, "per_page": 100}
-    resp = requests.get(url, headers=HEADERS, params=params)
-    if resp.status_code != 200:
-        return 0
-    return len(resp.json())
+class BatchRequest(BaseModel):
+    # repo names to look up on GitHub
+    repos: List[str] = []
+    # raw repo payloads (REST repo JSON); "commits" is fetched when absent
+    items: List[dict] = []
+    # ready-made feature vectors keyed by feature name
+    features: List[Dict[str, float]] = []
 
 
-def extract_features(item):
+async def fetch_repo(app: FastAPI, full_name: str):
+    """
+    Repo detail plus its commit count from the feature cache (which fetches
+    both at once when they are missing or stale), or the exception that
+    stopped it.
+    """
     try:
-        full_name = item.get("full_name", "")
-        forks = item.get("forks_count", 0)
-        watchers = item.get("watchers_count", 0)
-        created_at = pd.to_datetime(item.get("created_at"))
-        updated_at = pd.to_datetime(item.get("updated_at"))
-        now = pd.Timestamp.now(tz="UTC")
-
-        age_days = (now - created_at).days
-        days_since_update = (now - updated_at).days
-
-        commits = fetch_commit_count(full_name)
-
-        data = {
-            "log1p_forks": np.log1p(forks),
-            "log1p_issues": np.log1p(item.get("open_issues_count", 0)),
-            "log1p_size_kb": np.log1p(item.get("size", 0)),
-            "age_days": age_days,
-            "activity_ratio": days_since_update / (age_days + 1),
-            "issues_per_size": item.get("open_issues_count", 0)
-            / (item.get("size", 0) + 1),
-            "log1p_commits": np.log1p(commits),
-            "log1p_commits_per_day": (
-                np.log1p(commits / age_days) if age_days > 0 else 0
-            ),
-            "log1p_watchers_per_fork": np.log1p(watchers / forks) if forks > 0 else 0,
-            "log1p_days_since_update": np.log1p(days_since_update),
-            "creation_year": created_at.year,
-            "creation_month": created_at.month,
-        }
-        return list(data.values()), data
+        return await app.state.feature_cache.get(full_name)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Feature extraction failed: {e}")
+        return e
+
+
+async def with_commits(github: AsyncGitHubClient, item: dict):
+    """
+    The raw item with its commit count, fetched when absent, or the
+    exception that stopped it (a failed count is not scored as zero).
+    """
+    if item.get("commits") is not None:
+        return item
+    try:
+        commits = await github.fetch_commit_count(item.get("full_name", ""))
+    except Exception as e:
+        return e
+    return dict(item, commits=commits)
+
+
+def to_stars(pred_log) -> list:
+    return [int(round(stars)) for stars in np.expm1(pred_log)]
+
+
+def feature_matrix(items: list, features: list) -> np.ndarray:
+    """
+    One model matrix: raw repo payloads (with "commits") first, then the
+    ready-made feature vectors.
+    """
+    columns = feature_spec.SERVING_FEATURES
+    blocks = [np.empty((0, len(columns)))]
+    if items:
+        blocks.append(feature_spec.build_matrix(items, columns))
+    if features:
+        blocks.append(np.array([[row[col] for col in columns] for row in features], dtype=np.float64))
+    return np.vstack(blocks)
+
+
+def score(cache: PredictionCache, model, items: list, features: list) -> list:
+    X = feature_matrix(items, features)
+    if not len(X):
+        return []
+    # rows scored before come from the cache; the rest share one predict call
+    return to_stars(cache.predict(X, model.predict, model.version))
+
+
+async def load_model(app: FastAPI):
+    """
+    The current model. get() may reload a newly promoted version (unpickling
+    and hashing it), so it runs on the predict pool, off the loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(app.state.predict_pool, get_model)
+
+
+async def score_async(app: FastAPI, model, items: list, features: list = ()) -> list:
+    """
+    Build the matrix and predict on the bounded predict pool, off the loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        app.state.predict_pool, score, app.state.prediction_cache, model, items, list(features)
+    )
+
+
+async def cache_io(app: FastAPI, fn, *args, **kwargs):
+    """
+    A prediction cache call; with a Redis tier it makes network round trips,
+    so it runs on a worker thread instead of blocking the event loop.
+    """
+    if not app.state.prediction_cache.shared:
+        return fn(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(fn, *args, **kwargs))
+
+
+# The model version is part of every key, so a new model starts with a cold cache
+def repo_key(version: str, full_name: str) -> str:
+    return f"repo:{version}:{full_name}"
+
+
+async def predict_repos(app: FastAPI, repos: list, raw_items: list = (), features: list = ()) -> list:
+    """
+    Results for repo names, then raw repo payloads, then feature vectors.
+    Repos predicted within REPO_TTL are answered from the cache without
+    touching GitHub; everything else is fetched concurrently and scored in
+    one predict call.
+    """
+    github = app.state.github
+    cache = app.state.prediction_cache
+    # one model for the whole call, even if a new version is promoted meanwhile
+    model = await load_model(app)
+    hits = await cache_io(app, cache.get_many, [repo_key(model.version, repo) for repo in repos])
+    to_fetch = list(dict.fromkeys(repo for repo, hit in zip(repos, hits) if hit is None))
+    fetched, given = await asyncio.gather(
+        github.gather(lambda repo: fetch_repo(app, repo), to_fetch),
+        github.gather(lambda item: with_commits(github, item), list(raw_items)),
+    )
+    fetched = dict(zip(to_fetch, fetched))
+
+    results = []
+    items = []
+    fresh = {}
+    for repo, hit in zip(repos, hits):
+        if hit is not None:
+            results.append(dict(hit, repo=repo))
+            continue
+        item = fetched[repo]
+        if isinstance(item, Exception):
+            results.append({"repo": repo, "error": str(item)})
+            continue
+        results.append({"repo": repo, "actual_stars": item.get("stargazers_count", -1)})
+        fresh.setdefault(repo, results[-1])
+        items.append(item)
+    for raw, item in zip(raw_items, given):
+        if isinstance(item, Exception):
+            results.append({"repo": raw.get("full_name", ""), "error": str(item)})
+            continue
+        results.append({"repo": item.get("full_name", "")})
+        items.append(item)
+    results.extend({"index": i} for i in range(len(features)))
+
+    pending = [r for r in results if "error" not in r and "predicted_stars" not in r]
+    for result, predicted in zip(pending, await score_async(app, model, items, features)):
+        result["predicted_stars"] = predicted
+
+    await cache_io(
+        app,
+        cache.put_many,
+        [repo_key(model.version, repo) for repo in fresh],
+        [{k: v for k, v in r.items() if k != "repo"} for r in fresh.values()],
+        ttl=REPO_TTL,
+    )
+    return results
 
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Welcome to the StarGazers Predictor API"}
 
 
+@app.post("/predict/batch")
+async def predict_batch(batch: BatchRequest, request: Request):
+    """
+    Score many repos at once: missing metadata and commit counts are fetched
+    concurrently, then every row goes through a single predict call.
+    """
+    columns = set(feature_spec.SERVING_FEATURES)
+    incomplete = [i for i, row in enumerate(batch.features) if not columns <= row.keys()]
+    if incomplete:
+        raise HTTPException(
+            status_code=422,
+            detail=f"features {incomplete} need all of {feature_spec.SERVING_FEATURES}",
+        )
+
+    results = await predict_repos(request.app, batch.repos, batch.items, batch.features)
+    return JSONResponse(content=results)
+
+
 @app.get("/predict_random_repos")
-def predict_random_repos():
-    sample_repos = fetch_random_repos(n=5)
-
-    predictions = []
-
-    for repo in sample_repos:
-        url = f"https://api.github.com/repos/{repo}"
-        try:
-            resp = requests.get(url, headers=HEADERS)
-            resp.raise_for_status()
-            item = resp.json()
-
-            features, detailed = extract_features(item)
-            pred_log = model.predict([features])[0]
-            predicted_stars = int(round(np.expm1(pred_log)))
-
-            actual_stars = item.get("stargazers_count", -1)
-            predictions.append(
-                {
-                    "repo": repo,
-                    "predicted_stars": predicted_stars,
-                    "actual_stars": actual_stars,
-                }
-            )
-        except Exception as e:
-            predictions.append({"repo": repo, "error": str(e)})
-
-    return JSONResponse(content=predictions)
+async def predict_random_repos(request: Request):
+    github = request.app.state.github
+    sample_repos = await fetch_random_repos(github, n=5)
+
+    # repo details and commit counts are fetched concurrently, then scored
+    # in one predict call
+    return JSONResponse(content=await predict_repos(request.app, sample_repos))
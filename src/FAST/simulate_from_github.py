@@ -1,15 +1,10 @@
 import requests
-from datetime import datetime, timedelta, timezone
-from pathlib import Path
 
-# GitHub token path (same as your main pipeline)
-TOKEN_PATH = Path("~/.config/star-predictor/token_shay.txt").expanduser()
-GITHUB_TOKEN = TOKEN_PATH.read_text().strip()
+from src.features import feature_spec
+from src.github_api.client import get_client
 
-HEADERS = {
-    "Accept": "application/vnd.github+json",
-    "Authorization": f"token {GITHUB_TOKEN}",
-}
+# GitHub token path (same as your main pipeline)
+TOKEN_PATH = "~/.config/star-predictor/token_shay.txt"
 
 REPOS = [
     "tiangolo/fastapi",
@@ -24,57 +19,53 @@ REPOS = [
     "keras-team/keras",
 ]
 
-GITHUB_API = "https://api.github.com/repos/"
-FASTAPI_URL = "http://127.0.0.1:8000/predict"
+FASTAPI_URL = "http://127.0.0.1:8000/predict/batch"
 
 
 def get_commit_count(full_name):
-    since = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
-    url = f"{GITHUB_API}{full_name}/commits"
-    response = requests.get(
-        url, headers=HEADERS, params={"since": since, "per_page": 100}
-    )
-    return len(response.json()) if response.ok else 0
+    try:
+        return get_client(TOKEN_PATH).fetch_commit_count(full_name)
+    except requests.RequestException:
+        return 0
 
 
 def extract_features(repo_json):
-    created = datetime.strptime(repo_json["created_at"], "%Y-%m-%dT%H:%M:%SZ").replace(
-        tzinfo=timezone.utc
+    commits = get_commit_count(repo_json["full_name"])
+    frame = feature_spec.compute_features(
+        feature_spec.build_frame([repo_json], commits=[commits])
     )
-    updated = datetime.strptime(repo_json["updated_at"], "%Y-%m-%dT%H:%M:%SZ").replace(
-        tzinfo=timezone.utc
-    )
-    now = datetime.now(timezone.utc)
+    return frame[feature_spec.SERVING_FEATURES].iloc[0].to_dict()
 
-    return {
-        "watchers_count": repo_json["watchers_count"],
-        "forks_count": repo_json["forks_count"],
-        "issues_count": repo_json["open_issues_count"],
-        "size_kb": repo_json["size"],
-        "age_days": (now - created).days,
-        "commits": get_commit_count(repo_json["full_name"]),
-        "days_since_update": (now - updated).days,
-        "creation_year": created.year,
-        "creation_month": created.month,
-    }
 
+def fetch_features(repo):
+    try:
+        return extract_features(get_client(TOKEN_PATH).get_repo(repo))
+    except requests.RequestException:
+        return None
 
-def main():
-    for repo in REPOS:
-        print(f"\n🔍 Fetching: {repo}")
-        r = requests.get(GITHUB_API + repo, headers=HEADERS)
-        if not r.ok:
-            print(f"❌ Failed to get repo data: {repo}")
-            continue
 
-        features = extract_features(r.json())
-        pred = requests.post(FASTAPI_URL, json=features)
+def main():
+    # fetch all repos (and their commit counts) concurrently up front
+    print(f"\n🔍 Fetching: {', '.join(REPOS)}")
+    fetched = get_client(TOKEN_PATH).map(fetch_features, REPOS)
 
-        if pred.ok:
-            print(f"✅ Predicted stars for {repo}: {pred.json()['predicted_stars']}")
+    ready = []
+    for repo, features in zip(REPOS, fetched):
+        if features is None:
+            print(f"❌ Failed to get repo data: {repo}")
         else:
-            print(f"❌ Failed to predict for {repo}: {pred.text}")
+            ready.append((repo, features))
+    if not ready:
+        return
+
+    # one request, one model call for every repo
+    pred = requests.post(FASTAPI_URL, json={"features": [f for _, f in ready]})
 
+    if not pred.ok:
+        print(f"❌ Failed to predict: {pred.text}")
+        return
+    for (repo, _), result in zip(ready, pred.json()):
+        print(f"✅ Predicted stars for {repo}: {result['predicted_stars']}")
 
 if __name__ == "__main__":
     main()
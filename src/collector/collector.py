@@ -1,54 +1,277 @@
 #!/usr/bin/env python3
-import os
-import requests
-import json
+import argparse
+import hashlib
+import math
+import re
+from datetime import date, timedelta
 from pathlib import Path
+from typing import NamedTuple, Optional
 
+from src.collector.manifest import DEFAULT_PATH as MANIFEST_PATH, Manifest
+from src.collector.raw_store import RAW_DIR, SnapshotWriter
+from src.github_api.client import get_client
 
-def get_token() -> str:
+TOKEN_PATH = "~/.config/star-predictor/token_shay.txt"
+
+# The Search API never returns more than 1000 results for one query
+SEARCH_CAP = 1000
+# Size slices below the cap so most of them need no further refinement
+SLICE_TARGET = 900
+# Nothing on GitHub was created before it launched
+FIRST_CREATED = date(2008, 1, 1)
+
+
+def fetch_page(query: str, page: int = 1, per_page: int = 100) -> dict:
     """
-    Reads your GitHub PAT from the path configured in GITHUB_TOKEN_PATH
-    (defaults to ~/.config/star-predictor/token_shay.txt).
+    Fetch one page of search results from GitHub.
     """
-    token_path = Path(
-        os.getenv("GITHUB_TOKEN_PATH", "~/.config/star-predictor/token_shay.txt")
-    ).expanduser()
-    return token_path.read_text().strip()
+    return get_client(TOKEN_PATH).search_repositories(
+        query, page=page, per_page=per_page
+    )
 
 
-HEADERS = {"Authorization": f"token {get_token()}"}
+def part_name(query: str, page: int) -> str:
+    digest = hashlib.sha1(query.encode()).hexdigest()[:12]
+    return f"{digest}-p{page:03}"
 
 
-def fetch_page(query: str, page: int = 1, per_page: int = 100) -> dict:
+def collect_page(
+    query: str,
+    page: int,
+    writer: SnapshotWriter,
+    per_page: int = 100,
+    manifest: Manifest = None,
+    max_age: float = None,
+):
     """
-    Fetch one page of search results from GitHub.
+    Fetch one search page and stream its items straight into the snapshot.
+
+    Returns a small summary (total_count, top star count, part file) rather
+    than the items. Checkpointed: a page already written to this snapshot
+    within max_age seconds is not fetched again, and a failed fetch is
+    recorded in the manifest (and returned as None) so the run carries on.
     """
-    url = "https://api.github.com/search/repositories"
-    params = {
-        "q": query,
-        "sort": "stars",
-        "order": "desc",
-        "per_page": per_page,
-        "page": page,
+    key = f"{writer.snapshot}|{query}|{page}|{per_page}"
+    if manifest is not None:
+        cached = manifest.fresh("page", key, max_age)
+        if cached is not None and writer.has_part(cached["part"]):
+            return cached
+    try:
+        data = fetch_page(query, page=page, per_page=per_page)
+    except Exception as e:
+        print(f"Error: page {page} of '{query}': {e}")
+        if manifest is not None:
+            manifest.failed("page", key, str(e))
+        return None
+
+    items = data.get("items", [])
+    summary = {
+        "total_count": data.get("total_count", 0),
+        "count": len(items),
+        "top_stars": items[0]["stargazers_count"] if items else None,
+        "part": writer.write(items, part_name(query, page)),
     }
-    resp = requests.get(url, headers=HEADERS, params=params)
-    resp.raise_for_status()
-    return resp.json()
-
-
-def main():
-    # TODO: parameterize query via argparse later
-    query = "language:python stars:>50"
-    out_dir = Path("data/raw")
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    # 10 pages × 100 results = 1000 repos
-    for page in range(1, 11):
-        data = fetch_page(query, page=page)
-        filepath = out_dir / f"repos_page_{page:02}.json"
-        with open(filepath, "w") as f:
-            json.dump(data, f, indent=2)
-        print(f"✓ Saved page {page} → {filepath}")
+    if manifest is not None:
+        manifest.done("page", key, summary)
+    return summary
+
+
+class Slice(NamedTuple):
+    """
+    One disjoint piece of a search: a closed star range (open-ended when
+    stars_hi is None), optionally narrowed to a closed creation-date range.
+    """
+
+    stars_lo: int
+    stars_hi: Optional[int] = None
+    created_lo: Optional[date] = None
+    created_hi: Optional[date] = None
+
+    def query(self, base_query: str) -> str:
+        if self.stars_hi is None:
+            parts = [base_query, f"stars:>={self.stars_lo}"]
+        else:
+            parts = [base_query, f"stars:{self.stars_lo}..{self.stars_hi}"]
+        if self.created_lo is not None:
+            parts.append(f"created:{self.created_lo}..{self.created_hi}")
+        return " ".join(p for p in parts if p)
+
+
+def split_stars_qualifier(query: str):
+    """
+    Pull a `stars:>N`, `stars:>=N` or `stars:N..M` qualifier out of a query,
+    returning (query without it, lowest star count, highest or None).
+    """
+    match = re.search(r"\bstars:(>=|>)?(\d+)(?:\.\.(\d+))?", query)
+    if match is None:
+        return query.strip(), 0, None
+    op, lo, hi = match.groups()
+    lo = int(lo) + (1 if op == ">" else 0)
+    hi = int(hi) if hi is not None else None
+    base = (query[: match.start()] + query[match.end():]).strip()
+    return " ".join(base.split()), lo, hi
+
+
+def split_slice(s: Slice, total: int, top_stars: int, split_created: bool):
+    """
+    Break a slice that matched more than SEARCH_CAP repos into pieces
+    expected to hold about SLICE_TARGET each. Star ranges are cut on a
+    log scale (repos thin out as stars grow); once a slice is a single star
+    value it is cut by creation date instead, if allowed. Returns [] when
+    the slice cannot be split any further.
+    """
+    parts = max(2, math.ceil(total / SLICE_TARGET))
+    hi = s.stars_hi if s.stars_hi is not None else max(top_stars, s.stars_lo)
+
+    if s.stars_lo < hi:
+        lo = s.stars_lo
+        parts = min(parts, hi - lo + 1)
+        ratio = (hi + 1) / (lo + 1)
+        edges = sorted(
+            {lo}
+            | {
+                min(hi, max(lo + 1, round((lo + 1) * ratio ** (i / parts)) - 1))
+                for i in range(1, parts)
+            }
+        )
+        pieces = [
+            s._replace(stars_lo=a, stars_hi=b - 1) for a, b in zip(edges, edges[1:])
+        ]
+        # the top piece stays open-ended if the original was
+        pieces.append(s._replace(stars_lo=edges[-1], stars_hi=s.stars_hi))
+        return pieces
+
+    if not split_created:
+        return []
+    start = s.created_lo or FIRST_CREATED
+    end = s.created_hi or date.today()
+    days = (end - start).days + 1
+    if days <= 1:
+        return []
+    parts = min(parts, days)
+    edges = [start + timedelta(days=days * i // parts) for i in range(parts)]
+    ends = [e - timedelta(days=1) for e in edges[1:]] + [end]
+    return [
+        s._replace(stars_hi=hi, created_lo=a, created_hi=b) for a, b in zip(edges, ends)
+    ]
+
+
+def collect_slices(
+    query: str,
+    writer: SnapshotWriter,
+    per_page: int = 100,
+    split_created: bool = False,
+    manifest: Manifest = None,
+    max_age: float = None,
+):
+    """
+    Collect every repo matching `query`, past the 1000-result cap, by
+    searching disjoint star (and optionally creation-date) ranges.
+
+    Each round fetches the first page of every pending slice in parallel;
+    its total_count says whether the slice fits under the cap. Slices that
+    do not are split and go round again, the rest have their remaining
+    pages fetched in parallel. Pages stream into the snapshot as they
+    arrive; a repo that moved between star ranges mid-run is de-duplicated
+    by id when the snapshot is read.
+
+    Returns (items written, number of pages that failed); with a manifest,
+    a rerun only refetches the failed and stale pages.
+    """
+    client = get_client(TOKEN_PATH)
+    base_query, lo, hi = split_stars_qualifier(query)
+    written = 0
+    failures = 0
+    pending = [Slice(lo, hi)]
+
+    def fetch(job):
+        s, page = job
+        return collect_page(s.query(base_query), page, writer, per_page, manifest, max_age)
+
+    while pending:
+        firsts = client.map(fetch, [(s, 1) for s in pending])
+        page_jobs = []
+        next_round = []
+        for s, summary in zip(pending, firsts):
+            if summary is None:
+                failures += 1
+                continue
+            total = summary["total_count"]
+            if total > SEARCH_CAP:
+                top_stars = summary["top_stars"] or s.stars_lo
+                pieces = split_slice(s, total, top_stars, split_created)
+                if pieces:
+                    print(f"  {s.query(base_query)}: {total} hits, split into {len(pieces)}")
+                    next_round.extend(pieces)
+                    continue
+                print(f"  {s.query(base_query)}: {total} hits, keeping the first {SEARCH_CAP}")
+
+            written += summary["count"]
+            last_page = math.ceil(min(total, SEARCH_CAP) / per_page)
+            page_jobs.extend((s, page) for page in range(2, last_page + 1))
+
+        for summary in client.map(fetch, page_jobs):
+            if summary is None:
+                failures += 1
+            else:
+                written += summary["count"]
+        pending = next_round
+
+    return written, failures
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Collect repos from the GitHub Search API")
+    parser.add_argument("--query", default="language:python stars:>50")
+    parser.add_argument("--out-dir", default=RAW_DIR, type=Path)
+    parser.add_argument(
+        "--slices",
+        action="store_true",
+        help="split the query into disjoint star ranges to get past the 1000-result cap",
+    )
+    parser.add_argument(
+        "--split-created",
+        action="store_true",
+        help="with --slices, also split single star values by creation date",
+    )
+    parser.add_argument("--manifest", default=MANIFEST_PATH, type=Path)
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=24.0,
+        help="hours before a page fetched by an earlier run is fetched again",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    writer = SnapshotWriter(args.out_dir)
+    manifest = Manifest(args.manifest)
+    max_age = args.max_age * 3600
+
+    if args.slices:
+        written, failures = collect_slices(
+            args.query,
+            writer,
+            split_created=args.split_created,
+            manifest=manifest,
+            max_age=max_age,
+        )
+    else:
+        # 10 pages × 100 results = 1000 repos, fetched concurrently
+        summaries = get_client(TOKEN_PATH).map(
+            lambda p: collect_page(args.query, p, writer, manifest=manifest, max_age=max_age),
+            range(1, 11),
+        )
+        written = sum(s["count"] for s in summaries if s is not None)
+        failures = sum(s is None for s in summaries)
+
+    print(f"✓ Streamed {written} repos → {writer.dir}")
+    if failures:
+        # leave the snapshot unfinished; a rerun tops up only what failed
+        raise SystemExit(f"{failures} pages failed, rerun to retry them")
+    writer.commit()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+import os
+import time
+from threading import Lock
+
+from src.collector.timestamp_store import DAY, RETENTION_DAYS, TimestampStore
+
+DEFAULT_PATH = "data/commits.sqlite"
+# Set COMMIT_STORE (e.g. to DEFAULT_PATH) to count commits from the local
+# store; unset, each count is one per_page=1 request
+STORE_PATH = os.getenv("COMMIT_STORE", "")
+
+# Re-read this much before the newest stored commit, so commits pushed late
+# with an older committer date are still picked up (duplicates are ignored)
+OVERLAP = DAY
+
+
+class CommitStore(TimestampStore):
+    """
+    Each repo's default-branch commit timestamps (by committer date) for the
+    last RETENTION_DAYS, keyed by sha; see TimestampStore.
+    """
+
+    overlap = OVERLAP
+
+    def __init__(self, path=DEFAULT_PATH, retention_days: int = RETENTION_DAYS, clock=time.time):
+        super().__init__(path, retention_days, clock)
+
+    def fetch(self, client, repo: str, since: str) -> list:
+        return client.fetch_commits(repo, since)
+
+    def key(self, item: dict) -> tuple:
+        return item["sha"], item["commit"]["committer"]["date"]
+
+
+_stores = {}
+_stores_lock = Lock()
+
+
+def get_store(path=DEFAULT_PATH) -> CommitStore:
+    """
+    The process-wide store for `path`, opened on first use.
+    """
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = CommitStore(path)
+        return _stores[path]
+
+
+def commit_count(client, repo: str, days: int = 30, store: CommitStore = None) -> int:
+    """
+    Commits in the last `days` days. A plain total is one request to GitHub
+    (read from the Link header); with a store (passed, or COMMIT_STORE) the
+    repo is synced into it and the window counted locally, which pays off
+    only when several windows are read from the same store.
+    """
+    if store is None and STORE_PATH:
+        store = get_store(STORE_PATH)
+    if store is None:
+        return client.fetch_commit_count(repo, days)
+    store.sync(client, repo)
+    return store.count(repo, days)
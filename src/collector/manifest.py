@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import json
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock
+
+DEFAULT_PATH = "data/manifest.sqlite"
+
+DONE = "done"
+FAILED = "failed"
+
+
+class Manifest:
+    """
+    Checkpoint log of pipeline work units (search pages, repo enrichments).
+
+    Every unit is recorded under (stage, key) with its status, a timestamp
+    and an optional JSON payload. A rerun asks fresh() first and only redoes
+    units that failed, were never attempted, or are older than max_age, so
+    an interrupted refresh resumes where it stopped.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, clock=time.time):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.clock = clock
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS units (
+                stage TEXT NOT NULL,
+                key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                payload TEXT,
+                error TEXT,
+                PRIMARY KEY (stage, key)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def fresh(self, stage: str, key: str, max_age: float = None):
+        """
+        The payload of a unit that is done and at most max_age seconds old
+        (any age when max_age is None), else None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, updated_at, payload FROM units WHERE stage = ? AND key = ?",
+                (stage, key),
+            ).fetchone()
+        if row is None or row[0] != DONE:
+            return None
+        if max_age is not None and self.clock() - row[1] > max_age:
+            return None
+        return json.loads(row[2]) if row[2] is not None else {}
+
+    def done(self, stage: str, key: str, payload=None):
+        self._record(stage, key, DONE, payload=payload)
+
+    def failed(self, stage: str, key: str, error: str = None):
+        self._record(stage, key, FAILED, error=error)
+
+    def _record(self, stage, key, status, payload=None, error=None):
+        data = json.dumps(payload) if payload is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO units VALUES (?, ?, ?, ?, ?, ?)",
+                (stage, key, status, self.clock(), data, error),
+            )
+            self._conn.commit()
+
+    def summary(self, stage: str) -> dict:
+        """
+        Count of units per status for a stage.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM units WHERE stage = ? GROUP BY status",
+                (stage,),
+            ).fetchall()
+        return dict(rows)
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Streaming collection: search pages in, feature rows out, in bounded memory.
+
+stream() runs page producers and enrichment workers on threads joined by
+bounded queues. A producer blocks once `queue_size` repos are waiting, so
+pagination runs only as far ahead of enrichment as the queue allows, and
+workers block the same way when the writer falls behind. BatchWriter
+flushes rows to disk every `batch_size` rows, so nothing holds the whole
+run in memory.
+"""
+import os
+import queue
+import threading
+from pathlib import Path
+
+# Repos waiting between stages (two search pages)
+DEFAULT_QUEUE_SIZE = 200
+
+_DONE = object()
+
+
+class _Failed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """
+    Blocking put that gives up once the pipeline is stopped.
+    """
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def stream(
+    pages,
+    fetch_page,
+    enrich,
+    workers: int = 8,
+    producers: int = 1,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+):
+    """
+    Yield enrich(item) for every item of every fetch_page(page), in
+    completion order. The first exception raised by fetch_page or enrich
+    stops the pipeline and is re-raised here.
+    """
+    todo = queue.Queue()
+    for page in pages:
+        todo.put(page)
+    items = queue.Queue(maxsize=queue_size)
+    results = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    counts = {"producers": producers, "workers": workers}
+    lock = threading.Lock()
+
+    def finished(role: str) -> bool:
+        with lock:
+            counts[role] -= 1
+            return counts[role] == 0
+
+    def produce():
+        try:
+            while not stop.is_set():
+                try:
+                    page = todo.get_nowait()
+                except queue.Empty:
+                    break
+                for item in fetch_page(page):
+                    if not _put(items, item, stop):
+                        return
+        except BaseException as e:
+            _put(results, _Failed(e), stop)
+        finally:
+            if finished("producers"):
+                for _ in range(workers):
+                    _put(items, _DONE, stop)
+
+    def work():
+        try:
+            while not stop.is_set():
+                try:
+                    item = items.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    break
+                if not _put(results, enrich(item), stop):
+                    return
+        except BaseException as e:
+            _put(results, _Failed(e), stop)
+        finally:
+            if finished("workers"):
+                _put(results, _DONE, stop)
+
+    threads = [threading.Thread(target=produce, daemon=True) for _ in range(producers)]
+    threads += [threading.Thread(target=work, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            result = results.get()
+            if result is _DONE:
+                break
+            if isinstance(result, _Failed):
+                raise result.error
+            yield result
+    finally:
+        # also reached when the caller stops iterating early
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+class BatchWriter:
+    """
+    Appends rows to a CSV in batches of `batch_size`; each batch goes
+    through transform(rows) -> DataFrame first. Written to a temporary file
+    that replaces `path` on close(), so an interrupted run never leaves a
+    half-written table behind.
+    """
+
+    def __init__(self, path, batch_size: int, transform):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.transform = transform
+        self.rows = 0
+        self.batches = 0
+        self._pending = []
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        self._tmp.unlink(missing_ok=True)
+
+    def write(self, row: dict):
+        self._pending.append(row)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        frame = self.transform(self._pending)
+        self._pending = []
+        frame.to_csv(self._tmp, mode="a", header=self.batches == 0, index=False)
+        self.rows += len(frame)
+        self.batches += 1
+
+    def close(self):
+        self.flush()
+        if self.batches:
+            os.replace(self._tmp, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self._tmp.unlink(missing_ok=True)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+import json
+import os
+from datetime import date, datetime
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+RAW_DIR = Path("data/raw")
+
+# Written once a snapshot has every page; readers skip unfinished snapshots
+SUCCESS_MARKER = "_SUCCESS"
+
+# The subset of a search item we keep, as typed columns
+RAW_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("full_name", pa.string()),
+        ("description", pa.string()),
+        ("language", pa.string()),
+        ("homepage", pa.string()),
+        ("size", pa.int64()),
+        ("stargazers_count", pa.int64()),
+        ("watchers_count", pa.int64()),
+        ("forks_count", pa.int64()),
+        ("open_issues_count", pa.int64()),
+        ("topics", pa.list_(pa.string())),
+        ("fork", pa.bool_()),
+        ("archived", pa.bool_()),
+        ("created_at", pa.timestamp("s", tz="UTC")),
+        ("updated_at", pa.timestamp("s", tz="UTC")),
+        ("pushed_at", pa.timestamp("s", tz="UTC")),
+    ]
+)
+TIMESTAMP_COLUMNS = ("created_at", "updated_at", "pushed_at")
+
+# What build_feature_row reads
+FEATURE_COLUMNS = [
+    "id",
+    "full_name",
+    "stargazers_count",
+    "forks_count",
+    "open_issues_count",
+    "size",
+    "topics",
+    "created_at",
+    "watchers_count",
+    "homepage",
+    "updated_at",
+    "pushed_at",
+]
+
+
+def _parse_timestamp(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def items_to_table(items: list) -> pa.Table:
+    rows = []
+    for item in items:
+        row = {name: item.get(name) for name in RAW_SCHEMA.names}
+        for name in TIMESTAMP_COLUMNS:
+            row[name] = _parse_timestamp(row[name])
+        rows.append(row)
+    return pa.Table.from_pylist(rows, schema=RAW_SCHEMA)
+
+
+class SnapshotWriter:
+    """
+    Streams search pages into one day's snapshot, a hive-style partition
+    `snapshot_date=YYYY-MM-DD/` of zstd-compressed Parquet part files.
+    Parts are named by the caller, so rewriting a page replaces its part.
+    """
+
+    def __init__(self, raw_dir=RAW_DIR, snapshot: date = None):
+        self.snapshot = snapshot or date.today()
+        self.dir = Path(raw_dir) / f"snapshot_date={self.snapshot.isoformat()}"
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+    def write(self, items: list, name: str) -> str:
+        path = self.dir / f"{name}.parquet"
+        tmp = self.dir / f".{name}.{os.getpid()}.tmp"
+        pq.write_table(items_to_table(items), tmp, compression="zstd")
+        os.replace(tmp, path)
+        return path.name
+
+    def has_part(self, name: str) -> bool:
+        return (self.dir / name).exists()
+
+    def commit(self):
+        (self.dir / SUCCESS_MARKER).touch()
+
+
+def list_snapshots(raw_dir=RAW_DIR, complete_only: bool = True) -> list:
+    """
+    Snapshot dates present under raw_dir, oldest first.
+    """
+    snapshots = []
+    for path in Path(raw_dir).glob("snapshot_date=*"):
+        if complete_only and not (path / SUCCESS_MARKER).exists():
+            continue
+        snapshots.append(date.fromisoformat(path.name.split("=", 1)[1]))
+    return sorted(snapshots)
+
+
+def read_table(raw_dir=RAW_DIR, columns: list = None, snapshot: date = None) -> pa.Table:
+    """
+    One snapshot (the latest complete one by default) as an Arrow table,
+    reading only `columns`. A repo seen on more than one page (it moved
+    between star slices mid-run) is kept once.
+    """
+    if snapshot is None:
+        snapshots = list_snapshots(raw_dir)
+        if not snapshots:
+            raise FileNotFoundError(f"no complete snapshot under {raw_dir}")
+        snapshot = snapshots[-1]
+    path = Path(raw_dir) / f"snapshot_date={snapshot.isoformat()}"
+    if columns is not None and "id" not in columns:
+        columns = ["id"] + list(columns)
+    table = pq.read_table(path, columns=columns, partitioning=None)
+
+    ids = table.column("id").to_pylist()
+    last = {repo_id: i for i, repo_id in enumerate(ids)}
+    if len(last) < len(ids):
+        table = table.take(sorted(last.values()))
+    return table
+
+
+def read_items(raw_dir=RAW_DIR, columns: list = None, snapshot: date = None):
+    """
+    Yield repo dicts from the latest complete snapshot, falling back to the
+    legacy pretty-printed `repos_page_*.json` pages when there is none.
+    """
+    if snapshot is not None or list_snapshots(raw_dir):
+        yield from read_table(raw_dir, columns, snapshot).to_pylist()
+        return
+    for path in sorted(Path(raw_dir).glob("repos_page_*.json")):
+        with open(path) as f:
+            page = json.load(f)
+        yield from page.get("items", [])
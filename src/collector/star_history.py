@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Recent star velocity from stargazer starred_at timestamps.
+
+    python -m src.collector.star_history
+
+For every repo in the latest raw snapshot, StarStore syncs the stars given
+since its last run (only the tail pages of the stargazer listing are read)
+and the stage writes stars per day over the last 7, 30 and 90 days to
+data/features/star_velocity.parquet, keyed by full_name.
+"""
+import argparse
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.collector import raw_store
+from src.collector.timestamp_store import RETENTION_DAYS, TimestampStore
+from src.github_api.client import get_client
+
+TOKEN_PATH = "~/.config/star-predictor/token_shay.txt"
+DEFAULT_PATH = "data/stars.sqlite"
+OUT_PATH = Path("data/features/star_velocity.parquet")
+WINDOWS = (7, 30, 90)
+
+
+class StarStore(TimestampStore):
+    """
+    Each repo's starred_at timestamps for the last RETENTION_DAYS, keyed by
+    stargazer login; see TimestampStore.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, retention_days: int = RETENTION_DAYS, clock=time.time):
+        super().__init__(path, retention_days, clock)
+
+    def fetch(self, client, repo: str, since: str) -> list:
+        return client.fetch_stargazers_since(repo, since)
+
+    def key(self, item: dict) -> tuple:
+        return item["user"]["login"], item["starred_at"]
+
+    def velocity(self, repo: str, now: float = None) -> dict:
+        """
+        Stars per day over each of WINDOWS, e.g. {"star_velocity_7d": 1.5}.
+        """
+        now = self.clock() if now is None else now
+        return {
+            f"star_velocity_{days}d": self.count(repo, days, now) / days for days in WINDOWS
+        }
+
+
+def star_velocity(client, store: StarStore, repos: list) -> pd.DataFrame:
+    """
+    Sync every repo concurrently and return one velocity row per repo. A repo
+    whose recent stars cannot be listed (past GitHub's pagination limit, or
+    the fetch failed) gets NaN velocities.
+    """
+    now = store.clock()
+
+    def row(repo):
+        try:
+            store.sync(client, repo)
+        except Exception as e:
+            print(f"Error: {e}")
+            return {"full_name": repo}
+        return {"full_name": repo, **store.velocity(repo, now)}
+
+    columns = ["full_name"] + [f"star_velocity_{days}d" for days in WINDOWS]
+    return pd.DataFrame(client.map(row, repos)).reindex(columns=columns)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Recent star velocity per repo")
+    parser.add_argument("--raw-dir", default=raw_store.RAW_DIR, type=Path)
+    parser.add_argument("--store", default=DEFAULT_PATH, type=Path)
+    parser.add_argument("--out", default=OUT_PATH, type=Path)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    repos = raw_store.read_table(args.raw_dir, columns=["full_name"]).column("full_name").to_pylist()
+    store = StarStore(args.store)
+    df = star_velocity(get_client(TOKEN_PATH), store, repos)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(args.out, index=False)
+    missing = df["star_velocity_7d"].isna().sum()
+    print(f"✓ Wrote star velocity for {len(df) - missing} repos to {args.out} ({missing} unavailable)")
+
+
+if __name__ == "__main__":
+    main()
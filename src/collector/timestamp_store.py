@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import Lock
+
+DAY = 86400.0
+# How far back events are kept; rolling windows can be up to this long
+RETENTION_DAYS = 90
+
+
+def parse_timestamp(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def iso(timestamp: float) -> str:
+    # whole seconds, so it compares as a string with GitHub's timestamps
+    return datetime.fromtimestamp(int(timestamp), timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class TimestampStore(ABC):
+    """
+    Local copy of each repo's recent event timestamps (commits, stars).
+
+    sync() fetches only the events newer than what the store already has
+    for a repo (the last RETENTION_DAYS on first sight) and drops the ones
+    that have aged out; count() answers rolling windows from the store, so a
+    repo that did not change costs about one request per run however busy
+    it was. Subclasses implement fetch() and key().
+    """
+
+    # re-read this much before the newest stored event (duplicates are ignored)
+    overlap = 0.0
+
+    def __init__(self, path, retention_days: int = RETENTION_DAYS, clock=time.time):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.retention = retention_days * DAY
+        self.clock = clock
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS events (
+                repo TEXT NOT NULL,
+                key TEXT NOT NULL,
+                at REAL NOT NULL,
+                PRIMARY KEY (repo, key)
+            );
+            CREATE TABLE IF NOT EXISTS repos (
+                repo TEXT PRIMARY KEY,
+                synced_at REAL NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    @abstractmethod
+    def fetch(self, client, repo: str, since: str) -> list:
+        """
+        The repo's events at or after `since` (ISO 8601), as API items.
+        """
+
+    @abstractmethod
+    def key(self, item: dict) -> tuple:
+        """
+        (unique key, ISO timestamp) of one fetched item.
+        """
+
+    def since(self, repo: str) -> float:
+        """
+        Where the next sync of `repo` starts, as a Unix timestamp.
+        """
+        floor = self.clock() - self.retention
+        with self._lock:
+            synced = self._conn.execute(
+                "SELECT synced_at FROM repos WHERE repo = ?", (repo,)
+            ).fetchone()
+            newest = self._conn.execute(
+                "SELECT MAX(at) FROM events WHERE repo = ?", (repo,)
+            ).fetchone()[0]
+        if synced is None:
+            return floor
+        return max(floor, (newest if newest is not None else synced[0]) - self.overlap)
+
+    def sync(self, client, repo: str) -> int:
+        """
+        Fetch the events `repo` gained since the last sync; returns how
+        many were new.
+        """
+        now = self.clock()
+        rows = []
+        for item in self.fetch(client, repo, iso(self.since(repo))):
+            key, at = self.key(item)
+            rows.append((repo, key, parse_timestamp(at)))
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany("INSERT OR IGNORE INTO events VALUES (?, ?, ?)", rows)
+            added = self._conn.total_changes - before
+            self._conn.execute(
+                "DELETE FROM events WHERE repo = ? AND at < ?", (repo, now - self.retention)
+            )
+            self._conn.execute("INSERT OR REPLACE INTO repos VALUES (?, ?)", (repo, now))
+            self._conn.commit()
+        return added
+
+    def count(self, repo: str, days: int = 30, now: float = None) -> int:
+        """
+        Stored events of `repo` in the `days` days before now.
+        """
+        if days * DAY > self.retention:
+            raise ValueError(f"only the last {self.retention / DAY:g} days are stored")
+        now = self.clock() if now is None else now
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM events WHERE repo = ? AND at >= ?",
+                (repo, now - days * DAY),
+            ).fetchone()[0]
+
+    def close(self):
+        self._conn.close()
@@ -1,44 +1,35 @@
 #!/usr/bin/env python3
-import os
-import json
-import requests
+import argparse
+from datetime import date
 from pathlib import Path
-from datetime import datetime, timedelta, timezone
-import numpy as np
 import pandas as pd
 
+from src.collector import raw_store
+from src.collector.commit_store import commit_count
+from src.collector.manifest import DEFAULT_PATH as MANIFEST_PATH, Manifest
+from src.features import feature_spec
+from src.features.feature_store import CHANGE_COLUMNS, STORE_DIR, FeatureStore
+from src.github_api import graphql
+from src.github_api.client import get_client
 
-# Load GitHub token for API calls
-def get_token() -> str:
-    path = Path(
-        os.getenv("GITHUB_TOKEN_PATH", "~/.config/star-predictor/token_shay.txt")
-    ).expanduser()
-    return path.read_text().strip()
 
+TOKEN_PATH = "~/.config/star-predictor/token_shay.txt"
 
-HEADERS = {"Authorization": f"token {get_token()}"}
 
-
-# Fetch commit count in last 30 days for a repo
+# Fetch commit count in last 30 days for a repo (see commit_store.commit_count)
 def fetch_commit_count(full_name: str) -> int:
-    since = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
-    url = f"https://api.github.com/repos/{full_name}/commits"
-    params = {"since": since, "per_page": 100}
-    resp = requests.get(url, headers=HEADERS, params=params)
-    resp.raise_for_status()
-    return len(resp.json())
+    return commit_count(get_client(TOKEN_PATH), full_name)
 
 
-# Yield each repo item from the raw JSON pages
+# Yield each repo item from the latest raw snapshot, reading only the
+# columns build_feature_row needs
 def load_raw_pages(raw_dir: Path):
-    for path in sorted(raw_dir.glob("repos_page_*.json")):
-        with open(path) as f:
-            page = json.load(f)
-        yield from page.get("items", [])
+    yield from raw_store.read_items(raw_dir, columns=raw_store.FEATURE_COLUMNS)
 
 
 # Build a feature row including commit velocity and topics count
-def build_feature_row(item: dict) -> dict:
+# (commits is fetched over REST unless the caller already has it)
+def build_feature_row(item: dict, commits: int = None) -> dict:
     full_name = item.get("full_name", "")
     row = {
         "full_name": full_name,
@@ -51,83 +42,151 @@ def build_feature_row(item: dict) -> dict:
         "watchers": item.get("watchers_count", 0),
         "has_homepage": int(bool(item.get("homepage"))),
         "updated_at": item.get("updated_at", None),
+        "pushed_at": item.get("pushed_at", None),
     }
 
-    # One more feaature
-    forks = row["forks"]
-    watchers = row["watchers"]
-    row["watchers_per_fork"] = watchers / forks if forks > 0 else 0
-
     # commit velocity
+    if commits is not None:
+        row["commits"] = commits
+        return row
     try:
         commits = fetch_commit_count(full_name)
         row["commits"] = commits
     except Exception as e:
-        row["commits"] = 0
+        # leave it missing rather than recording a fake zero
+        row["commits"] = None
         print(f"Error: {e}")
     return row
 
 
-def main():
+# Enrich every raw item over REST, concurrently. With a manifest, repos
+# enriched within max_age seconds reuse their recorded commit count and only
+# failed, stale or new repos are fetched again.
+def build_feature_rows(items, manifest: Manifest = None, max_age: float = None) -> list:
+    def enrich(item):
+        full_name = item.get("full_name", "")
+        if manifest is not None:
+            cached = manifest.fresh("repo:rest", full_name, max_age)
+            if cached is not None:
+                return build_feature_row(item, commits=cached["commits"])
+        row = build_feature_row(item)
+        if manifest is not None:
+            if row["commits"] is None:
+                manifest.failed("repo:rest", full_name)
+            else:
+                manifest.done("repo:rest", full_name, {"commits": row["commits"]})
+        return row
+
+    return get_client(TOKEN_PATH).map(enrich, items)
+
+
+# Same rows as build_feature_row, but refreshed through GraphQL: metadata and
+# 30-day commit counts for many repos per request
+def build_feature_rows_graphql(
+    items, manifest: Manifest = None, max_age: float = None
+) -> list:
+    items = {item["full_name"]: item for item in items}
+    cached = {}
+    if manifest is not None:
+        for full_name in items:
+            payload = manifest.fresh("repo:graphql", full_name, max_age)
+            if payload is not None:
+                cached[full_name] = payload["commits"]
+
+    to_fetch = [name for name in items if name not in cached]
+    found = graphql.fetch_repos(get_client(TOKEN_PATH), to_fetch)
+
+    rows = []
+    for full_name, raw_item in items.items():
+        if full_name in cached:
+            rows.append(build_feature_row(raw_item, commits=cached[full_name]))
+        elif full_name in found:
+            item, commits = found[full_name]
+            if manifest is not None:
+                manifest.done("repo:graphql", full_name, {"commits": commits})
+            rows.append(build_feature_row(item, commits=commits))
+        else:
+            print(f"Error: {full_name} not found")
+            if manifest is not None:
+                manifest.failed("repo:graphql", full_name)
+    return rows
+
+
+# Repos whose updated_at / pushed_at match the feature store reuse its row,
+# but only while the snapshot that row came from is at most max_age seconds
+# older than `snapshot`: commits is a rolling 30-day count, so it drifts even
+# when nobody pushes. Returns (reused rows, items still to enrich).
+def split_unchanged(store: FeatureStore, items: list, snapshot: date, max_age: float):
+    stored = store.unchanged(pd.DataFrame(items, columns=["full_name", *CHANGE_COLUMNS]))
+    if not stored.empty:
+        age = pd.Timestamp(snapshot) - pd.to_datetime(stored["snapshot_date"])
+        stored = stored[age <= pd.Timedelta(seconds=max_age)]
+    reused, to_enrich = [], []
+    for item in items:
+        if item["full_name"] in stored.index:
+            reused.append(build_feature_row(item, commits=stored.loc[item["full_name"], "commits"]))
+        else:
+            to_enrich.append(item)
+    return reused, to_enrich
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the feature table from raw pages")
+    parser.add_argument(
+        "--backend",
+        choices=["rest", "graphql"],
+        default="rest",
+        help="rest: one commits call per repo; graphql: batched metadata + commit counts",
+    )
+    parser.add_argument("--manifest", default=MANIFEST_PATH, type=Path)
+    parser.add_argument(
+        "--store",
+        default=STORE_DIR,
+        type=Path,
+        help="append-only feature history, one snapshot per raw snapshot date",
+    )
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=24.0,
+        help="hours before a repo enriched by an earlier run is enriched again",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
     raw_dir = Path("data/raw")
     out_dir = Path("data/features")
     out_dir.mkdir(parents=True, exist_ok=True)
-
-    data = [build_feature_row(item) for item in load_raw_pages(raw_dir)]
-    df = pd.DataFrame(data)
-
-    # parse dates & compute age
-    df["created_at"] = pd.to_datetime(df["created_at"])
-    df["updated_at"] = pd.to_datetime(df["updated_at"])
-    now = pd.Timestamp.now(tz="UTC")
-
-    # project age and time from last update
-    df["age_days"] = (now - df["created_at"]).dt.days
-    df["days_since_update"] = (now - df["updated_at"]).dt.days
-
-    # dropping stuff
-    df = df.drop(columns=["created_at", "updated_at"])
-
-    # derive rates
-    df["commits_per_day"] = df["commits"] / df["age_days"].replace(0, np.nan)
-    df["forks_per_day"] = df["forks"] / df["age_days"].replace(0, np.nan)
-
-    # log-transform skewed counts
-    for col in [
-        "stars",
-        "forks",
-        "issues",
-        "size_kb",
-        "topics",
-        "commits",
-        "commits_per_day",
-        "forks_per_day",
-        "watchers",
-        "watchers_per_fork",
-        "days_since_update",
-    ]:
-        df["log1p_" + col] = np.log1p(df[col].fillna(0))
-
-    # one-hot language (if exists)
-    # assume original build_features added language if needed
-    if "language" in df.columns:
-        df = pd.get_dummies(df, columns=["language"], prefix="lang")
-
-    # final feature set: drop raw columns
-    raw_cols = [
-        "stars",
-        "forks",
-        "issues",
-        "size_kb",
-        "topics",
-        "commits",
-        "commits_per_day",
-        "forks_per_day",
-        "watchers",
-        "watchers_per_fork",
-        "days_since_update",
-    ]
-    df_final = df.drop(columns=raw_cols)
+    manifest = Manifest(args.manifest)
+    max_age = args.max_age * 3600
+    store = FeatureStore(args.store)
+    snapshots = raw_store.list_snapshots(raw_dir)
+    snapshot = snapshots[-1] if snapshots else date.today()
+
+    items = list(load_raw_pages(raw_dir))
+    # only changed repos, and unchanged ones whose stored count is older
+    # than max_age, cost GitHub calls
+    reused, to_enrich = split_unchanged(store, items, snapshot, max_age)
+    print(f"Feature store: reusing {len(reused)} of {len(items)} repos, enriching {len(to_enrich)}")
+    if args.backend == "graphql":
+        data = build_feature_rows_graphql(to_enrich, manifest, max_age)
+    else:
+        # enrich repos concurrently over the shared connection pool
+        data = build_feature_rows(to_enrich, manifest, max_age)
+    print(f"Manifest: {manifest.summary('repo:' + args.backend)}")
+    df = pd.DataFrame(reused + data)
+
+    # repos whose commit count could not be fetched (even after retries)
+    missing = df["commits"].isna()
+    if missing.any():
+        print(f"Dropping {missing.sum()} repos without a commit count")
+        df = df[~missing].reset_index(drop=True)
+
+    # derived and log-transformed features, shared with training and serving
+    features = feature_spec.compute_features(df)
+    df_final = features[feature_spec.FEATURES_TABLE]
 
     # write out
     features_path = out_dir / "features.parquet"
@@ -136,6 +195,13 @@ def main():
         f"✓ Wrote {len(df_final)} rows × {df_final.shape[1]} features to {features_path}"
     )
 
+    # keep the history: only repos whose updated_at / pushed_at moved are appended
+    if store.snapshots() and store.snapshots()[-1] >= snapshot:
+        print(f"Feature store already has snapshot {store.snapshots()[-1]}")
+    else:
+        written = store.append(features, snapshot)
+        print(f"✓ Feature store {snapshot}: {len(written)} of {len(features)} repos changed")
+
 
 if __name__ == "__main__":
     main()
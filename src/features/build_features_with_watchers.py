@@ -1,40 +1,25 @@
 #!/usr/bin/env python3
-import os
-import json
-import requests
 from pathlib import Path
-from datetime import datetime, timedelta, timezone
-import numpy as np
 import pandas as pd
 
+from src.collector import raw_store
+from src.collector.commit_store import commit_count
+from src.features import feature_spec
+from src.github_api.client import get_client
 
-# Load GitHub token for API calls
-def get_token() -> str:
-    path = Path(
-        os.getenv("GITHUB_TOKEN_PATH", "~/.config/star-predictor/token_feruz.txt")
-    ).expanduser()
-    return path.read_text().strip()
 
+TOKEN_PATH = "~/.config/star-predictor/token_feruz.txt"
 
-HEADERS = {"Authorization": f"token {get_token()}"}
 
-
-# Fetch commit count in last 30 days for a repo
+# Fetch commit count in last 30 days for a repo (see commit_store.commit_count)
 def fetch_commit_count(full_name: str) -> int:
-    since = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
-    url = f"https://api.github.com/repos/{full_name}/commits"
-    params = {"since": since, "per_page": 100}
-    resp = requests.get(url, headers=HEADERS, params=params)
-    resp.raise_for_status()
-    return len(resp.json())
+    return commit_count(get_client(TOKEN_PATH), full_name)
 
 
-# Yield each repo item from the raw JSON pages
+# Yield each repo item from the latest raw snapshot, reading only the
+# columns build_feature_row needs
 def load_raw_pages(raw_dir: Path):
-    for path in sorted(raw_dir.glob("repos_page_*.json")):
-        with open(path) as f:
-            page = json.load(f)
-        yield from page.get("items", [])
+    yield from raw_store.read_items(raw_dir, columns=raw_store.FEATURE_COLUMNS)
 
 
 # Build a feature row including commit velocity and topics count
@@ -53,17 +38,13 @@ def build_feature_row(item: dict) -> dict:
         "updated_at": item.get("updated_at", None),
     }
 
-    # One more feaature
-    forks = row["forks"]
-    watchers = row["watchers"]
-    row["watchers_per_fork"] = watchers / forks if forks > 0 else 0
-
     # commit velocity
     try:
         commits = fetch_commit_count(full_name)
         row["commits"] = commits
     except Exception as e:
-        row["commits"] = 0
+        # leave it missing rather than recording a fake zero
+        row["commits"] = None
         print(f"Error: {e}")
     return row
 
@@ -73,73 +54,21 @@ def main():
     out_dir = Path("data/features")
     out_dir.mkdir(parents=True, exist_ok=True)
     print("Looking for files in:", raw_dir.resolve())
-    print("Found files:", list(raw_dir.glob("repos_page_*.json")))
+    print("Snapshots found:", raw_store.list_snapshots(raw_dir))
 
-    data = [build_feature_row(item) for item in load_raw_pages(raw_dir)]
+    # enrich repos concurrently over the shared connection pool
+    data = get_client(TOKEN_PATH).map(build_feature_row, load_raw_pages(raw_dir))
     df = pd.DataFrame(data)
+
+    # repos whose commit count could not be fetched (even after retries)
+    missing = df["commits"].isna()
+    if missing.any():
+        print(f"Dropping {missing.sum()} repos without a commit count")
+        df = df[~missing].reset_index(drop=True)
     print("Columns available:", df.columns.tolist())
 
-    # parse dates & compute age
-    df["created_at"] = pd.to_datetime(df["created_at"])
-    df["updated_at"] = pd.to_datetime(df["updated_at"])
-    now = pd.Timestamp.now(tz="UTC")
-
-    # project age and time from last update
-    df["age_days"] = (now - df["created_at"]).dt.days
-    df["days_since_update"] = (now - df["updated_at"]).dt.days
-
-    # exract more features
-    df["activity_ratio"] = df["days_since_update"] / (df["age_days"] + 1)
-    df["fork_star_ratio"] = df["forks"] / (df["stars"] + 1)
-    df["issues_per_size"] = df["issues"] / (df["size_kb"] + 1)
-    df["avg_growth_rate"] = df["stars"] / (df["age_days"] + 1)
-
-    df["creation_year"] = df["created_at"].dt.year
-    df["creation_month"] = df["created_at"].dt.month
-
-    # dropping stuff
-    df = df.drop(columns=["created_at", "updated_at"])
-
-    # derive rates
-    df["commits_per_day"] = df["commits"] / df["age_days"].replace(0, np.nan)
-    df["forks_per_day"] = df["forks"] / df["age_days"].replace(0, np.nan)
-
-    # log-transform skewed counts
-    for col in [
-        "stars",
-        "forks",
-        "issues",
-        "size_kb",
-        "topics",
-        "commits",
-        "commits_per_day",
-        "forks_per_day",
-        "watchers",
-        "watchers_per_fork",
-        "days_since_update",
-    ]:
-        df["log1p_" + col] = np.log1p(df[col].fillna(0))
-
-    # one-hot language (if exists)
-    # assume original build_features added language if needed
-    if "language" in df.columns:
-        df = pd.get_dummies(df, columns=["language"], prefix="lang")
-
-    # final feature set: drop raw columns
-    raw_cols = [
-        "stars",
-        "forks",
-        "issues",
-        "size_kb",
-        "topics",
-        "commits",
-        "commits_per_day",
-        "forks_per_day",
-        "watchers",
-        "watchers_per_fork",
-        "days_since_update",
-    ]
-    df_final = df.drop(columns=raw_cols)
+    # derived and log-transformed features, shared with training and serving
+    df_final = feature_spec.compute_features(df)[feature_spec.FEATURES2_TABLE]
 
     # write out
     features_path = out_dir / "features2.parquet"
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+The one definition of our feature math, shared by the feature builders,
+the training scripts and the serving path.
+
+Everything works on whole columns: build_frame() turns a batch of raw repo
+dicts (REST search/repo items) or an Arrow table into the base columns,
+compute_features() derives every engineered column with NumPy,
+delta_features() the changes between two snapshots, and model_matrix()
+picks a named feature set out as a float matrix.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Base columns and the raw item field each one comes from
+ITEM_FIELDS = {
+    "stars": "stargazers_count",
+    "forks": "forks_count",
+    "issues": "open_issues_count",
+    "size_kb": "size",
+    "watchers": "watchers_count",
+}
+
+# Counts and rates that get a log1p_ column (missing values count as 0)
+LOG_COLUMNS = [
+    "stars",
+    "forks",
+    "issues",
+    "size_kb",
+    "topics",
+    "commits",
+    "commits_per_day",
+    "forks_per_day",
+    "watchers",
+    "watchers_per_fork",
+    "days_since_update",
+]
+
+# data/features/features.parquet (build_features)
+FEATURES_TABLE = ["full_name", "has_homepage", "age_days"] + [
+    "log1p_" + col for col in LOG_COLUMNS
+]
+
+# data/features/features2.parquet (build_features_with_watchers)
+FEATURES2_TABLE = [
+    "full_name",
+    "has_homepage",
+    "age_days",
+    "activity_ratio",
+    "fork_star_ratio",
+    "issues_per_size",
+    "avg_growth_rate",
+    "creation_year",
+    "creation_month",
+] + ["log1p_" + col for col in LOG_COLUMNS]
+
+# data/features/features.csv (collect_features)
+FEATURES_CSV = [
+    "issues",
+    "size_kb",
+    "topics",
+    "commits",
+    "commits_per_day",
+    "forks_per_day",
+    "age_days",
+    "days_since_update",
+    "recently_updated",
+    "has_homepage",
+    "stars",
+    "watchers",
+    "watchers_per_fork",
+    "activity_ratio",
+    "fork_star_ratio",
+    "issues_per_size",
+    "avg_growth_rate",
+    "creation_year",
+    "creation_month",
+]
+
+# Model inputs: the FastAPI model (trained on features2.parquet)
+SERVING_FEATURES = [
+    "log1p_forks",
+    "log1p_issues",
+    "log1p_size_kb",
+    "age_days",
+    "activity_ratio",
+    "issues_per_size",
+    "log1p_commits",
+    "log1p_commits_per_day",
+    "log1p_watchers_per_fork",
+    "log1p_days_since_update",
+    "creation_year",
+    "creation_month",
+]
+
+# Model inputs: the development-server models (trained on features.csv)
+CSV_MODEL_FEATURES = [
+    "log1p_issues",
+    "log1p_size_kb",
+    "topics",
+    "log1p_commits",
+    "log1p_commits_per_day",
+    "log1p_forks_per_day",
+    "log1p_days_since_update",
+    "age_days",
+    "has_homepage",
+    "recently_updated",
+]
+
+TARGET = "log1p_stars"
+
+# Counts whose change between two snapshots is a feature (feature_store)
+DELTA_COLUMNS = ["stars", "forks", "issues"]
+
+
+def _utc(values) -> pd.DatetimeIndex:
+    return pd.DatetimeIndex(pd.to_datetime(values, utc=True, format="ISO8601"))
+
+
+def build_frame(items, commits=None) -> pd.DataFrame:
+    """
+    Base columns for a batch of repos: full_name, stars, forks, issues,
+    size_kb, topics, watchers, has_homepage, commits, created_at, updated_at.
+
+    items is a list of raw repo dicts or an Arrow table with the same field
+    names; commits (one value per repo) overrides any "commits" they carry.
+    """
+    if isinstance(items, pa.Table):
+        table = items
+        frame = pd.DataFrame(
+            {
+                "full_name": table.column("full_name").to_numpy(zero_copy_only=False),
+                "topics": pc.list_value_length(table.column("topics"))
+                .fill_null(0)
+                .to_numpy(zero_copy_only=False),
+                "has_homepage": pc.invert(
+                    pc.equal(pc.fill_null(table.column("homepage"), ""), "")
+                )
+                .to_numpy(zero_copy_only=False)
+                .astype(np.int64),
+            }
+        )
+        for col, field in ITEM_FIELDS.items():
+            frame[col] = table.column(field).fill_null(0).to_numpy(zero_copy_only=False)
+        if commits is None:
+            commits = (
+                table.column("commits").to_numpy(zero_copy_only=False)
+                if "commits" in table.column_names
+                else np.full(len(table), np.nan)
+            )
+        created = table.column("created_at").to_pandas()
+        updated = table.column("updated_at").to_pandas()
+    else:
+        items = list(items)
+        frame = pd.DataFrame(
+            {
+                "full_name": [item.get("full_name", "") for item in items],
+                "topics": [len(item.get("topics") or []) for item in items],
+                "has_homepage": [int(bool(item.get("homepage"))) for item in items],
+            }
+        )
+        for col, field in ITEM_FIELDS.items():
+            frame[col] = [item.get(field) or 0 for item in items]
+        if commits is None:
+            commits = [item.get("commits") for item in items]
+        created = [item.get("created_at") for item in items]
+        updated = [item.get("updated_at") for item in items]
+
+    frame["commits"] = pd.to_numeric(pd.Series(commits, dtype=object), errors="coerce").to_numpy()
+    frame["created_at"] = _utc(created)
+    frame["updated_at"] = _utc(updated)
+    return frame
+
+
+def compute_features(frame: pd.DataFrame, now=None) -> pd.DataFrame:
+    """
+    Add every derived column to a frame of base columns, as whole-column
+    NumPy operations. Base columns are the ones build_frame produces (the
+    feature builders' rows have the same names).
+    """
+    df = frame.copy()
+    now = pd.Timestamp.now(tz="UTC") if now is None else pd.Timestamp(now)
+    created = _utc(df["created_at"])
+    updated = _utc(df["updated_at"])
+
+    day = np.timedelta64(1, "D")
+    age_days = np.floor((now - created) / day).to_numpy()
+    days_since_update = np.floor((now - updated) / day).to_numpy()
+    df["age_days"] = age_days
+    df["days_since_update"] = days_since_update
+
+    stars = df["stars"].to_numpy(dtype=float)
+    forks = df["forks"].to_numpy(dtype=float)
+    issues = df["issues"].to_numpy(dtype=float)
+    size_kb = df["size_kb"].to_numpy(dtype=float)
+    watchers = df["watchers"].to_numpy(dtype=float)
+    commits = df["commits"].to_numpy(dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # rates are 0 (not inf/NaN) for repos created today or without forks
+        positive_age = age_days > 0
+        df["watchers_per_fork"] = np.where(forks > 0, watchers / forks, 0.0)
+        df["commits_per_day"] = np.where(positive_age, commits / age_days, 0.0)
+        df["forks_per_day"] = np.where(positive_age, forks / age_days, 0.0)
+
+    df["recently_updated"] = (days_since_update <= 7).astype(np.int64)
+    df["activity_ratio"] = days_since_update / (age_days + 1)
+    df["fork_star_ratio"] = forks / (stars + 1)
+    df["issues_per_size"] = issues / (size_kb + 1)
+    df["avg_growth_rate"] = stars / (age_days + 1)
+    df["creation_year"] = created.year.to_numpy()
+    df["creation_month"] = created.month.to_numpy()
+
+    for col in LOG_COLUMNS:
+        df["log1p_" + col] = np.log1p(np.nan_to_num(df[col].to_numpy(dtype=float)))
+    return df
+
+
+def delta_features(frame: pd.DataFrame, previous: pd.DataFrame, days) -> pd.DataFrame:
+    """
+    <col>_delta and <col>_delta_per_day for DELTA_COLUMNS between two
+    snapshots of the same repos: `previous` is row-aligned with frame (NaN
+    for repos seen for the first time) and `days` apart per row.
+    """
+    df = pd.DataFrame(index=frame.index)
+    days = np.asarray(days, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for col in DELTA_COLUMNS:
+            delta = frame[col].to_numpy(dtype=float) - previous[col].to_numpy(dtype=float)
+            df[col + "_delta"] = delta
+            df[col + "_delta_per_day"] = np.where(days > 0, delta / days, np.nan)
+    return df
+
+
+def log_features(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add log1p_ columns to a table that already holds the raw counts and
+    rates (e.g. features.csv), without recomputing anything else.
+    """
+    df = frame.copy()
+    for col in LOG_COLUMNS:
+        if col in df.columns:
+            df["log1p_" + col] = np.log1p(np.nan_to_num(df[col].to_numpy(dtype=float)))
+    return df
+
+
+def model_matrix(frame: pd.DataFrame, columns: list) -> np.ndarray:
+    return frame[columns].to_numpy(dtype=np.float64)
+
+
+def build_matrix(items, columns: list, commits=None, now=None) -> np.ndarray:
+    """
+    Raw repos straight to a model input matrix, one row per repo.
+    """
+    return model_matrix(compute_features(build_frame(items, commits), now), columns)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Append-only history of the feature table, one partition per snapshot date.
+
+    data/features/store/
+        snapshot_date=2025-06-01/part.parquet   repos that changed that day
+        latest.parquet                          newest row of every repo
+
+append() compares a new snapshot with the latest index and writes only the
+repos that are new or whose updated_at / pushed_at moved, together with
+their star, fork and issue deltas since that repo's previous row.
+unchanged() answers the same comparison before any enrichment, so the
+feature builder fetches commit counts only for repos that changed. as_of()
+rebuilds the table for any earlier date from the partitions, and history()
+gives one repo's rows.
+"""
+import os
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from src.features import feature_spec
+
+STORE_DIR = Path("data/features/store")
+INDEX = "latest.parquet"
+# A repo is unchanged while these match its latest row (pushed_at is
+# compared only when both sides have it; older stores lack it)
+CHANGE_COLUMNS = ("updated_at", "pushed_at")
+
+
+def changed(frame: pd.DataFrame, previous: pd.DataFrame) -> pd.Series:
+    """
+    Per row of frame, whether it differs from `previous` (each repo's latest
+    row, aligned with frame; NaN for new repos) in CHANGE_COLUMNS.
+    """
+    result = previous["updated_at"].isna()
+    for column in CHANGE_COLUMNS:
+        if column in frame and column in previous:
+            new = pd.to_datetime(frame[column], utc=True)
+            old = pd.to_datetime(previous[column], utc=True)
+            result |= (new != old) & ~(new.isna() & old.isna())
+    return result
+
+
+class FeatureStore:
+    def __init__(self, root=STORE_DIR):
+        self.root = Path(root)
+
+    def _partition(self, snapshot: date) -> Path:
+        return self.root / f"snapshot_date={snapshot.isoformat()}" / "part.parquet"
+
+    @staticmethod
+    def _write(frame: pd.DataFrame, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        frame.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+
+    def snapshots(self) -> list:
+        """
+        Snapshot dates in the store, oldest first.
+        """
+        return sorted(
+            date.fromisoformat(path.parent.name.split("=", 1)[1])
+            for path in self.root.glob("snapshot_date=*/part.parquet")
+        )
+
+    def latest(self) -> pd.DataFrame:
+        """
+        The newest row of every repo seen so far (empty before the first
+        append).
+        """
+        path = self.root / INDEX
+        return pd.read_parquet(path) if path.exists() else pd.DataFrame()
+
+    def _previous(self, frame: pd.DataFrame, latest: pd.DataFrame) -> pd.DataFrame:
+        if latest.empty:
+            return pd.DataFrame(
+                index=frame.index, columns=["updated_at", "snapshot_date"] + feature_spec.DELTA_COLUMNS
+            )
+        return latest.set_index("full_name").reindex(frame["full_name"]).reset_index(drop=True)
+
+    def unchanged(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        The latest rows of the repos in `frame` (full_name plus
+        CHANGE_COLUMNS) that have not changed since, indexed by full_name.
+        """
+        frame = frame.reset_index(drop=True)
+        latest = self.latest()
+        same = ~changed(frame, self._previous(frame, latest))
+        if latest.empty or not same.any():
+            return pd.DataFrame(index=pd.Index([], name="full_name"))
+        return latest.set_index("full_name").loc[frame.loc[same, "full_name"]]
+
+    def append(self, frame: pd.DataFrame, snapshot: date = None) -> pd.DataFrame:
+        """
+        Add a snapshot of the feature table (one row per full_name, with
+        updated_at and the DELTA_COLUMNS counts); returns the rows written.
+        Snapshots only go forward in time.
+        """
+        snapshot = snapshot or date.today()
+        existing = self.snapshots()
+        if existing and snapshot <= existing[-1]:
+            raise ValueError(f"snapshot {snapshot} is not after the latest one ({existing[-1]})")
+
+        frame = frame.reset_index(drop=True).copy()
+        for column in CHANGE_COLUMNS:
+            if column in frame:
+                frame[column] = pd.to_datetime(frame[column], utc=True)
+        latest = self.latest()
+        previous = self._previous(frame, latest)
+
+        moved = changed(frame, previous)
+        rows = frame[moved]
+        previous = previous[moved]
+        days = (pd.Timestamp(snapshot) - pd.to_datetime(previous["snapshot_date"])).dt.days
+        rows = pd.concat(
+            [rows, feature_spec.delta_features(rows, previous, days)], axis=1
+        ).assign(snapshot_date=snapshot.isoformat())
+
+        self._write(rows, self._partition(snapshot))
+        if not latest.empty:
+            latest = latest[~latest["full_name"].isin(rows["full_name"])]
+        self._write(pd.concat([latest, rows], ignore_index=True), self.root / INDEX)
+        return rows
+
+    def as_of(self, snapshot: date = None) -> pd.DataFrame:
+        """
+        Every repo's newest row at `snapshot` (the latest index by default).
+        """
+        if snapshot is None:
+            return self.latest()
+        parts = [pd.read_parquet(self._partition(s)) for s in self.snapshots() if s <= snapshot]
+        if not parts:
+            return pd.DataFrame()
+        rows = pd.concat(parts, ignore_index=True)
+        return rows.drop_duplicates("full_name", keep="last").reset_index(drop=True)
+
+    def history(self, full_name: str) -> pd.DataFrame:
+        """
+        One repo's rows, oldest first.
+        """
+        parts = [
+            pd.read_parquet(self._partition(s), filters=[("full_name", "==", full_name)])
+            for s in self.snapshots()
+        ]
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
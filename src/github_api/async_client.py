@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+import asyncio
+
+import httpx
+
+from src.github_api.cache import ResponseCache
+from src.github_api.client import (
+    API_URL,
+    CACHE_DIR,
+    CACHE_MAX_MB,
+    DEFAULT_TOKEN_PATH,
+    DEFAULT_WORKERS,
+    commit_total,
+    commits_params,
+    get_tokens,
+    search_params,
+    token_paths,
+)
+from src.github_api.ratelimit import RateLimitScheduler, resource_for
+from src.github_api.token_pool import TokenPool
+
+
+class AsyncGitHubClient:
+    """
+    asyncio counterpart of GitHubClient for the serving path. Requests share
+    one httpx.AsyncClient connection pool, are paced by the same
+    RateLimitScheduler (waiting with asyncio.sleep, so the event loop keeps
+    serving other requests), rotate over the same TokenPool and are retried
+    the same way. gather() fans a coroutine out over many items.
+    """
+
+    def __init__(
+        self,
+        token: str = None,
+        max_connections: int = DEFAULT_WORKERS,
+        base_url: str = API_URL,
+        scheduler: RateLimitScheduler = None,
+        timeout: float = 30.0,
+        cache: ResponseCache = None,
+        tokens: TokenPool = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max(1, max_connections)
+        self.tokens = tokens or TokenPool([token], [scheduler or RateLimitScheduler()])
+        self.scheduler = self.tokens.schedulers[0]
+        self.cache = cache
+
+        self.http = httpx.AsyncClient(
+            headers={"Accept": "application/vnd.github+json"},
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+
+    def url(self, path: str) -> str:
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    async def get(self, path: str, params: dict = None, **kwargs) -> httpx.Response:
+        """
+        GET with caching, rate-limit pacing and retries, as GitHubClient.get.
+        The cache reads and writes files under a lock, so it is used from a
+        worker thread rather than the event loop.
+        """
+        url = self.url(path)
+        if self.cache is None:
+            return await self._send(url, params, **kwargs)
+
+        key = self.cache.key(url, params)
+        entry = await asyncio.to_thread(self.cache.get, key)
+        if entry is not None:
+            headers = dict(kwargs.pop("headers", None) or {})
+            headers.update(self.cache.conditional_headers(entry))
+            kwargs["headers"] = headers
+
+        resp = await self._send(url, params, **kwargs)
+        if resp.status_code == 304 and entry is not None:
+            return cached_response(entry)
+        if resp.status_code == 200 and (
+            "ETag" in resp.headers or "Last-Modified" in resp.headers
+        ):
+            await asyncio.to_thread(self.cache.put, key, resp)
+        return resp
+
+    async def _send(
+        self, url: str, params: dict = None, method: str = "GET", **kwargs
+    ) -> httpx.Response:
+        resource = resource_for(url)
+        headers = kwargs.pop("headers", None) or {}
+        attempt = 0
+        while True:
+            index, delay = self.tokens.reserve(resource)
+            scheduler = self.tokens.schedulers[index]
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                resp = await self.http.request(
+                    method, url, params=params,
+                    headers={**headers, **self.tokens.headers(index)}, **kwargs
+                )
+            except (httpx.ConnectError, httpx.TimeoutException):
+                if attempt >= scheduler.max_retries:
+                    raise
+                await asyncio.sleep(scheduler.backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            scheduler.update(resource, resp.headers)
+            delay = scheduler.retry_delay(resp, attempt)
+            if delay is None:
+                return resp
+            if resp.status_code in (403, 429):
+                # rate limited: hold back every request on this token's budget
+                scheduler.block(resource, delay)
+            else:
+                await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get_json(self, path: str, params: dict = None):
+        resp = await self.get(path, params=params)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def search_repositories(
+        self,
+        query: str,
+        page: int = 1,
+        per_page: int = 100,
+        sort: str = "stars",
+        order: str = "desc",
+    ) -> dict:
+        params = search_params(query, page, per_page, sort, order)
+        return await self.get_json("search/repositories", params=params)
+
+    async def get_repo(self, full_name: str) -> dict:
+        return await self.get_json(f"repos/{full_name}")
+
+    async def fetch_commit_count(self, full_name: str, days: int = 30) -> int:
+        resp = await self.get(
+            f"repos/{full_name}/commits", params=commits_params(days, per_page=1)
+        )
+        if resp.status_code == 409:
+            # GitHub answers 409 for an empty repository
+            return 0
+        resp.raise_for_status()
+        return commit_total(resp)
+
+    async def gather(self, fn, items) -> list:
+        """
+        Await fn(item) for every item concurrently, results in input order.
+        At most max_connections items are in progress at once, so a large
+        batch queues here rather than timing out waiting for a connection.
+        """
+        slots = asyncio.Semaphore(self.max_connections)
+
+        async def run(item):
+            async with slots:
+                return await fn(item)
+
+        return list(await asyncio.gather(*(run(item) for item in items)))
+
+    async def aclose(self):
+        await self.http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+def cached_response(entry: dict) -> httpx.Response:
+    """
+    Rebuild a 200 response from a ResponseCache entry.
+    """
+    headers = dict(entry["headers"], **{"X-From-Cache": "1"})
+    return httpx.Response(
+        200,
+        headers=headers,
+        content=entry["body"].encode("utf-8"),
+        request=httpx.Request("GET", entry["url"]),
+    )
+
+
+def make_async_client(token_path: str = DEFAULT_TOKEN_PATH) -> AsyncGitHubClient:
+    """
+    A new client for the given token file (or the GITHUB_TOKEN_PATHS pool),
+    sharing the on-disk response cache with the sync clients. Create it
+    inside the event loop that uses it (e.g. in an app's lifespan) and
+    aclose() it there.
+    """
+    tokens = TokenPool(get_tokens(token_paths(token_path)))
+    cache = None
+    if CACHE_DIR:
+        cache = ResponseCache(CACHE_DIR, max_bytes=CACHE_MAX_MB * 1024 * 1024)
+    return AsyncGitHubClient(
+        max_connections=DEFAULT_WORKERS * len(tokens), cache=cache, tokens=tokens
+    )
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# response headers worth keeping alongside a cached body
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Link")
+
+
+class ResponseCache:
+    """
+    Persistent cache of GitHub GET responses, keyed by URL and params.
+
+    Each entry stores the body plus its ETag/Last-Modified so the next
+    request can be sent conditionally; GitHub answers an unchanged resource
+    with 304 Not Modified, which does not count against the rate limit, and
+    the body is served from disk. Entries are evicted least-recently-used
+    first once the cache grows past max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes: int = 512 * 1024 * 1024):
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+
+        # key -> size on disk, oldest access first
+        self._index = OrderedDict()
+        self._total = 0
+        entries = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in entries:
+            size = path.stat().st_size
+            self._index[path.stem] = size
+            self._total += size
+
+    @staticmethod
+    def key(url: str, params: dict = None) -> str:
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f"{url}?{query}".encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str):
+        """
+        The cached entry for key (marking it recently used), or None.
+        """
+        with self._lock:
+            if key not in self._index:
+                return None
+            path = self._path(key)
+            try:
+                entry = json.loads(path.read_text())
+            except (OSError, ValueError):
+                self._drop(key)
+                return None
+            self._index.move_to_end(key)
+            os.utime(path)
+            return entry
+
+    def put(self, key: str, resp):
+        """
+        Store a requests or httpx response.
+        """
+        headers = {h: resp.headers[h] for h in KEPT_HEADERS if h in resp.headers}
+        entry = {"url": str(resp.url), "headers": headers, "body": resp.text}
+        data = json.dumps(entry)
+
+        with self._lock:
+            path = self._path(key)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(data)
+            os.replace(tmp, path)
+
+            self._total -= self._index.pop(key, 0)
+            self._index[key] = len(data.encode())
+            self._total += self._index[key]
+            while self._total > self.max_bytes and len(self._index) > 1:
+                self._drop(next(iter(self._index)))
+
+    def _drop(self, key: str):
+        self._total -= self._index.pop(key, 0)
+        self._path(key).unlink(missing_ok=True)
+
+    @staticmethod
+    def conditional_headers(entry: dict) -> dict:
+        headers = {}
+        if "ETag" in entry["headers"]:
+            headers["If-None-Match"] = entry["headers"]["ETag"]
+        if "Last-Modified" in entry["headers"]:
+            headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+        return headers
+
+    @staticmethod
+    def to_response(entry: dict) -> requests.Response:
+        """
+        Rebuild a 200 response from a cached entry.
+        """
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.url = entry["url"]
+        resp.encoding = "utf-8"
+        resp._content = entry["body"].encode("utf-8")
+        resp.headers = CaseInsensitiveDict(entry["headers"])
+        resp.headers["X-From-Cache"] = "1"
+        return resp
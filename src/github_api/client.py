@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from threading import Lock
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.github_api.cache import ResponseCache
+from src.github_api.ratelimit import RateLimitScheduler, resource_for
+from src.github_api.token_pool import TokenPool
+
+API_URL = "https://api.github.com"
+DEFAULT_TOKEN_PATH = "~/.config/star-predictor/token_shay.txt"
+
+# How many requests may be in flight at once per token (thread pool +
+# connection pool)
+DEFAULT_WORKERS = int(os.getenv("GITHUB_MAX_WORKERS", "8"))
+
+# On-disk response cache; set GITHUB_CACHE_DIR to "" to disable it
+CACHE_DIR = os.getenv("GITHUB_CACHE_DIR", "data/cache/http")
+CACHE_MAX_MB = int(os.getenv("GITHUB_CACHE_MAX_MB", "512"))
+
+# Stargazer listings with starred_at timestamps, oldest star first
+STAR_MEDIA_TYPE = "application/vnd.github.star+json"
+# GitHub refuses stargazer pages past this one (40,000 stars at 100 a page)
+STARGAZER_PAGE_LIMIT = 400
+
+
+def get_token(default_path: str = DEFAULT_TOKEN_PATH) -> str:
+    """
+    Reads your GitHub PAT from the path configured in GITHUB_TOKEN_PATH
+    (defaults to default_path).
+    """
+    token_path = Path(os.getenv("GITHUB_TOKEN_PATH", default_path)).expanduser()
+    return token_path.read_text().strip()
+
+
+def token_paths(default_path: str = DEFAULT_TOKEN_PATH) -> list:
+    """
+    Token files for a client: GITHUB_TOKEN_PATHS (os.pathsep-separated)
+    pools several credentials, otherwise the single GITHUB_TOKEN_PATH /
+    default_path file.
+    """
+    pooled = os.getenv("GITHUB_TOKEN_PATHS")
+    if pooled:
+        return [Path(p).expanduser() for p in pooled.split(os.pathsep) if p]
+    return [Path(os.getenv("GITHUB_TOKEN_PATH", default_path)).expanduser()]
+
+
+def get_tokens(paths: list) -> list:
+    """
+    Every non-empty line of every token file, without duplicates.
+    """
+    tokens = []
+    for path in paths:
+        for line in Path(path).read_text().splitlines():
+            if line.strip() and line.strip() not in tokens:
+                tokens.append(line.strip())
+    return tokens
+
+
+def search_params(query: str, page: int, per_page: int, sort: str, order: str) -> dict:
+    return {
+        "q": query,
+        "sort": sort,
+        "order": order,
+        "per_page": per_page,
+        "page": page,
+    }
+
+
+def commits_params(days: int, per_page: int = 100) -> dict:
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    # whole hours keep the URL stable enough to be revalidated from cache
+    since = since.replace(minute=0, second=0, microsecond=0).isoformat()
+    return {"since": since, "per_page": per_page}
+
+
+def last_page(resp) -> int:
+    """
+    The page number of a paginated response's Link rel="last" URL, or 1
+    when there is only one page. Works for requests and httpx responses.
+    """
+    last = resp.links.get("last")
+    if not last:
+        return 1
+    return int(parse_qs(urlparse(last["url"]).query)["page"][0])
+
+
+def commit_total(resp) -> int:
+    """
+    Commit count from a per_page=1 commits response: with one commit per
+    page, the last page number is the total.
+    """
+    if "last" in resp.links:
+        return last_page(resp)
+    return len(resp.json())
+
+
+class GitHubClient:
+    """
+    Shared GitHub REST client used by the collector, the feature builders
+    and the API. All requests go through one pooled requests.Session so
+    connections are reused, and map() fans work out over a thread pool
+    sized to the same pool. Every request is paced by a RateLimitScheduler
+    and retried (with bounded backoff) on rate limits and transient errors.
+    With a TokenPool, each request is sent with the token that has the most
+    rate-limit headroom, and a rate-limited retry moves to another token
+    instead of waiting out the reset. With a ResponseCache, GETs are
+    revalidated with If-None-Match / If-Modified-Since and 304s are
+    answered from disk.
+    """
+
+    def __init__(
+        self,
+        token: str = None,
+        max_workers: int = DEFAULT_WORKERS,
+        base_url: str = API_URL,
+        scheduler: RateLimitScheduler = None,
+        timeout: float = 30.0,
+        cache: ResponseCache = None,
+        tokens: TokenPool = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max(1, max_workers)
+        self.tokens = tokens or TokenPool([token], [scheduler or RateLimitScheduler()])
+        # the first token's scheduler; also holds the retry settings
+        self.scheduler = self.tokens.schedulers[0]
+        self.timeout = timeout
+        self.cache = cache
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Accept"] = "application/vnd.github+json"
+
+    def url(self, path: str) -> str:
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def get(self, path: str, params: dict = None, cached: bool = True, **kwargs) -> requests.Response:
+        """
+        GET with caching, rate-limit pacing and retries. The final response
+        is returned as-is; callers decide whether a non-2xx status is an error.
+        cached=False bypasses the cache, for responses whose headers (Link)
+        can change while the body does not.
+        """
+        url = self.url(path)
+        if self.cache is None or not cached:
+            return self._send(url, params, **kwargs)
+
+        key = self.cache.key(url, params)
+        entry = self.cache.get(key)
+        if entry is not None:
+            headers = dict(kwargs.pop("headers", None) or {})
+            headers.update(self.cache.conditional_headers(entry))
+            kwargs["headers"] = headers
+
+        resp = self._send(url, params, **kwargs)
+        if resp.status_code == 304 and entry is not None:
+            return self.cache.to_response(entry)
+        if resp.status_code == 200 and (
+            "ETag" in resp.headers or "Last-Modified" in resp.headers
+        ):
+            self.cache.put(key, resp)
+        return resp
+
+    def post(self, path: str, json: dict = None, **kwargs) -> requests.Response:
+        """
+        POST with the same pacing and retries as get() (never cached).
+        """
+        return self._send(self.url(path), method="POST", json=json, **kwargs)
+
+    def _send(
+        self, url: str, params: dict = None, method: str = "GET", **kwargs
+    ) -> requests.Response:
+        resource = resource_for(url)
+        kwargs.setdefault("timeout", self.timeout)
+        headers = kwargs.pop("headers", None) or {}
+        attempt = 0
+        while True:
+            index = self.tokens.acquire(resource)
+            scheduler = self.tokens.schedulers[index]
+            try:
+                resp = self.session.request(
+                    method, url, params=params,
+                    headers={**headers, **self.tokens.headers(index)}, **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= scheduler.max_retries:
+                    raise
+                scheduler.sleep(scheduler.backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            scheduler.update(resource, resp.headers)
+            delay = scheduler.retry_delay(resp, attempt)
+            if delay is None:
+                return resp
+            if resp.status_code in (403, 429):
+                # rate limited: hold back every worker on this token's budget
+                scheduler.block(resource, delay)
+            else:
+                scheduler.sleep(delay)
+            attempt += 1
+
+    def get_json(self, path: str, params: dict = None):
+        resp = self.get(path, params=params)
+        resp.raise_for_status()
+        return resp.json()
+
+    def search_repositories(
+        self,
+        query: str,
+        page: int = 1,
+        per_page: int = 100,
+        sort: str = "stars",
+        order: str = "desc",
+    ) -> dict:
+        """
+        Fetch one page of repository search results.
+        """
+        params = search_params(query, page, per_page, sort, order)
+        return self.get_json("search/repositories", params=params)
+
+    def get_repo(self, full_name: str) -> dict:
+        return self.get_json(f"repos/{full_name}")
+
+    def fetch_commit_count(self, full_name: str, days: int = 30) -> int:
+        """
+        Number of commits on the default branch in the last `days` days,
+        from a single one-commit page and its Link header.
+        """
+        resp = self.get(f"repos/{full_name}/commits", params=commits_params(days, per_page=1))
+        if resp.status_code == 409:
+            # GitHub answers 409 for an empty repository
+            return 0
+        resp.raise_for_status()
+        return commit_total(resp)
+
+    def fetch_commits(self, full_name: str, since: str) -> list:
+        """
+        Every commit on the default branch since `since` (ISO 8601). Pages
+        after the first are fetched concurrently, up to the Link header's
+        last page.
+        """
+        path = f"repos/{full_name}/commits"
+        params = {"since": since, "per_page": 100}
+        resp = self.get(path, params=params)
+        if resp.status_code == 409:
+            return []
+        resp.raise_for_status()
+        commits = resp.json()
+        pages = range(2, last_page(resp) + 1)
+        for page in self.map(lambda n: self.get_json(path, dict(params, page=n)), pages):
+            commits.extend(page)
+        return commits
+
+    def fetch_stargazers_since(self, full_name: str, since: str) -> list:
+        """
+        Stargazers (with starred_at) who starred the repo at or after
+        `since` (ISO 8601, UTC "Z"). Stargazers are listed oldest first, so
+        the first page's Link header gives the last page and only the tail
+        is read, max_workers pages at a time, until a page starts before
+        `since`. Raises ValueError when the tail is past GitHub's
+        pagination limit.
+        """
+        path = f"repos/{full_name}/stargazers"
+        headers = {"Accept": STAR_MEDIA_TYPE}
+
+        def fetch(page):
+            resp = self.get(path, params={"per_page": 100, "page": page}, headers=headers)
+            resp.raise_for_status()
+            return resp.json()
+
+        # page 1 keeps its body as stars are added, so a 304 would replay a
+        # stale Link header (and last page); always fetch it fresh
+        resp = self.get(path, params={"per_page": 100, "page": 1}, headers=headers, cached=False)
+        resp.raise_for_status()
+        last = last_page(resp)
+        if last > STARGAZER_PAGE_LIMIT:
+            raise ValueError(f"{full_name}: recent stargazers are past page {STARGAZER_PAGE_LIMIT}")
+
+        stars = []
+        top = last
+        while top > 1:
+            batch = list(range(top, max(1, top - self.max_workers), -1))
+            pages = self.map(fetch, batch)
+            for page in pages:
+                stars.extend(page)
+            top = batch[-1] - 1
+            if any(page and page[0]["starred_at"] < since for page in pages):
+                break
+        else:
+            stars.extend(resp.json())
+        return [star for star in stars if star["starred_at"] >= since]
+
+    def map(self, fn, items) -> list:
+        """
+        Apply fn to every item concurrently and return the results in input
+        order. Exceptions raised by fn propagate to the caller.
+        """
+        items = list(items)
+        workers = min(self.max_workers, len(items))
+        if workers <= 1:
+            return [fn(item) for item in items]
+        # a fresh pool per call keeps nested map() calls from deadlocking
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(fn, items))
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_clients = {}
+_clients_lock = Lock()
+
+
+def get_client(token_path: str = DEFAULT_TOKEN_PATH) -> GitHubClient:
+    """
+    Return the process-wide client for the given token file (or the
+    GITHUB_TOKEN_PATHS pool), creating it on first use so importing a module
+    never touches the token. A pool of n tokens gets n times the workers.
+    """
+    paths = tuple(token_paths(token_path))
+    with _clients_lock:
+        if paths not in _clients:
+            tokens = TokenPool(get_tokens(paths))
+            cache = None
+            if CACHE_DIR:
+                cache = ResponseCache(CACHE_DIR, max_bytes=CACHE_MAX_MB * 1024 * 1024)
+            _clients[paths] = GitHubClient(
+                max_workers=DEFAULT_WORKERS * len(tokens), cache=cache, tokens=tokens
+            )
+        return _clients[paths]
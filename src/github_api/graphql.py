@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+import json
+from datetime import datetime, timedelta, timezone
+
+from src.github_api.client import GitHubClient
+
+# Repos per GraphQL request; each one is an aliased `repository` field
+DEFAULT_BATCH_SIZE = 50
+
+REPO_FIELDS = """
+fragment RepoFields on Repository {
+  nameWithOwner
+  databaseId
+  stargazerCount
+  forkCount
+  diskUsage
+  homepageUrl
+  createdAt
+  updatedAt
+  pushedAt
+  issues(states: OPEN) { totalCount }
+  pullRequests(states: OPEN) { totalCount }
+  repositoryTopics(first: 100) { nodes { topic { name } } }
+  defaultBranchRef {
+    target {
+      ... on Commit { history(since: $since) { totalCount } }
+    }
+  }
+}
+"""
+
+
+def build_batch_query(full_names: list) -> str:
+    """
+    One query fetching every repo in full_names under aliases r0, r1, ...
+    """
+    fields = []
+    for i, full_name in enumerate(full_names):
+        owner, name = full_name.split("/", 1)
+        fields.append(
+            f"  r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{ ...RepoFields }}"
+        )
+    body = "\n".join(fields)
+    return f"query($since: GitTimestamp!) {{\n{body}\n}}\n{REPO_FIELDS}"
+
+
+def to_rest_item(node: dict) -> dict:
+    """
+    Reshape a GraphQL repository node into the REST search item fields that
+    build_feature_row reads, so both backends produce identical rows.
+    """
+    return {
+        "id": node["databaseId"],
+        "full_name": node["nameWithOwner"],
+        "stargazers_count": node["stargazerCount"],
+        # REST's watchers_count is a legacy alias of the star count
+        "watchers_count": node["stargazerCount"],
+        "forks_count": node["forkCount"],
+        # REST counts open pull requests as issues too
+        "open_issues_count": node["issues"]["totalCount"]
+        + node["pullRequests"]["totalCount"],
+        "size": node["diskUsage"] or 0,
+        "topics": [t["topic"]["name"] for t in node["repositoryTopics"]["nodes"]],
+        "homepage": node["homepageUrl"] or None,
+        "created_at": node["createdAt"],
+        "updated_at": node["updatedAt"],
+        "pushed_at": node["pushedAt"],
+    }
+
+
+def commit_count(node: dict) -> int:
+    branch = node.get("defaultBranchRef")
+    if not branch:
+        # empty repository
+        return 0
+    return branch["target"]["history"]["totalCount"]
+
+
+def fetch_batch(client: GitHubClient, full_names: list, since: str) -> dict:
+    """
+    Fetch one batch; returns {full_name: (rest_item, commits)} for the repos
+    GitHub found. Missing repos are reported and left out.
+    """
+    payload = {"query": build_batch_query(full_names), "variables": {"since": since}}
+    resp = client.post("graphql", json=payload)
+    resp.raise_for_status()
+    body = resp.json()
+    if body.get("data") is None:
+        raise RuntimeError(f"GraphQL query failed: {body.get('errors')}")
+    for error in body.get("errors", []):
+        print(f"Error: {error.get('message')}")
+
+    found = {}
+    for i, full_name in enumerate(full_names):
+        node = body["data"].get(f"r{i}")
+        if node is not None:
+            found[full_name] = (to_rest_item(node), commit_count(node))
+    return found
+
+
+def fetch_repos(
+    client: GitHubClient,
+    full_names: list,
+    days: int = 30,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict:
+    """
+    Repo metadata and commit counts for the last `days` days, for many repos
+    per request. Unlike the REST commits endpoint, history.totalCount is not
+    capped at one page of 100 commits. Batches are sent concurrently; repos
+    in a batch that fails after retries are left out of the result.
+    """
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+    batches = [
+        full_names[i:i + batch_size] for i in range(0, len(full_names), batch_size)
+    ]
+
+    def fetch(batch):
+        try:
+            return fetch_batch(client, batch, since)
+        except Exception as e:
+            print(f"Error: batch starting at {batch[0]}: {e}")
+            return {}
+
+    found = {}
+    for result in client.map(fetch, batches):
+        found.update(result)
+    return found
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+import time
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from urllib.parse import urlparse
+
+SEARCH = "search"
+CORE = "core"
+GRAPHQL = "graphql"
+
+# GitHub's documented primary limits for an authenticated token
+DEFAULT_LIMITS = {
+    SEARCH: (30, 60),  # 30 requests per minute
+    CORE: (5000, 3600),  # 5000 requests per hour
+    GRAPHQL: (5000, 3600),  # 5000 points per hour
+}
+
+# statuses worth retrying besides the rate-limit responses
+RETRY_STATUSES = {500, 502, 503, 504}
+
+
+def resource_for(url: str) -> str:
+    """
+    Which rate-limit budget a request URL is charged against.
+    """
+    path = urlparse(url).path
+    if path.startswith("/search/"):
+        return SEARCH
+    if path.rstrip("/").endswith("/graphql"):
+        return GRAPHQL
+    return CORE
+
+
+class Budget:
+    """
+    Local view of one rate-limit window: how many calls are left and when
+    the window resets. Kept in sync with the X-RateLimit-* headers.
+    """
+
+    def __init__(self, limit: int, period: float, now: float):
+        self.limit = limit
+        self.period = period
+        self.remaining = limit
+        self.reset_at = now + period
+        self.blocked_until = 0.0
+        self.next_slot = 0.0
+        # below this many calls left we stop bursting and pace evenly
+        self.low_water = max(1, limit // 10)
+
+    def roll(self, now: float):
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.period
+
+
+class RateLimitScheduler:
+    """
+    Paces requests against separate search and core budgets.
+
+    acquire() blocks until a request may be sent (reserve() only says how
+    long to wait): requests burst freely while plenty of budget is left, are
+    spread evenly over the rest of the window once it runs low, and wait for
+    the reset when it is exhausted. update()
+    folds the server's X-RateLimit-* headers back in, and retry_delay()
+    decides whether (and how long to wait before) a response is retried.
+    """
+
+    def __init__(
+        self,
+        limits: dict = None,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        clock=time.time,
+        sleep=time.sleep,
+    ):
+        self.clock = clock
+        self.sleep = sleep
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        now = clock()
+        self.budgets = {
+            name: Budget(limit, period, now)
+            for name, (limit, period) in (limits or DEFAULT_LIMITS).items()
+        }
+        self._lock = Lock()
+
+    def acquire(self, resource: str = CORE):
+        delay = self.reserve(resource)
+        if delay > 0:
+            self.sleep(delay)
+
+    def reserve(self, resource: str = CORE) -> float:
+        """
+        Claim the next slot for `resource` without waiting; returns how many
+        seconds the caller must wait before sending (for async callers).
+        """
+        with self._lock:
+            budget = self.budgets[resource]
+            now = self.clock()
+            budget.roll(now)
+            start = max(now, budget.blocked_until)
+            if budget.remaining <= 0:
+                # exhausted: wait for the window to reset, then start afresh
+                start = max(start, budget.reset_at)
+                budget.remaining = budget.limit
+                budget.reset_at = start + budget.period
+            elif budget.remaining <= budget.low_water:
+                interval = max(0.0, budget.reset_at - now) / budget.remaining
+                start = max(start, budget.next_slot)
+                budget.next_slot = start + interval
+            budget.remaining -= 1
+        return max(0.0, start - now)
+
+    def available(self, resource: str = CORE, now: float = None) -> tuple:
+        """
+        (earliest time a request for `resource` could be sent, calls left in
+        the window), without claiming anything. TokenPool compares tokens
+        by it.
+        """
+        with self._lock:
+            budget = self.budgets[resource]
+            now = self.clock() if now is None else now
+            budget.roll(now)
+            ready = max(now, budget.blocked_until)
+            if budget.remaining <= 0:
+                ready = max(ready, budget.reset_at)
+            elif budget.remaining <= budget.low_water:
+                ready = max(ready, budget.next_slot)
+            return ready, budget.remaining
+
+    def update(self, resource: str, headers):
+        """
+        Sync a budget with the X-RateLimit-* headers of a response.
+        """
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        resource = headers.get("X-RateLimit-Resource", resource)
+        with self._lock:
+            budget = self.budgets.get(resource)
+            if budget is None:
+                return
+            limit = headers.get("X-RateLimit-Limit")
+            if limit is not None:
+                budget.limit = int(limit)
+                budget.low_water = max(1, budget.limit // 10)
+            remaining, reset = int(remaining), float(reset)
+            if reset > budget.reset_at:
+                # the server has started a new window
+                budget.remaining = remaining
+            else:
+                budget.remaining = min(budget.remaining, remaining)
+            budget.reset_at = reset
+
+    def retry_delay(self, resp, attempt: int):
+        """
+        Seconds to wait before retrying `resp`, or None if it should not be
+        retried (success, a non-retryable error, or out of attempts).
+        """
+        if attempt >= self.max_retries:
+            return None
+        status = resp.status_code
+        headers = resp.headers
+        now = self.clock()
+
+        retry_after = headers.get("Retry-After")
+        if retry_after is not None and status in (403, 429, 503):
+            return max(0.0, _parse_retry_after(retry_after, now))
+        if status in (403, 429) and headers.get("X-RateLimit-Remaining") == "0":
+            reset = float(headers.get("X-RateLimit-Reset", now))
+            return max(0.0, reset - now) + 1.0
+        if status == 429 or status in RETRY_STATUSES:
+            return self.backoff_delay(attempt)
+        return None
+
+    def backoff_delay(self, attempt: int) -> float:
+        return min(self.max_backoff, self.backoff * 2**attempt)
+
+    def block(self, resource: str, seconds: float):
+        """
+        Hold every request for `resource` back for `seconds`, so a rate-limit
+        response pauses all workers instead of each burning a retry.
+        """
+        with self._lock:
+            budget = self.budgets[resource]
+            budget.blocked_until = max(budget.blocked_until, self.clock() + seconds)
+
+
+def _parse_retry_after(value: str, now: float) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return parsedate_to_datetime(value).timestamp() - now
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+from threading import Lock
+
+from src.github_api.ratelimit import CORE, RateLimitScheduler
+
+
+class TokenPool:
+    """
+    Several GitHub tokens, each with its own RateLimitScheduler fed by the
+    X-RateLimit-* headers of the responses it was used for. reserve() picks
+    the token that can send soonest and, among those ready, the one with
+    the most calls left in its window, so a run's budget is the sum of the
+    tokens' budgets and a rate-limited token is skipped until it resets.
+    """
+
+    def __init__(self, tokens, schedulers: list = None, **scheduler_kwargs):
+        self.tokens = list(tokens)
+        if not self.tokens:
+            raise ValueError("TokenPool needs at least one token")
+        self.schedulers = schedulers or [
+            RateLimitScheduler(**scheduler_kwargs) for _ in self.tokens
+        ]
+        if len(self.schedulers) != len(self.tokens):
+            raise ValueError("one scheduler per token")
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def reserve(self, resource: str = CORE) -> tuple:
+        """
+        Claim a slot on the token with the most headroom; returns
+        (token index, seconds to wait before sending).
+        """
+        with self._lock:
+            now = self.schedulers[0].clock()
+
+            def headroom(index):
+                ready, remaining = self.schedulers[index].available(resource, now)
+                return ready, -remaining
+
+            index = min(range(len(self.tokens)), key=headroom)
+            return index, self.schedulers[index].reserve(resource)
+
+    def acquire(self, resource: str = CORE) -> int:
+        """
+        reserve(), sleeping through the wait; returns the token index.
+        """
+        index, delay = self.reserve(resource)
+        if delay > 0:
+            self.schedulers[index].sleep(delay)
+        return index
+
+    def headers(self, index: int) -> dict:
+        token = self.tokens[index]
+        return {"Authorization": f"token {token}"} if token else {}
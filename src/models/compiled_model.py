@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Flatten a fitted model (optionally an sklearn Pipeline of SimpleImputer /
+StandardScaler steps) into plain NumPy arrays, and score rows with them.
+
+Supported estimators: XGBRegressor (gbtree), LGBMRegressor (numerical
+splits), sklearn RandomForest / ExtraTrees / GradientBoosting / DecisionTree
+regressors and linear models. All trees are stored as one node table; each
+row walks every tree at once, one level per step, so a prediction costs
+max_depth vectorized array lookups and none of the DMatrix / validation /
+thread-pool setup of the original predict.
+
+    python -m src.models.compiled_model models/artifacts/xgb.pkl \\
+        --out models/compiled/xgb --benchmark
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+# Where main() looks for a feature table with the model's columns when
+# --features is not given (after the model's own directory)
+FEATURES_DIR = Path("data/features")
+# LightGBM treats |x| <= this as zero for missing_type "Zero"
+LGBM_ZERO = 1e-35
+
+ARRAYS = (
+    "impute",
+    "mean",
+    "scale",
+    "coef",
+    "roots",
+    "feature",
+    "threshold",
+    "left",
+    "default_left",
+    "zero_missing",
+    "value",
+)
+
+
+class CompiledModel:
+    """
+    A model as arrays. Siblings are stored next to each other (a node's
+    right child is left + 1) and leaves point left at themselves with an
+    infinite threshold, so walking every tree for max_depth steps always
+    ends on a leaf.
+    """
+
+    def __init__(self, n_features: int, kind: str, base: float = 0.0, tree_weight: float = 1.0,
+                 max_depth: int = 0, x_dtype: str = "float32", **arrays):
+        self.n_features = n_features
+        self.kind = kind
+        self.base = base
+        self.tree_weight = tree_weight
+        self.max_depth = max_depth
+        self.x_dtype = np.dtype(x_dtype)
+        for name in ARRAYS:
+            setattr(self, name, arrays.get(name))
+
+    def meta(self) -> dict:
+        return {
+            "n_features": self.n_features,
+            "kind": self.kind,
+            "base": self.base,
+            "tree_weight": self.tree_weight,
+            "max_depth": self.max_depth,
+            "x_dtype": self.x_dtype.name,
+        }
+
+    def preprocess(self, X) -> np.ndarray:
+        X = np.array(X, dtype=np.float64, ndmin=2)
+        if self.impute is not None:
+            X = np.where(np.isnan(X), self.impute, X)
+        if self.mean is not None:
+            X = X - self.mean
+        if self.scale is not None:
+            X = X / self.scale
+        return X
+
+    def predict(self, X) -> np.ndarray:
+        X = self.preprocess(X)
+        if self.kind == "linear":
+            return X @ self.coef + self.base
+
+        X = np.ascontiguousarray(X, dtype=self.x_dtype)
+        flat = X.ravel()
+        offsets = (np.arange(len(X)) * self.n_features)[:, None]
+        node = np.repeat(self.roots[None, :], len(X), axis=0)
+        for _ in range(self.max_depth):
+            x = flat.take(offsets + self.feature.take(node))
+            # NaN fails every comparison, so it goes left only by default
+            go_right = ~(x <= self.threshold.take(node))
+            missing = np.isnan(x)
+            if self.zero_missing is not None:
+                missing |= self.zero_missing.take(node) & (np.abs(x) <= LGBM_ZERO)
+            if missing.any():
+                go_right = np.where(missing, ~self.default_left.take(node), go_right)
+            node = self.left.take(node) + go_right
+        return self.value.take(node).sum(axis=1) * self.tree_weight + self.base
+
+    def save(self, directory):
+        """
+        One .npy per array plus meta.json, so load() can memory-map them.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ARRAYS:
+            array = getattr(self, name)
+            if array is not None:
+                np.save(directory / f"{name}.npy", array)
+        (directory / "meta.json").write_text(json.dumps(self.meta(), indent=2))
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r") -> "CompiledModel":
+        directory = Path(directory)
+        meta = json.loads((directory / "meta.json").read_text())
+        arrays = {
+            name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+            for name in ARRAYS
+            if (directory / f"{name}.npy").exists()
+        }
+        return cls(**meta, **arrays)
+
+
+class _Trees:
+    """
+    Accumulates trees into one node table.
+    """
+
+    def __init__(self, threshold_dtype=np.float64):
+        self.threshold_dtype = threshold_dtype
+        self.roots = []
+        self.columns = {k: [] for k in ("feature", "threshold", "left", "default_left", "zero_missing", "value")}
+        self.size = 0
+        self.max_depth = 0
+
+    def add(self, feature, threshold, left, right, default_left, value, zero_missing=None):
+        """
+        Add one tree given per-node arrays indexed from its root at 0;
+        leaves have left == -1.
+        """
+        left, right = np.asarray(left), np.asarray(right)
+        # renumber breadth-first, giving each pair of siblings adjacent ids
+        order, new_id, depth = [0], {0: 0}, {0: 0}
+        for i in order:
+            if left[i] >= 0:
+                new_id[left[i]], new_id[right[i]] = len(order), len(order) + 1
+                depth[left[i]] = depth[right[i]] = depth[i] + 1
+                order += [left[i], right[i]]
+        order = np.asarray(order)
+        leaf = left[order] < 0
+        ids = np.arange(len(order))
+        children = np.array([new_id[c] if c >= 0 else -1 for c in left[order]], dtype=np.int64)
+
+        cols = self.columns
+        self.roots.append(self.size)
+        cols["feature"].append(np.where(leaf, 0, np.asarray(feature)[order]).astype(np.int32))
+        cols["threshold"].append(np.where(leaf, np.inf, np.asarray(threshold)[order]).astype(self.threshold_dtype))
+        cols["left"].append((np.where(leaf, ids, children) + self.size).astype(np.int32))
+        cols["default_left"].append(np.where(leaf, True, np.asarray(default_left)[order]).astype(bool))
+        cols["zero_missing"].append(
+            np.zeros(len(order), bool) if zero_missing is None else np.asarray(zero_missing, bool)[order] & ~leaf
+        )
+        cols["value"].append(np.where(leaf, np.asarray(value)[order], 0.0).astype(np.float64))
+        self.size += len(order)
+        self.max_depth = max(self.max_depth, max(depth.values()))
+
+    def arrays(self) -> dict:
+        arrays = {k: np.concatenate(v) for k, v in self.columns.items()}
+        arrays["roots"] = np.asarray(self.roots, dtype=np.int32)
+        if not arrays["zero_missing"].any():
+            arrays["zero_missing"] = None
+        return arrays
+
+
+def _compile_xgboost(model, n_features) -> dict:
+    booster = model.get_booster()
+    raw = json.loads(booster.save_raw("json"))
+    learner = raw["learner"]
+    objective = learner["objective"]["name"]
+    if objective not in ("reg:squarederror", "reg:absoluteerror", "reg:pseudohubererror"):
+        raise NotImplementedError(f"XGBoost objective {objective} is not an identity link")
+    gbm = learner["gradient_booster"]
+    if gbm["name"] != "gbtree":
+        raise NotImplementedError(f"XGBoost booster {gbm['name']}")
+
+    trees = gbm["model"]["trees"]
+    best = booster.attr("best_iteration")
+    if best is not None:
+        per_round = int(gbm["model"]["gbtree_model_param"].get("num_parallel_tree", 1))
+        trees = trees[: (int(best) + 1) * per_round]
+
+    out = _Trees(threshold_dtype=np.float32)
+    for tree in trees:
+        if any(tree.get("split_type", [])):
+            raise NotImplementedError("categorical XGBoost splits")
+        left = np.asarray(tree["left_children"])
+        cond = np.asarray(tree["split_conditions"], dtype=np.float32)
+        # XGBoost sends x < t left, in float32; x <= the next float32 down is the same test
+        threshold = np.nextafter(cond, np.float32(-np.inf))
+        out.add(
+            tree["split_indices"],
+            threshold,
+            left,
+            tree["right_children"],
+            np.asarray(tree["default_left"], dtype=bool),
+            cond.astype(np.float64),  # leaves keep their value here
+        )
+    base = learner["learner_model_param"]["base_score"]
+    base = float(str(base).strip("[]").split(",")[0])
+    return dict(kind="trees", base=base, x_dtype="float32", max_depth=out.max_depth, **out.arrays())
+
+
+def _compile_lightgbm(model, n_features) -> dict:
+    dump = model.booster_.dump_model()
+    if not dump.get("objective", "regression").startswith(("regression", "huber", "fair", "quantile")):
+        raise NotImplementedError(f"LightGBM objective {dump.get('objective')}")
+    trees = dump["tree_info"]
+    best = getattr(model, "best_iteration_", None)
+    if best:
+        trees = trees[: best * dump.get("num_tree_per_iteration", 1)]
+
+    out = _Trees()
+    for info in trees:
+        nodes = []
+
+        def walk(node):
+            i = len(nodes)
+            nodes.append(None)
+            if "leaf_value" in node:
+                nodes[i] = (0, 0.0, -1, -1, True, node["leaf_value"], False)
+                return i
+            if node["decision_type"] != "<=":
+                raise NotImplementedError("categorical LightGBM splits")
+            left = walk(node["left_child"])
+            right = walk(node["right_child"])
+            default_left = node["default_left"]
+            if node["missing_type"] == "None":
+                # NaN is compared as 0.0
+                default_left = 0.0 <= node["threshold"]
+            nodes[i] = (
+                node["split_feature"],
+                node["threshold"],
+                left,
+                right,
+                default_left,
+                0.0,
+                node["missing_type"] == "Zero",
+            )
+            return i
+
+        walk(info["tree_structure"])
+        out.add(*map(np.array, zip(*nodes)))
+    weight = 1.0 / len(trees) if dump.get("average_output") else 1.0
+    return dict(
+        kind="trees", tree_weight=weight, x_dtype="float64", max_depth=out.max_depth, **out.arrays()
+    )
+
+
+def _compile_sklearn_trees(model, n_features) -> dict:
+    from sklearn.ensemble import GradientBoostingRegressor
+
+    if isinstance(model, GradientBoostingRegressor):
+        estimators = model.estimators_[:, 0]
+        weight = model.learning_rate
+        base = 0.0 if model.init_ == "zero" else float(np.ravel(model.init_.predict(np.zeros((1, n_features))))[0])
+    elif hasattr(model, "estimators_"):  # RandomForest / ExtraTrees average their trees
+        estimators = model.estimators_
+        weight, base = 1.0 / len(estimators), 0.0
+    else:
+        estimators, weight, base = [model], 1.0, 0.0
+
+    out = _Trees()
+    for estimator in estimators:
+        tree = estimator.tree_
+        missing_left = getattr(tree, "missing_go_to_left", None)
+        out.add(
+            tree.feature,
+            tree.threshold,
+            tree.children_left,
+            tree.children_right,
+            np.zeros(tree.node_count, bool) if missing_left is None else missing_left.astype(bool),
+            tree.value[:, 0, 0],
+        )
+    return dict(
+        kind="trees", base=base, tree_weight=weight, x_dtype="float32", max_depth=out.max_depth, **out.arrays()
+    )
+
+
+def compile_model(model) -> CompiledModel:
+    """
+    Flatten a fitted estimator or Pipeline into a CompiledModel.
+    """
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    steps = model.steps if isinstance(model, Pipeline) else [("model", model)]
+    estimator = steps[-1][1]
+    n_features = int(getattr(model, "n_features_in_", getattr(estimator, "n_features_in_", 0)))
+    pre = {}
+    for name, step in _flatten(steps[:-1]):
+        if isinstance(step, SimpleImputer):
+            if pre:
+                raise NotImplementedError(f"imputer {name} after another step")
+            if getattr(step, "add_indicator", False) or len(step.statistics_) != n_features:
+                raise NotImplementedError(f"imputer {name} adds or drops columns")
+            pre["impute"] = step.statistics_.astype(np.float64)
+        elif isinstance(step, StandardScaler):
+            if step.with_mean:
+                pre["mean"] = step.mean_.astype(np.float64)
+            if step.with_std:
+                pre["scale"] = step.scale_.astype(np.float64)
+        elif step not in (None, "passthrough"):
+            raise NotImplementedError(f"pipeline step {name}: {type(step).__name__}")
+
+    module = type(estimator).__module__
+    if module.startswith("xgboost"):
+        compiled = _compile_xgboost(estimator, n_features)
+    elif module.startswith("lightgbm"):
+        compiled = _compile_lightgbm(estimator, n_features)
+    elif hasattr(estimator, "tree_") or hasattr(estimator, "estimators_"):
+        compiled = _compile_sklearn_trees(estimator, n_features)
+    elif hasattr(estimator, "coef_"):
+        compiled = dict(
+            kind="linear",
+            coef=np.ravel(estimator.coef_).astype(np.float64),
+            base=float(np.ravel(estimator.intercept_)[0]),
+            x_dtype="float64",
+        )
+    else:
+        raise NotImplementedError(f"estimator {type(estimator).__name__}")
+    return CompiledModel(n_features=n_features, **pre, **compiled)
+
+
+def _flatten(steps):
+    from sklearn.pipeline import Pipeline
+
+    for name, step in steps:
+        if isinstance(step, Pipeline):
+            yield from _flatten(step.steps)
+        else:
+            yield name, step
+
+
+def benchmark(model, compiled: CompiledModel, X: np.ndarray, sizes=(1, 8, 64, 1024), repeat: int = 200):
+    """
+    Median latency of model.predict vs compiled.predict per batch size.
+    """
+    results = []
+    for size in sizes:
+        batch = X[np.arange(size) % len(X)]
+        timings = {}
+        for name, fn in (("original", model.predict), ("compiled", compiled.predict)):
+            fn(batch)  # warm-up
+            runs = []
+            for _ in range(max(5, repeat // size)):
+                start = time.perf_counter()
+                fn(batch)
+                runs.append(time.perf_counter() - start)
+            timings[name] = float(np.median(runs))
+        results.append({"rows": size, **timings, "speedup": timings["original"] / timings["compiled"]})
+    return results
+
+
+def feature_names(model) -> list:
+    """
+    The column names the model was fitted on, or [] when it saw a bare
+    array. LightGBM keeps them as feature_name_ (Column_0... for arrays).
+    """
+    estimator = model.steps[-1][1] if hasattr(model, "steps") else model
+    for source in (model, estimator):
+        names = list(getattr(source, "feature_names_in_", []))
+        if names:
+            return names
+    names = list(getattr(estimator, "feature_name_", []))
+    return [] if names == [f"Column_{i}" for i in range(len(names))] else names
+
+
+def find_feature_table(columns: list, model_path: Path):
+    """
+    The first parquet file next to the model or in FEATURES_DIR that has
+    every one of `columns`, or None.
+    """
+    import pyarrow.parquet as pq
+
+    for path in sorted(Path(model_path).parent.glob("*.parquet")) + sorted(FEATURES_DIR.glob("*.parquet")):
+        if set(columns) <= set(pq.read_schema(path).names):
+            return path
+    return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export a fitted model to NumPy arrays")
+    parser.add_argument("model", type=Path, help="pickled estimator or Pipeline")
+    parser.add_argument("--out", type=Path, help="directory to write the arrays to")
+    parser.add_argument(
+        "--features",
+        type=Path,
+        help="feature table to check tolerance and benchmark on (default: the "
+        "first table next to the model or in data/features with its feature names)",
+    )
+    parser.add_argument("--benchmark", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    import pandas as pd
+
+    args = parse_args(argv)
+    model = joblib.load(args.model)
+    compiled = compile_model(model)
+
+    columns = feature_names(model)
+    features = args.features
+    if features is None:
+        if not columns:
+            raise SystemExit(f"{args.model} does not record its feature names; pass --features")
+        features = find_feature_table(columns, args.model)
+        if features is None:
+            raise SystemExit(f"no feature table has the columns of {args.model}; pass --features")
+        print(f"Checking against {features}")
+    df = pd.read_parquet(features)
+    X = df[columns].to_numpy(np.float64) if columns else df.select_dtypes("number").to_numpy(np.float64)[:, : compiled.n_features]
+    error = np.max(np.abs(np.asarray(model.predict(X)) - compiled.predict(X)))
+    print(f"Max |original - compiled| on {len(X)} rows: {error:.3g}")
+
+    if args.out:
+        compiled.save(args.out)
+        print(f"✓ Wrote {args.out}")
+    if args.benchmark:
+        for row in benchmark(model, compiled, X):
+            print(
+                f"  {row['rows']:>5} rows: original {row['original'] * 1e6:9.1f} µs, "
+                f"compiled {row['compiled'] * 1e6:9.1f} µs ({row['speedup']:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
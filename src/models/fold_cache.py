@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+CV folds computed once and shared by every trial of a search.
+
+PreparedFolds splits the training data, fits the preprocessor (imputer +
+scaler) on each training fold, transforms both sides and writes the
+matrices as .npy files. Trials memory-map them, so a worker pool shares one
+copy of the pages instead of each trial re-splitting, refitting the
+preprocessor and receiving its own pickled copy of X.
+"""
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold
+
+
+class PreparedFolds:
+    def __init__(self, directory, cv: int):
+        self.directory = Path(directory)
+        self.cv = cv
+
+    @classmethod
+    def build(cls, X, y, cv: int = 5, preprocessor=None, X_test=None, y_test=None,
+              directory=None) -> "PreparedFolds":
+        """
+        Folds are KFold(cv) without shuffling, the split cross_val_score and
+        GridSearchCV use for regressors. The preprocessor is fitted on each
+        training fold only. With X_test, the full training set and the test
+        set are stored too ("train" and "test"), preprocessed by a fit on
+        the full training set.
+        """
+        directory = Path(directory or tempfile.mkdtemp(prefix="folds-"))
+        directory.mkdir(parents=True, exist_ok=True)
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+
+        def save(name, X_fit, y_fit, X_eval=None, y_eval=None):
+            if preprocessor is not None:
+                prep = clone(preprocessor).fit(X_fit)
+                X_fit = prep.transform(X_fit)
+                X_eval = prep.transform(X_eval) if X_eval is not None else None
+            arrays = {"X": X_fit, "y": y_fit, "X_eval": X_eval, "y_eval": y_eval}
+            for key, array in arrays.items():
+                if array is not None:
+                    np.save(directory / f"{name}.{key}.npy", np.ascontiguousarray(array, dtype=np.float64))
+
+        for k, (train_idx, test_idx) in enumerate(KFold(n_splits=cv).split(X)):
+            save(f"fold{k}", X[train_idx], y[train_idx], X[test_idx], y[test_idx])
+        if X_test is not None:
+            save("train", X, y, np.asarray(X_test, dtype=np.float64), np.asarray(y_test, dtype=np.float64))
+        return cls(directory, cv)
+
+    def load(self, name) -> tuple:
+        """
+        (X_fit, y_fit, X_eval, y_eval) for "fold<k>" or "train",
+        memory-mapped read-only.
+        """
+        return tuple(
+            np.load(self.directory / f"{name}.{key}.npy", mmap_mode="r")
+            for key in ("X", "y", "X_eval", "y_eval")
+        )
+
+    def fold(self, k: int) -> tuple:
+        return self.load(f"fold{k}")
+
+    def cross_val_score(self, estimator) -> np.ndarray:
+        """
+        R² per fold of clone(estimator), fitted on the preprocessed folds;
+        the same numbers cross_val_score gives for the whole pipeline.
+        """
+        scores = []
+        for k in range(self.cv):
+            X_fit, y_fit, X_eval, y_eval = self.fold(k)
+            model = clone(estimator).fit(X_fit, y_fit)
+            scores.append(r2_score(y_eval, model.predict(X_eval)))
+        return np.array(scores)
+
+    def cleanup(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
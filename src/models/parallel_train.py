@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Fit candidate models and their CV folds in a process pool.
+
+Every (model, parameter set, fold) is one job, so a grid search and the
+plain models it runs next to all share the pool instead of queueing behind
+each other. Each worker process gets an explicit thread budget: the
+estimator's own n_jobs is set to it and BLAS/OpenMP pools are capped with
+threadpoolctl, so workers x threads never exceeds the cores and XGBoost /
+LightGBM / RandomForest threading does not fight the outer parallelism.
+"""
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.metrics import r2_score
+from sklearn.pipeline import Pipeline
+from threadpoolctl import threadpool_limits
+
+from src.models.fold_cache import PreparedFolds
+
+# Cores for the whole run; TRAIN_WORKERS processes split them evenly
+TRAIN_CORES = int(os.getenv("TRAIN_CORES", str(os.cpu_count() or 1)))
+TRAIN_WORKERS = int(os.getenv("TRAIN_WORKERS", "0"))  # 0: one per core, capped at the job count
+
+# Set by _init_worker in each pool process
+_data = {}
+
+
+def thread_budget(n_jobs: int, cores: int = TRAIN_CORES, workers: int = TRAIN_WORKERS):
+    """
+    (workers, threads per worker) for n_jobs jobs on cores cores.
+    """
+    workers = max(1, min(workers or cores, n_jobs, cores))
+    return workers, max(1, cores // workers)
+
+
+def thread_params(estimator, threads: int) -> dict:
+    """
+    The estimator's own threading knob, pinned to the budget.
+    """
+    params = estimator.get_params()
+    if "n_jobs" in params:
+        return {"n_jobs": threads}
+    if "nthread" in params:
+        return {"nthread": threads}
+    return {}
+
+
+def _init_worker(folds_dir, cv, threads):
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    _data.update(
+        folds=PreparedFolds(folds_dir, cv),
+        threads=threads,
+        # kept referenced for the life of the process
+        limits=threadpool_limits(limits=threads),
+    )
+
+
+def grow(estimator, params: dict, X, y, init=None):
+    """
+    Fit clone(estimator) with params, or, given init (an earlier fit of the
+    same configuration with fewer rounds), keep boosting it / adding trees
+    until it has params["n_estimators"]. Estimators that cannot continue
+    are refit from scratch.
+    """
+    if init is None or not _continues(init):
+        return clone(estimator).set_params(**params).fit(X, y)
+    if "warm_start" in init.get_params():
+        # sklearn ensembles: only the new trees are fit
+        return init.set_params(**params, warm_start=True).fit(X, y)
+    done = _rounds(init)
+    model = clone(estimator).set_params(**dict(params, n_estimators=params["n_estimators"] - done))
+    if type(init).__module__.startswith("xgboost"):
+        return model.fit(X, y, xgb_model=init.get_booster())
+    return model.fit(X, y, init_model=init.booster_)
+
+
+def _fit(estimator, params, fold=None, init=None, keep=False):
+    """
+    Fit on a cached training fold and score its validation fold, or
+    (fold None) fit on the whole training set and score the test set. init
+    is continued with grow(). Returns (score, seconds, model); model is
+    None unless keep or a full-set fit.
+    """
+    start = time.perf_counter()
+    params = dict(params, **thread_params(estimator, _data["threads"]))
+    folds = _data["folds"]
+    X, y, X_eval, y_eval = folds.load("train") if fold is None else folds.fold(fold)
+    model = grow(estimator, params, X, y, init)
+    score = r2_score(y_eval, model.predict(X_eval))
+    return score, time.perf_counter() - start, model if keep or fold is None else None
+
+
+def _continues(model) -> bool:
+    """
+    Whether more boosting rounds / trees can be added to a fitted model.
+    """
+    module = type(model).__module__
+    return module.startswith(("xgboost", "lightgbm")) or "warm_start" in model.get_params()
+
+
+def _rounds(model) -> int:
+    if type(model).__module__.startswith("xgboost"):
+        return model.get_booster().num_boosted_rounds()
+    if type(model).__module__.startswith("lightgbm"):
+        return model.booster_.current_iteration()
+    return model.n_estimators
+
+
+def candidates(grid: dict) -> list:
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+class GridSearch:
+    """
+    Every candidate on every fold; the best mean score wins (ties go to
+    the first candidate, like GridSearchCV).
+    """
+
+    def __init__(self, estimator, grid: dict, cv: int):
+        self.estimator = estimator
+        self.grid = candidates(grid)
+        self.cv = cv
+        self.scores = {}
+        self.result = None  # (best params, mean CV score) once done
+
+    def start(self) -> list:
+        return [
+            ((i, k), (self.estimator, params, k))
+            for i, params in enumerate(self.grid)
+            for k in range(self.cv)
+        ]
+
+    def update(self, key, score, model) -> list:
+        i, _ = key
+        self.scores.setdefault(i, []).append(score)
+        if sum(len(s) for s in self.scores.values()) == len(self.grid) * self.cv:
+            means = {c: float(np.mean(s)) for c, s in self.scores.items()}
+            best = min(means, key=lambda c: (-means[c], c))
+            self.result = (self.grid[best], means[best])
+        return []
+
+    def summary(self) -> str:
+        return f"{len(self.grid) * self.cv} fits"
+
+
+class HalvingSearch(GridSearch):
+    """
+    Successive halving with boosting rounds (or trees) as the resource.
+
+    All candidates train for the first rung's n_estimators on every fold
+    and report their validation score; the best 1/factor continue training
+    from where they stopped, with factor times the rounds, until the last
+    rung reaches the largest n_estimators in the grid. Poor configurations
+    are dropped after a fraction of their rounds, and the best score at any
+    rung wins (early stopping on the round count).
+    """
+
+    def __init__(self, estimator, grid: dict, cv: int, factor: int = 3, min_rounds: int = 10):
+        grid = dict(grid)
+        n_estimators = list(grid.pop("n_estimators", [estimator.get_params()["n_estimators"]]))
+        max_rounds = max(n_estimators)
+        super().__init__(estimator, grid, cv)
+        # what the exhaustive search trains: every n_estimators of every
+        # candidate on every fold
+        self.full_rounds = len(self.grid) * sum(n_estimators) * cv
+        self.factor = factor
+        # enough rungs to get down to one candidate, each factor x the last
+        n_rungs = 1 + int(np.ceil(np.log(len(self.grid)) / np.log(factor))) if len(self.grid) > 1 else 1
+        rungs = [int(round(max_rounds / factor ** r)) for r in reversed(range(n_rungs))]
+        self.rungs = sorted({max(min(min_rounds, max_rounds), r) for r in rungs})
+        self.rung = 0
+        self.alive = list(range(len(self.grid)))
+        self.models = {}
+        self.rounds_trained = 0
+        self.best = None  # (mean score, params) over every rung so far
+
+    def _jobs(self) -> list:
+        rounds = self.rungs[self.rung]
+        jobs = []
+        for i in self.alive:
+            params = dict(self.grid[i], n_estimators=rounds)
+            for k in range(self.cv):
+                init = self.models.get((i, k))
+                self.rounds_trained += rounds - (_rounds(init) if init is not None and _continues(init) else 0)
+                jobs.append(((i, k), (self.estimator, params, k, init, True)))
+        self.scores = {}
+        return jobs
+
+    def start(self) -> list:
+        return self._jobs()
+
+    def update(self, key, score, model) -> list:
+        self.models[key] = model
+        self.scores.setdefault(key[0], []).append(score)
+        if sum(len(s) for s in self.scores.values()) < len(self.alive) * self.cv:
+            return []
+        means = {c: float(np.mean(s)) for c, s in self.scores.items()}
+        ranked = sorted(self.alive, key=lambda c: (-means[c], c))
+        # each rung scores real configurations (n_estimators = its rounds), so
+        # a candidate that peaked early wins with its earlier round count
+        if self.best is None or means[ranked[0]] > self.best[0]:
+            self.best = (means[ranked[0]], dict(self.grid[ranked[0]], n_estimators=self.rungs[self.rung]))
+        if self.rung == len(self.rungs) - 1:
+            self.result = (self.best[1], self.best[0])
+            self.models = {}
+            return []
+        print(
+            f"  rung {self.rung + 1}/{len(self.rungs)} ({self.rungs[self.rung]} rounds): "
+            f"best R² {means[ranked[0]]:.4f}, keeping {max(1, len(ranked) // self.factor)} of {len(ranked)}"
+        )
+        self.alive = ranked[: max(1, len(ranked) // self.factor)]
+        self.models = {key: m for key, m in self.models.items() if key[0] in self.alive}
+        self.rung += 1
+        return self._jobs()
+
+    def summary(self) -> str:
+        full = self.full_rounds
+        return f"{self.rounds_trained} of {full} boosting rounds ({self.rounds_trained / full:.0%} of the exhaustive grid search)"
+
+
+def train_models(models: dict, param_grids: dict, X_train, y_train, X_test, y_test,
+                 cv: int = 3, cores: int = TRAIN_CORES, workers: int = TRAIN_WORKERS,
+                 search: str = "grid", factor: int = 3, preprocessor=None) -> dict:
+    """
+    Search the models in param_grids with cv folds (KFold, as GridSearchCV
+    does for regressors) and refit the best parameters on the training set;
+    fit the others once and score them on the test set. search="halving"
+    uses HalvingSearch for models with an n_estimators parameter.
+
+    The folds (and the preprocessor, fitted per training fold) are computed
+    once into a memory-mapped PreparedFolds cache that every job reads.
+    With a preprocessor, the returned models are Pipelines of it (fitted
+    on the training set) and the estimator.
+
+    Returns {name: {"model", "metrics", "seconds"}}. metrics holds
+    test_r2_log, plus cv_r2_log and best_params for searched models.
+    """
+    start = time.perf_counter()
+    folds = PreparedFolds.build(X_train, y_train, cv, preprocessor, X_test, y_test)
+    print(f"Prepared {cv} folds in {time.perf_counter() - start:.1f}s")
+    searches = {}
+    for name, grid in param_grids.items():
+        if search == "halving" and "n_estimators" in models[name].get_params():
+            searches[name] = HalvingSearch(models[name], grid, cv, factor=factor)
+        else:
+            searches[name] = GridSearch(models[name], grid, cv)
+    first = {name: s.start() for name, s in searches.items()}
+    jobs = sum(len(j) for j in first.values()) + sum(1 for n in models if n not in searches)
+    n_workers, threads = thread_budget(jobs, cores, workers)
+    print(f"Training {len(models)} models ({jobs} first fits) on {n_workers} processes x {threads} threads")
+
+    fitted_prep = clone(preprocessor).fit(X_train) if preprocessor is not None else None
+    try:
+        results = _run(models, searches, first, folds, n_workers, threads, fitted_prep)
+    finally:
+        folds.cleanup()
+    return {name: results[name] for name in models}
+
+
+def _run(models, searches, first, folds, n_workers, threads, fitted_prep) -> dict:
+    started = {}
+    results = {}
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_init_worker,
+        initargs=(folds.directory, folds.cv, threads),
+    ) as pool:
+        pending = {}
+        for name, estimator in models.items():
+            started[name] = time.perf_counter()
+            if name not in searches:
+                pending[pool.submit(_fit, estimator, {})] = (name, None)
+            for key, args in first.get(name, []):
+                pending[pool.submit(_fit, *args)] = (name, key)
+
+        done = 0
+        while pending:
+            future = next(as_completed(pending))
+            name, key = pending.pop(future)
+            score, seconds, model = future.result()
+            done += 1
+            if key is None:
+                # a refit of the best parameters, or a plain model
+                elapsed = time.perf_counter() - started[name]
+                if name in searches:
+                    best, cv_score = searches[name].result
+                    metrics = {"cv_r2_log": cv_score, "best_params": best, "test_r2_log": score}
+                    print(f"  {name} search: {searches[name].summary()}")
+                else:
+                    metrics = {"test_r2_log": score}
+                if fitted_prep is not None:
+                    model = Pipeline([("preprocessor", fitted_prep), ("model", model)])
+                results[name] = {"model": model, "metrics": metrics, "seconds": elapsed}
+                print(f"✓ {name} done in {elapsed:.1f}s (last fit {seconds:.1f}s): {metrics}")
+                continue
+
+            i, k = key
+            print(f"  [{done}] {name} candidate {i} fold {k + 1}/{folds.cv}: R² {score:.4f} ({seconds:.1f}s)")
+            search_ = searches[name]
+            for next_key, args in search_.update(key, score, model):
+                pending[pool.submit(_fit, *args)] = (name, next_key)
+            if search_.result is not None and name not in results:
+                # searched out: refit the best candidate on the training set
+                results[name] = None
+                pending[pool.submit(_fit, models[name], search_.result[0])] = (name, None)
+    return results
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Versioned model artifacts on disk:
+
+    models/registry/<name>/<version>/model.joblib   the fitted estimator
+    models/registry/<name>/<version>/compiled/      NumPy arrays (compiled_model)
+    models/registry/<name>/<version>/meta.json      features, metrics, data hash
+    models/registry/<name>/CURRENT                  the promoted version
+
+Versions are written to a temporary directory and renamed into place, and
+CURRENT is replaced atomically, so a reader never sees half an artifact.
+Servers hold a RegistryModel, which notices a new promotion and swaps the
+model in without a restart:
+
+    python -m src.models.registry list stars
+    python -m src.models.registry promote stars 20261017T120000-1a2b3c4d
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from src.models.compiled_model import CompiledModel, compile_model
+
+REGISTRY_DIR = Path(os.getenv("MODEL_REGISTRY", "models/registry"))
+# How often a RegistryModel checks for a newly promoted version
+RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "10"))
+# Batches up to this many rows use the compiled arrays; larger ones are
+# faster through the library's own (multithreaded) predict
+COMPILED_MAX_ROWS = int(os.getenv("COMPILED_MAX_ROWS", "256"))
+
+
+def file_hash(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LoadedModel:
+    """
+    One model version in memory. Scores small batches with the compiled
+    arrays when the version has them, everything else with the estimator.
+    """
+
+    def __init__(self, version: str, model, meta: dict = None, compiled: CompiledModel = None,
+                 compiled_max_rows: int = COMPILED_MAX_ROWS):
+        self.version = version
+        self.model = model
+        self.meta = meta or {}
+        self.compiled = compiled
+        self.compiled_max_rows = compiled_max_rows
+
+    @property
+    def features(self) -> list:
+        return self.meta.get("features", [])
+
+    def predict(self, X) -> np.ndarray:
+        if self.compiled is not None and len(X) <= self.compiled_max_rows:
+            return self.compiled.predict(X)
+        return np.asarray(self.model.predict(np.asarray(X)))
+
+    @classmethod
+    def from_file(cls, path) -> "LoadedModel":
+        """
+        A bare pickle outside the registry, versioned by its bytes.
+        """
+        return cls(file_hash(path)[:16], joblib.load(path), {"path": str(path)})
+
+
+class ModelRegistry:
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = Path(root)
+
+    def register(self, name: str, model, features, metrics: dict = None, data=None,
+                 params: dict = None, promote: bool = False) -> str:
+        """
+        Store a fitted model as a new version and return the version id.
+        data is the training feature file, recorded by hash.
+        """
+        directory = self.root / name
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=directory))
+        try:
+            joblib.dump(model, tmp / "model.joblib")
+            try:
+                compile_model(model).save(tmp / "compiled")
+            except NotImplementedError as e:
+                print(f"Note: {name} is served without compiled arrays ({e})")
+
+            digest = file_hash(tmp / "model.joblib")
+            version = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{digest[:8]}"
+            meta = {
+                "name": name,
+                "version": version,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "estimator": type(model).__name__,
+                "features": list(features),
+                "metrics": metrics or {},
+                "params": params or {},
+                "data": {"path": str(data), "sha256": file_hash(data)} if data else None,
+                "sha256": digest,
+            }
+            (tmp / "meta.json").write_text(json.dumps(meta, indent=2, default=str))
+            os.chmod(tmp, 0o755)
+            tmp.rename(directory / version)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        print(f"✓ Registered {name} {version}")
+        if promote:
+            self.promote(name, version)
+        return version
+
+    def versions(self, name: str) -> list:
+        directory = self.root / name
+        if not directory.is_dir():
+            return []
+        return sorted(p.name for p in directory.iterdir() if (p / "meta.json").exists())
+
+    def meta(self, name: str, version: str) -> dict:
+        return json.loads((self.root / name / version / "meta.json").read_text())
+
+    def current_version(self, name: str):
+        try:
+            return (self.root / name / "CURRENT").read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def promote(self, name: str, version: str):
+        if version not in self.versions(name):
+            raise ValueError(f"{name} has no version {version}")
+        pointer = self.root / name / "CURRENT"
+        tmp = pointer.with_name(f".CURRENT-{os.getpid()}")
+        tmp.write_text(version + "\n")
+        os.replace(tmp, pointer)
+        print(f"✓ Promoted {name} {version}")
+
+    def load(self, name: str, version: str = None, mmap: bool = True) -> LoadedModel:
+        """
+        The given (default: promoted) version. With mmap, the estimator's
+        NumPy arrays and the compiled arrays are memory-mapped read-only,
+        so worker processes serving the same version share those pages.
+        """
+        version = version or self.current_version(name)
+        if version is None:
+            raise FileNotFoundError(f"no promoted version of {name} in {self.root}")
+        directory = self.root / name / version
+        mmap_mode = "r" if mmap else None
+        compiled = None
+        if (directory / "compiled").is_dir():
+            compiled = CompiledModel.load(directory / "compiled", mmap_mode=mmap_mode)
+        return LoadedModel(
+            version,
+            joblib.load(directory / "model.joblib", mmap_mode=mmap_mode),
+            self.meta(name, version),
+            compiled,
+        )
+
+
+class RegistryModel:
+    """
+    The promoted version of one model, reloaded when the promotion changes.
+
+    get() checks CURRENT at most every check_interval seconds. A new version
+    is loaded first and then swapped in by reassigning one reference, so
+    requests already holding the old LoadedModel finish on it. If loading
+    fails the old version keeps serving. Without any promoted version the
+    model is read from fallback_path (a bare pickle), reloaded when the
+    file changes.
+    """
+
+    def __init__(self, registry: ModelRegistry, name: str, fallback_path=None,
+                 check_interval: float = RELOAD_INTERVAL, clock=time.monotonic):
+        self.registry = registry
+        self.name = name
+        self.fallback_path = fallback_path
+        self.check_interval = check_interval
+        self.clock = clock
+        self._loaded = None
+        self._source = None
+        self._next_check = float("-inf")
+        self._lock = threading.Lock()
+
+    def get(self) -> LoadedModel:
+        if self.clock() >= self._next_check:
+            with self._lock:
+                if self.clock() >= self._next_check:
+                    self._reload()
+                    self._next_check = self.clock() + self.check_interval
+        return self._loaded
+
+    def _reload(self):
+        version = self.registry.current_version(self.name)
+        if version is not None:
+            source = version
+        elif self.fallback_path is not None:
+            stat = os.stat(self.fallback_path)
+            source = (stat.st_mtime_ns, stat.st_size)
+        else:
+            raise FileNotFoundError(f"no promoted version of {self.name} and no fallback model")
+        if source == self._source:
+            return
+        try:
+            if version is not None:
+                loaded = self.registry.load(self.name, version)
+            else:
+                loaded = LoadedModel.from_file(self.fallback_path)
+        except Exception as e:
+            if self._loaded is None:
+                raise
+            print(f"Error: loading {self.name} {source}, keeping {self._loaded.version}: {e}")
+            return
+        if self._loaded is not None:
+            print(f"✓ Reloaded {self.name}: {self._loaded.version} -> {loaded.version}")
+        self._loaded, self._source = loaded, source
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Manage versioned model artifacts")
+    parser.add_argument("--root", type=Path, default=REGISTRY_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    listing = commands.add_parser("list", help="versions of a model, newest last")
+    listing.add_argument("name")
+
+    promote = commands.add_parser("promote", help="serve this version")
+    promote.add_argument("name")
+    promote.add_argument("version")
+
+    register = commands.add_parser("register", help="add a pickled model as a new version")
+    register.add_argument("name")
+    register.add_argument("model", type=Path)
+    register.add_argument("--features", nargs="+", default=None)
+    register.add_argument("--metrics", type=Path, help="JSON file of metrics")
+    register.add_argument("--data", type=Path, help="training feature file")
+    register.add_argument("--promote", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    registry = ModelRegistry(args.root)
+    if args.command == "list":
+        current = registry.current_version(args.name)
+        for version in registry.versions(args.name):
+            meta = registry.meta(args.name, version)
+            marker = "*" if version == current else " "
+            print(f"{marker} {version}  {meta['estimator']}  {json.dumps(meta['metrics'])}")
+    elif args.command == "promote":
+        registry.promote(args.name, args.version)
+    else:
+        model = joblib.load(args.model)
+        features = args.features or list(getattr(model, "feature_names_in_", []))
+        metrics = json.loads(args.metrics.read_text()) if args.metrics else None
+        registry.register(args.name, model, features, metrics, args.data, promote=args.promote)
+
+
+if __name__ == "__main__":
+    main()
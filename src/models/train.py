@@ -1,114 +1,330 @@
 #!/usr/bin/env python3
+"""
+Train, tune and register models from a JSON config.
+
+    python -m src.models.train --config models/configs/baseline.json
+    python -m src.models.train --config models/configs/serving.json \\
+        --set search.method=grid --set parallel.cores=4
+
+A config names the feature table, the feature set, the model families and
+their search grids, the search method and budget, the parallelism and where
+results go (registry, pickles, metrics.json). Every run writes
+models/runs/<run id>/manifest.json with the resolved config, the data hash,
+library versions, per-model metrics and the time spent in each stage, so
+training configurations can be compared against each other.
+"""
+import argparse
+import copy
 import json
+import os
 import pickle
+import platform
+import shutil
+import subprocess
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.linear_model import LinearRegression, Ridge
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import r2_score
-from xgboost import XGBRegressor
+import sklearn
 from lightgbm import LGBMRegressor
-import matplotlib.pyplot as plt
-import seaborn as sns
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import Lasso, LinearRegression, Ridge
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBRegressor
+
+from src.features import feature_spec
+from src.models.parallel_train import TRAIN_CORES, TRAIN_WORKERS, train_models
+from src.models.registry import ModelRegistry, file_hash
+
+DEFAULT_CONFIG = Path("models/configs/baseline.json")
+RUNS_DIR = Path("models/runs")
+
+ESTIMATORS = {
+    "linear": LinearRegression,
+    "ridge": Ridge,
+    "lasso": Lasso,
+    "rf": RandomForestRegressor,
+    "gbr": GradientBoostingRegressor,
+    "xgb": XGBRegressor,
+    "lgbm": LGBMRegressor,
+}
+
+# Every key a config may set, with its default
+DEFAULTS = {
+    "data": "data/features/features.parquet",
+    # renamed before anything else, e.g. {"recently_upload": "recently_updated"}
+    "rename": {},
+    # add log1p_ columns from raw counts (feature_spec.log_features)
+    "log_features": False,
+    "target": feature_spec.TARGET,
+    # a list of columns, the name of a list in feature_spec, or null for
+    # every column not in "drop"
+    "features": None,
+    "drop": ["full_name"],
+    "test_size": 0.2,
+    "random_state": 42,
+    # fit SimpleImputer(median) + StandardScaler per fold; models come out
+    # as Pipelines
+    "preprocess": False,
+    # name -> {"estimator": key of ESTIMATORS (default: name), "params": {},
+    #          "grid": {param: [values]} to search}
+    "models": {},
+    "search": {"method": "grid", "cv": 3, "factor": 3},
+    "parallel": {"cores": None, "workers": None},
+    # registry name per model ("{model}" is replaced by the model's name);
+    # promote the best model by test R²
+    "registry": {"root": None, "name": "{model}", "promote": False},
+    # optional outputs
+    "artifacts_dir": None,  # <name>.pkl per model
+    "metrics": None,  # metrics.json path
+    "export_best": None,  # pickle of the best model
+    "heatmap": None,  # correlation heatmap PNG (slow; off unless set)
+}
+
 
+def load_config(path: Path, overrides=()) -> dict:
+    """
+    DEFAULTS updated with the file, then with "dotted.key=value" overrides
+    (values parsed as JSON where possible).
+    """
+    config = copy.deepcopy(DEFAULTS)
+    for key, value in json.loads(Path(path).read_text()).items():
+        if isinstance(config.get(key), dict) and key != "models":
+            config[key].update(value)
+        else:
+            config[key] = value
+    for override in overrides:
+        dotted, _, raw = override.partition("=")
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            value = raw
+        *parents, leaf = dotted.split(".")
+        node = config
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[leaf] = value
+    unknown = set(config) - set(DEFAULTS)
+    if unknown:
+        raise ValueError(f"unknown config keys: {sorted(unknown)}")
+    return config
 
-def load_features(path: Path) -> pd.DataFrame:
+
+class Stages:
     """
-    Load the parquet feature table with engineered features.
+    Wall time per named stage, in order.
     """
-    return pd.read_parquet(path)
 
+    def __init__(self):
+        self.seconds = {}
+
+    @contextmanager
+    def __call__(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = round(time.perf_counter() - start, 3)
+            print(f"[{name}] {self.seconds[name]:.2f}s")
 
-def ensure_dir(path: Path):
-    path.mkdir(parents=True, exist_ok=True)
 
+def load_table(config: dict) -> pd.DataFrame:
+    path = Path(config["data"])
+    df = pd.read_csv(path) if path.suffix == ".csv" else pd.read_parquet(path)
+    df = df.rename(columns=config["rename"])
+    if config["log_features"]:
+        df = feature_spec.log_features(df)
+    return df
 
-def save_model(model, path: Path):
-    with open(path, "wb") as f:
-        pickle.dump(model, f)
 
+def select(df: pd.DataFrame, config: dict):
+    features = config["features"]
+    if isinstance(features, str):
+        features = getattr(feature_spec, features)
+    if features is None:
+        drop = set(config["drop"]) | {config["target"]}
+        features = [c for c in df.columns if c not in drop]
+    return df[list(features)], df[config["target"]]
 
-def main():
-    # Paths
-    features_path = Path("data/features/features.parquet")
-    metrics_dir = Path("models") / "metrics"
-    artifacts_dir = Path("models") / "artifacts"
-    ensure_dir(metrics_dir)
-    ensure_dir(artifacts_dir)
 
-    # Load features
-    df = load_features(features_path)
+def build_models(config: dict):
+    models, grids = {}, {}
+    for name, spec in config["models"].items():
+        estimator = ESTIMATORS[spec.get("estimator", name)]
+        models[name] = estimator(**spec.get("params", {}))
+        # "grid": {} still cross-validates the model as configured
+        if "grid" in spec:
+            grids[name] = spec["grid"]
+    return models, grids
+
+
+def plot_heatmap(df: pd.DataFrame, path):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
-    corr_matrix = df.corr(numeric_only=True)
     plt.figure(figsize=(14, 12))
-    sns.heatmap(corr_matrix, annot=True, fmt=".2f", cmap="coolwarm", square=True)
+    sns.heatmap(df.corr(numeric_only=True), annot=True, fmt=".2f", cmap="coolwarm", square=True)
     plt.title("Correlation Heatmap of Features", fontsize=16)
     plt.tight_layout()
-    output_path = "src/features/feature_correlation_heatmap.png"
-    plt.savefig(output_path)
+    plt.savefig(path)
     plt.close()
 
-    output_path
 
-    # Target: log1p_stars
-    y = df["log1p_stars"]
-    X = df.drop(columns=["full_name", "log1p_stars", "log1p_watchers", "log1p_forks"])
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
 
-    # Train/test split
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
 
-    # Define models
-    base_models = {
-        "linear": LinearRegression(),
-        "ridge": Ridge(random_state=42),
-        "rf": RandomForestRegressor(n_estimators=100, random_state=42),
-        "xgb": XGBRegressor(random_state=42, verbosity=0),
-        "lgbm": LGBMRegressor(random_state=42),
-    }
+def versions() -> dict:
+    import lightgbm
+    import xgboost
 
-    # Simplified grids for tuning
-    param_grids = {
-        "xgb": {"n_estimators": [100], "max_depth": [3]},
-        "lgbm": {
-            "n_estimators": [100, 300],
-            "max_depth": [3, 6, -1],
-            "learning_rate": [0.01, 0.1],
-        },
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "xgboost": xgboost.__version__,
+        "lightgbm": lightgbm.__version__,
     }
 
-    metrics = {}
 
-    # Train, tune, evaluate, save
-    for name, model in base_models.items():
-        print(f"\n===== Processing {name} =====")
-        if name in param_grids:
-            grid = GridSearchCV(
-                model, param_grids[name], cv=3, scoring="r2", n_jobs=1, verbose=0
+def run(config: dict, config_path=None, runs_dir: Path = RUNS_DIR) -> dict:
+    """
+    One training run; returns the manifest (also written to the run directory).
+    """
+    run_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{os.getpid()}"
+    run_dir = Path(runs_dir) / run_id
+    stages = Stages()
+    started = time.perf_counter()
+
+    with stages("load"):
+        df = load_table(config)
+        X, y = select(df, config)
+    if config["heatmap"]:
+        with stages("heatmap"):
+            plot_heatmap(df, config["heatmap"])
+    with stages("split"):
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=config["test_size"], random_state=config["random_state"]
+        )
+
+    models, grids = build_models(config)
+    preprocessor = None
+    if config["preprocess"]:
+        preprocessor = Pipeline(
+            steps=[("imputer", SimpleImputer(strategy="median")), ("scaler", StandardScaler())]
+        )
+    search = config["search"]
+    parallel = config["parallel"]
+    with stages("train"):
+        results = train_models(
+            models,
+            grids,
+            X_train,
+            y_train,
+            X_test,
+            y_test,
+            cv=search["cv"],
+            cores=parallel["cores"] or TRAIN_CORES,
+            workers=parallel["workers"] or TRAIN_WORKERS,
+            search=search["method"],
+            factor=search["factor"],
+            preprocessor=preprocessor,
+        )
+    best = max(results, key=lambda name: results[name]["metrics"]["test_r2_log"])
+    print(f"Best model: {best} (test R² {results[best]['metrics']['test_r2_log']:.4f})")
+
+    registry_config = config["registry"]
+    registry = ModelRegistry(registry_config["root"]) if registry_config["root"] else ModelRegistry()
+    registered = {}
+    with stages("save"):
+        for name, result in results.items():
+            model = result["model"]
+            if config["artifacts_dir"]:
+                Path(config["artifacts_dir"]).mkdir(parents=True, exist_ok=True)
+                with open(Path(config["artifacts_dir"]) / f"{name}.pkl", "wb") as f:
+                    pickle.dump(model, f)
+            registered[name] = registry.register(
+                registry_config["name"].format(model=name),
+                model,
+                X.columns,
+                result["metrics"],
+                data=config["data"],
+                params=result["metrics"].get("best_params"),
+                promote=registry_config["promote"] and name == best,
+            )
+        if config["export_best"]:
+            with open(config["export_best"], "wb") as f:
+                pickle.dump(results[best]["model"], f)
+        if config["metrics"]:
+            Path(config["metrics"]).parent.mkdir(parents=True, exist_ok=True)
+            Path(config["metrics"]).write_text(
+                json.dumps({name: r["metrics"] for name, r in results.items()}, indent=2)
             )
-            grid.fit(X_train, y_train)
-            best = grid.best_estimator_
-            metrics[name] = {
-                "cv_r2_log": grid.best_score_,
-                "best_params": grid.best_params_,
+    stages.seconds["total"] = round(time.perf_counter() - started, 3)
+
+    manifest = {
+        "run_id": run_id,
+        "config_path": str(config_path) if config_path else None,
+        "config": config,
+        "git_commit": git_commit(),
+        "versions": versions(),
+        "cpu_count": os.cpu_count(),
+        "data": {
+            "path": config["data"],
+            "sha256": file_hash(config["data"]),
+            "rows": len(df),
+            "features": list(X.columns),
+        },
+        "stages": stages.seconds,
+        "models": {
+            name: {
+                "metrics": r["metrics"],
+                "seconds": round(r["seconds"], 3),
+                "registry": {"name": registry_config["name"].format(model=name), "version": registered[name]},
             }
-            print(f"{name} best CV R² (log): {grid.best_score_:.4f}")
-            save_model(best, artifacts_dir / f"{name}.pkl")
-        else:
-            model.fit(X_train, y_train)
-            preds = model.predict(X_test)
-            score = r2_score(y_test, preds)
-            metrics[name] = {"test_r2_log": score}
-            print(f"{name} test R² (log): {score:.4f}")
-            save_model(model, artifacts_dir / f"{name}.pkl")
-
-    # Write metrics
-    with open(metrics_dir / "metrics.json", "w") as f:
-        json.dump(metrics, f, indent=2)
-    print(f"Saved metrics to {metrics_dir / 'metrics.json'}")
+            for name, r in results.items()
+        },
+        "best": best,
+    }
+    run_dir.mkdir(parents=True, exist_ok=True)
+    (run_dir / "manifest.json").write_text(json.dumps(manifest, indent=2, default=str))
+    if config_path:
+        shutil.copy(config_path, run_dir / "config.json")
+    print(f"✓ Wrote {run_dir / 'manifest.json'} ({stages.seconds['total']:.1f}s total)")
+    return manifest
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train models from a JSON config")
+    parser.add_argument("--config", type=Path, default=DEFAULT_CONFIG)
+    parser.add_argument(
+        "--set",
+        dest="overrides",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="override a config value, e.g. search.method=grid",
+    )
+    parser.add_argument("--runs-dir", type=Path, default=RUNS_DIR)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = load_config(args.config, args.overrides)
+    return run(config, args.config, args.runs_dir)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class FakeClock:
+    """
+    Stand-in for time.time/time.sleep so pacing can be asserted instantly.
+    """
+
+    def __init__(self, start=1_000_000.0):
+        self.now = start
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeGitHub:
+    """
+    Local stand-in for api.github.com. `script` maps a path to the
+    (status, headers, body) responses it serves in order, repeating the last
+    one, or is a callable taking the request handler. Every request's path
+    and headers are recorded in `requests`.
+    """
+
+    def __init__(self):
+        self.script = {}
+        self.requests = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.body = self.rfile.read(length) if length else b""
+                fake.requests.append((self.path, dict(self.headers)))
+                path = self.path.split("?")[0]
+                responses = fake.script[path]
+                if callable(responses):
+                    status, headers, body = responses(self)
+                elif len(responses) > 1:
+                    status, headers, body = responses.pop(0)
+                else:
+                    status, headers, body = responses[0]
+                payload = b"" if body is None else json.dumps(body).encode()
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_POST = do_GET
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    @property
+    def hits(self):
+        return [path.split("?")[0] for path, _ in self.requests]
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def github():
+    fake = FakeGitHub()
+    thread = threading.Thread(target=fake.server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield fake
+    fake.server.shutdown()
+    fake.server.server_close()
@@ -0,0 +1,115 @@
+import re
+from datetime import date, timedelta
+from urllib.parse import parse_qs, urlparse
+
+from src.collector import collector, raw_store
+from src.collector.collector import SEARCH_CAP, Slice, split_stars_qualifier
+from src.github_api.client import GitHubClient
+from src.github_api.ratelimit import RateLimitScheduler
+
+
+def make_population():
+    """
+    2600 repos with a long tail of stars and a big clump at exactly 51 stars,
+    so both star and creation-date slicing are needed.
+    """
+    repos = []
+    start = date(2015, 1, 1)
+    for i in range(2600):
+        stars = 51 if i < 1400 else 51 + (i - 1400) // 3
+        created = start + timedelta(days=i % 900)
+        repos.append({"id": i, "full_name": f"o/r{i}", "stargazers_count": stars, "created_at": f"{created}T00:00:00Z"})
+    return repos
+
+
+def fake_search(population):
+    def search(handler):
+        params = parse_qs(urlparse(handler.path).query)
+        q = params["q"][0]
+        page, per_page = int(params["page"][0]), int(params["per_page"][0])
+
+        hits = population
+        if m := re.search(r"stars:>=(\d+)", q):
+            hits = [r for r in hits if r["stargazers_count"] >= int(m[1])]
+        if m := re.search(r"stars:(\d+)\.\.(\d+)", q):
+            hits = [r for r in hits if int(m[1]) <= r["stargazers_count"] <= int(m[2])]
+        if m := re.search(r"created:(\S+)\.\.(\S+)", q):
+            hits = [r for r in hits if m[1] <= r["created_at"][:10] <= m[2]]
+        hits = sorted(hits, key=lambda r: -r["stargazers_count"])
+
+        # like GitHub: total_count is exact, but only the first 1000 are reachable
+        start = (page - 1) * per_page
+        items = hits[start:start + per_page] if start < SEARCH_CAP else []
+        return 200, {}, {"total_count": len(hits), "items": items}
+
+    return search
+
+
+def test_split_stars_qualifier():
+    assert split_stars_qualifier("language:python stars:>50") == ("language:python", 51, None)
+    assert split_stars_qualifier("stars:10..20 topic:ml") == ("topic:ml", 10, 20)
+    assert split_stars_qualifier("language:go") == ("language:go", 0, None)
+
+
+def test_slice_query():
+    s = Slice(10, 20, date(2020, 1, 1), date(2020, 6, 30))
+    assert s.query("language:python") == "language:python stars:10..20 created:2020-01-01..2020-06-30"
+    assert Slice(51).query("language:python") == "language:python stars:>=51"
+
+
+def test_collect_slices_gets_past_the_cap(github, clock, monkeypatch, tmp_path):
+    population = make_population()
+    github.script["/search/repositories"] = fake_search(population)
+    client = GitHubClient(
+        token="test",
+        base_url=github.url,
+        scheduler=RateLimitScheduler(clock=clock.time, sleep=clock.sleep),
+    )
+    monkeypatch.setattr(collector, "get_client", lambda _: client)
+
+    writer = raw_store.SnapshotWriter(tmp_path / "full", snapshot=date(2025, 6, 1))
+    _, failures = collector.collect_slices("language:python stars:>50", writer, split_created=True)
+    writer.commit()
+
+    ids = [item["id"] for item in raw_store.read_items(tmp_path / "full", columns=["full_name"])]
+    assert failures == 0
+    assert len(ids) == len(set(ids)) == len(population)
+
+    # without created: slicing the 1400 repos at 51 stars can't all be reached
+    writer = raw_store.SnapshotWriter(tmp_path / "stars", snapshot=date(2025, 6, 1))
+    collector.collect_slices("language:python stars:>50", writer)
+    writer.commit()
+    assert len(list(raw_store.read_items(tmp_path / "stars"))) < len(population)
+
+
+def test_snapshots_round_trip(tmp_path):
+    raw_dir = tmp_path / "raw"
+    item = {
+        "id": 1,
+        "full_name": "psf/requests",
+        "stargazers_count": 10,
+        "topics": ["http"],
+        "created_at": "2011-02-13T18:38:17Z",
+        "owner": {"login": "psf"},  # not kept
+    }
+    old = raw_store.SnapshotWriter(raw_dir, snapshot=date(2025, 6, 1))
+    old.write([item], "p1")
+    old.commit()
+    new = raw_store.SnapshotWriter(raw_dir, snapshot=date(2025, 6, 2))
+    new.write([item, {**item, "id": 2, "full_name": "o/two"}], "p1")
+    new.write([{**item, "stargazers_count": 11}], "p2")  # same repo seen again
+
+    # the unfinished snapshot is ignored until it is committed
+    assert raw_store.list_snapshots(raw_dir) == [date(2025, 6, 1)]
+    new.commit()
+
+    rows = list(raw_store.read_items(raw_dir, columns=["full_name", "stargazers_count", "topics"]))
+    assert sorted((r["full_name"], r["stargazers_count"]) for r in rows) == [("o/two", 10), ("psf/requests", 11)]
+    assert rows[0]["topics"] == ["http"]
+    assert set(rows[0]) == {"id", "full_name", "stargazers_count", "topics"}
+
+
+def test_legacy_json_pages_are_still_read():
+    items = list(raw_store.read_items("data/raw"))
+    assert len(items) == 1000
+    assert "full_name" in items[0]
@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlparse
+
+from src.collector.commit_store import DAY, CommitStore, commit_count
+from src.github_api.client import GitHubClient
+from src.github_api.ratelimit import RateLimitScheduler
+
+
+def iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def fake_commits(github, commits):
+    """
+    Serve `commits` (sha -> timestamp, newest first) filtered by `since`
+    and paginated with a Link header, like GitHub.
+    """
+
+    def respond(handler):
+        params = parse_qs(urlparse(handler.path).query)
+        since = datetime.fromisoformat(params["since"][0].replace("Z", "+00:00")).timestamp()
+        per_page, page = int(params["per_page"][0]), int(params.get("page", ["1"])[0])
+        hits = [
+            {"sha": sha, "commit": {"committer": {"date": iso(ts)}}}
+            for sha, ts in sorted(commits.items(), key=lambda c: -c[1])
+            if ts >= since
+        ]
+        last = max(1, -(-len(hits) // per_page))
+        headers = {}
+        if last > 1:
+            url = f"{github.url}/repos/o/r/commits?per_page={per_page}&page={last}"
+            headers["Link"] = f'<{url}>; rel="last"'
+        return 200, headers, hits[(page - 1) * per_page:page * per_page]
+
+    github.script["/repos/o/r/commits"] = respond
+
+
+def make_client(github, clock):
+    scheduler = RateLimitScheduler(clock=clock.time, sleep=clock.sleep)
+    return GitHubClient(base_url=github.url, scheduler=scheduler, max_workers=4)
+
+
+def test_count_comes_from_the_link_header(github, clock):
+    now = datetime.now(timezone.utc).timestamp()
+    fake_commits(github, {f"c{i}": now - i * 600 for i in range(250)})
+
+    assert make_client(github, clock).fetch_commit_count("o/r") == 250
+    assert len(github.requests) == 1
+    # a plain total stays on that one request unless a store is asked for
+    assert commit_count(make_client(github, clock), "o/r") == 250
+    assert len(github.requests) == 2
+
+
+def test_sync_fetches_only_new_commits(github, clock, tmp_path):
+    clock.now = datetime(2025, 6, 1, tzinfo=timezone.utc).timestamp()
+    commits = {f"c{i}": clock.now - i * 3600 - 1 for i in range(24 * 40)}
+    fake_commits(github, commits)
+    client = make_client(github, clock)
+    store = CommitStore(tmp_path / "commits.sqlite", clock=clock.time)
+
+    assert store.sync(client, "o/r") == len(commits)
+    # 960 commits over 10 pages: page 1 plus 9 fetched from the Link header
+    assert len(github.requests) == 10
+    assert store.count("o/r", days=30) == 24 * 30
+
+    clock.sleep(DAY)
+    commits.update({f"n{i}": clock.now - i * 3600 - 1 for i in range(5)})
+    github.requests.clear()
+    assert store.sync(client, "o/r") == 5
+    assert len(github.requests) == 1
+    assert store.count("o/r", days=30) == 24 * 29 + 5
+
+    # survives a restart
+    assert CommitStore(tmp_path / "commits.sqlite", clock=clock.time).count("o/r", days=7) == 24 * 6 + 5
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from lightgbm import LGBMRegressor
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBRegressor
+
+from src.models.compiled_model import CompiledModel, compile_model, feature_names, find_feature_table
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 6))
+    y = 2 * X[:, 0] + np.sin(3 * X[:, 1]) + X[:, 2] * X[:, 3]
+    # missing values and exact zeros exercise the default branches
+    X[rng.random(X.shape) < 0.05] = np.nan
+    X[rng.random(X.shape) < 0.05] = 0.0
+    return X, y
+
+
+@pytest.mark.parametrize(
+    "estimator",
+    [
+        XGBRegressor(n_estimators=40, max_depth=5),
+        LGBMRegressor(n_estimators=40, verbose=-1),
+        LGBMRegressor(n_estimators=40, zero_as_missing=True, verbose=-1),
+        RandomForestRegressor(n_estimators=10, max_depth=8, random_state=0),
+        GradientBoostingRegressor(n_estimators=40, random_state=0),
+        LinearRegression(),
+    ],
+    ids=lambda e: type(e).__name__,
+)
+def test_compiled_matches_pipeline_and_survives_save(data, estimator, tmp_path):
+    X, y = data
+    if isinstance(estimator, (XGBRegressor, LGBMRegressor)):
+        model = estimator.fit(X, y)
+    else:
+        model = make_pipeline(SimpleImputer(strategy="median"), StandardScaler(), estimator).fit(X, y)
+
+    compiled = compile_model(model)
+    # XGBoost sums its leaves in float32
+    np.testing.assert_allclose(compiled.predict(X), model.predict(X), rtol=1e-5, atol=1e-5)
+
+    compiled.save(tmp_path / "model")
+    loaded = CompiledModel.load(tmp_path / "model")
+    np.testing.assert_array_equal(loaded.predict(X[:7]), compiled.predict(X[:7]))
+    assert loaded.predict(X[0]).shape == (1,)
+
+
+def test_unsupported_models_are_rejected(data):
+    X, y = data
+    with pytest.raises(NotImplementedError):
+        compile_model(XGBRegressor(n_estimators=2, objective="reg:gamma").fit(X, np.exp(y)))
+
+
+def test_feature_table_defaults_to_one_with_the_model_columns(data, tmp_path):
+    X, y = data
+    df = pd.DataFrame(X, columns=[f"f{i}" for i in range(X.shape[1])])
+    model = LGBMRegressor(n_estimators=5, verbose=-1).fit(df[["f2", "f4"]], y)
+    assert feature_names(model) == ["f2", "f4"]
+    assert feature_names(LGBMRegressor(n_estimators=5, verbose=-1).fit(X, y)) == []
+
+    df[["f2"]].to_parquet(tmp_path / "a.parquet")
+    df.to_parquet(tmp_path / "b.parquet")
+    assert find_feature_table(["f2", "f4"], tmp_path / "model.pkl") == tmp_path / "b.parquet"
+    assert find_feature_table(["missing"], tmp_path / "model.pkl") is None
@@ -0,0 +1,61 @@
+import asyncio
+
+from src.FAST.feature_cache import RepoFeatureCache
+
+
+def make_cache(clock, calls, fail=()):
+    async def fetch_detail(full_name):
+        calls.append(("detail", full_name))
+        if "detail" in fail:
+            raise RuntimeError("GitHub down")
+        return {"full_name": full_name, "size": 10, "stargazers_count": len(calls), "owner": {}}
+
+    async def fetch_commits(full_name):
+        calls.append(("commits", full_name))
+        return 7
+
+    return RepoFeatureCache(
+        fetch_detail, fetch_commits, detail_ttl=60, commits_ttl=60, stale_ttl=600, clock=clock.time
+    )
+
+
+def test_fresh_entries_cost_no_calls_and_stale_ones_revalidate_in_background(clock):
+    calls = []
+    cache = make_cache(clock, calls)
+
+    async def scenario():
+        first = await cache.get("a/b")
+        again = await cache.get("a/b")
+        assert calls == [("detail", "a/b"), ("commits", "a/b")]
+        assert first is again and first["commits"] == 7 and "owner" not in first
+
+        # past the TTL but within the stale window: old fields now,
+        # one background refresh even for concurrent requests
+        clock.sleep(61)
+        stale = await asyncio.gather(cache.get("a/b"), cache.get("a/b"))
+        assert stale == [first, first]
+        await asyncio.sleep(0)
+        await asyncio.gather(*cache._tasks)
+        assert len(calls) == 4
+        refreshed = await cache.get("a/b")
+        assert refreshed["stargazers_count"] == 3
+
+        # far past the stale window: the request waits for fresh fields
+        clock.sleep(61 + 600)
+        await cache.get("a/b")
+        assert len(calls) == 6
+
+    asyncio.run(scenario())
+
+
+def test_failed_refresh_keeps_serving_old_fields(clock):
+    calls = []
+    cache = make_cache(clock, calls)
+
+    async def scenario():
+        first = await cache.get("a/b")
+        cache.fetchers["detail"] = make_cache(clock, calls, fail=("detail",)).fetchers["detail"]
+        clock.sleep(61 + 600)
+        assert (await cache.get("a/b"))["stargazers_count"] == first["stargazers_count"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.collector import raw_store
+from src.features import feature_spec
+
+FIXTURES = Path(__file__).parent / "fixtures"
+NOW = pd.Timestamp("2025-05-21T12:00:00Z")
+
+
+def load_item():
+    return json.loads((FIXTURES / "rest_search_item.json").read_text())
+
+
+def test_matches_the_scalar_formulas():
+    item = load_item()
+    features = feature_spec.compute_features(
+        feature_spec.build_frame([item], commits=[42]), now=NOW
+    ).iloc[0]
+
+    age_days = (NOW - pd.Timestamp(item["created_at"])).days
+    days_since_update = (NOW - pd.Timestamp(item["updated_at"])).days
+    assert features["age_days"] == age_days
+    assert features["days_since_update"] == days_since_update == 1
+    assert features["recently_updated"] == 1
+    assert features["topics"] == 8
+    assert features["has_homepage"] == 1
+    assert features["creation_year"] == 2011 and features["creation_month"] == 2
+    assert np.isclose(features["log1p_commits_per_day"], np.log1p(42 / age_days))
+    assert np.isclose(features["log1p_watchers_per_fork"], np.log1p(52874 / 9418))
+    assert np.isclose(features["issues_per_size"], 270 / 13174)
+    assert np.isclose(features["activity_ratio"], days_since_update / (age_days + 1))
+
+
+def test_arrow_table_and_dicts_agree():
+    items = [load_item(), dict(load_item(), full_name="o/new", forks_count=0,
+                               homepage=None, topics=[], created_at="2025-05-21T08:00:00Z")]
+    from_dicts = feature_spec.build_matrix(
+        items, feature_spec.SERVING_FEATURES, commits=[42, 3], now=NOW
+    )
+    table = raw_store.items_to_table(items)
+    from_table = feature_spec.build_matrix(
+        table, feature_spec.SERVING_FEATURES, commits=[42, 3], now=NOW
+    )
+    np.testing.assert_allclose(from_dicts, from_table)
+    assert from_dicts.shape == (2, len(feature_spec.SERVING_FEATURES))
+
+    # created today, no forks: rates are 0 rather than inf/NaN
+    new = feature_spec.compute_features(feature_spec.build_frame(items, [42, 3]), NOW).iloc[1]
+    assert new["age_days"] == 0
+    assert new["commits_per_day"] == 0 and new["watchers_per_fork"] == 0
+    assert np.isfinite(from_dicts).all()
+
+    # without commits either way: the same base columns, commits all NaN
+    pd.testing.assert_frame_equal(
+        feature_spec.build_frame(table), feature_spec.build_frame(items), check_dtype=False
+    )
+    assert feature_spec.build_frame(table)["commits"].isna().all()
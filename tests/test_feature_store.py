@@ -0,0 +1,84 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import build_features
+from src.features.feature_store import FeatureStore
+
+
+def snapshot(rows):
+    return pd.DataFrame(rows, columns=["full_name", "updated_at", "stars", "forks", "issues"])
+
+
+def test_appends_only_changed_repos_with_deltas(tmp_path):
+    store = FeatureStore(tmp_path)
+    day1 = snapshot([
+        ("o/a", "2025-05-30T00:00:00Z", 100, 10, 1),
+        ("o/b", "2025-05-30T00:00:00Z", 50, 5, 0),
+        ("o/c", "2025-05-31T00:00:00Z", 10, 1, 3),
+    ])
+    written = store.append(day1, date(2025, 6, 1))
+    assert len(written) == 3 and written["stars_delta"].isna().all()
+
+    day3 = snapshot([
+        ("o/a", "2025-06-02T12:00:00Z", 130, 12, 0),  # changed
+        ("o/b", "2025-05-30T00:00:00Z", 50, 5, 0),  # unchanged
+        ("o/c", "2025-05-31T00:00:00Z", 10, 1, 3),  # unchanged
+        ("o/d", "2025-06-02T00:00:00Z", 5, 0, 0),  # new
+    ])
+    written = store.append(day3, date(2025, 6, 3))
+
+    assert written["full_name"].tolist() == ["o/a", "o/d"]
+    a = written.iloc[0]
+    assert (a["stars_delta"], a["forks_delta"], a["issues_delta"]) == (30, 2, -1)
+    assert a["stars_delta_per_day"] == 15
+    assert np.isnan(written.iloc[1]["stars_delta"])
+
+    assert sorted(store.latest()["full_name"]) == ["o/a", "o/b", "o/c", "o/d"]
+    assert store.latest().set_index("full_name").loc["o/a", "stars"] == 130
+    # history is kept, and any earlier table can be rebuilt
+    assert store.as_of(date(2025, 6, 2)).set_index("full_name")["stars"].to_dict() == {"o/a": 100, "o/b": 50, "o/c": 10}
+    assert store.history("o/a")["stars"].tolist() == [100, 130]
+    assert store.snapshots() == [date(2025, 6, 1), date(2025, 6, 3)]
+
+    with pytest.raises(ValueError):
+        store.append(day3, date(2025, 6, 3))
+
+
+def test_unchanged_compares_updated_and_pushed_at(tmp_path):
+    store = FeatureStore(tmp_path)
+    assert store.unchanged(snapshot([("o/a", "2025-05-30T00:00:00Z", 1, 0, 0)])).empty
+
+    day1 = snapshot([
+        ("o/a", "2025-05-30T00:00:00Z", 100, 10, 1),
+        ("o/b", "2025-05-30T00:00:00Z", 50, 5, 0),
+        ("o/c", "2025-05-30T00:00:00Z", 10, 1, 3),
+    ]).assign(pushed_at="2025-05-29T00:00:00Z", commits=[7, 8, 9])
+    store.append(day1, date(2025, 6, 1))
+
+    now = pd.DataFrame({
+        "full_name": ["o/a", "o/b", "o/c", "o/d"],
+        "updated_at": ["2025-05-30T00:00:00Z", "2025-05-30T00:00:00Z", "2025-06-02T00:00:00Z", "2025-06-02T00:00:00Z"],
+        "pushed_at": ["2025-05-29T00:00:00Z", "2025-06-01T00:00:00Z", "2025-05-29T00:00:00Z", None],
+    })
+    stored = store.unchanged(now)
+    # o/b was pushed to, o/c updated, o/d is new
+    assert stored.index.tolist() == ["o/a"] and stored.loc["o/a", "commits"] == 7
+
+
+def test_builder_refetches_unchanged_repos_with_old_counts(tmp_path):
+    store = FeatureStore(tmp_path)
+    rows = snapshot([
+        ("o/a", "2025-05-30T00:00:00Z", 100, 10, 1),
+        ("o/b", "2025-05-30T00:00:00Z", 50, 5, 0),
+    ]).assign(pushed_at="2025-05-29T00:00:00Z", commits=[7, 8])
+    store.append(rows.iloc[:1], date(2025, 6, 1))
+    store.append(rows.iloc[1:], date(2025, 6, 3))
+    items = rows[["full_name", "updated_at", "pushed_at"]].to_dict("records")
+
+    # both unchanged, but o/a's 30-day count is two days old
+    reused, to_enrich = build_features.split_unchanged(store, items, date(2025, 6, 3), max_age=86400)
+    assert [(r["full_name"], r["commits"]) for r in reused] == [("o/b", 8)]
+    assert [item["full_name"] for item in to_enrich] == ["o/a"]
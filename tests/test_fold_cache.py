@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import cross_val_score
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.models.fold_cache import PreparedFolds
+from src.models.parallel_train import train_models
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(100, 3)) * [1, 10, 100], columns=list("abc"))
+    y = pd.Series(X["a"] + X["b"] / 10 + rng.normal(size=100) * 0.1)
+    X.iloc[::7, 1] = np.nan
+    return X, y
+
+
+def test_cached_folds_score_like_the_pipeline(data, tmp_path):
+    X, y = data
+    prep = make_pipeline(SimpleImputer(strategy="median"), StandardScaler())
+    folds = PreparedFolds.build(X, y, cv=5, preprocessor=prep, directory=tmp_path)
+
+    expected = cross_val_score(Pipeline([("prep", prep), ("model", Ridge())]), X, y, cv=5, scoring="r2")
+    np.testing.assert_allclose(folds.cross_val_score(Ridge()), expected)
+    # fitted on the training fold only, and read back memory-mapped
+    X_fit, _, X_eval, _ = folds.fold(0)
+    assert isinstance(X_fit, np.memmap)
+    assert np.allclose(X_fit.mean(axis=0), 0) and not np.allclose(X_eval.mean(axis=0), 0)
+
+
+def test_training_returns_the_preprocessing_pipeline(data):
+    X, y = data
+    prep = make_pipeline(SimpleImputer(strategy="median"), StandardScaler())
+    results = train_models(
+        {"ridge": Ridge()}, {"ridge": {"alpha": [0.1, 10.0]}},
+        X[:80], y[:80], X[80:], y[80:], cv=4, cores=1, preprocessor=prep,
+    )
+    model = results["ridge"]["model"]
+    assert isinstance(model, Pipeline)
+    assert model.predict(X[80:]).shape == (20,)
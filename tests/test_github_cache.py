@@ -0,0 +1,106 @@
+import asyncio
+
+from src.github_api.async_client import AsyncGitHubClient
+from src.github_api.cache import ResponseCache
+from src.github_api.client import GitHubClient
+from src.github_api.ratelimit import RateLimitScheduler
+
+
+def make_client(github, clock, tmp_path, max_bytes=1024 * 1024):
+    scheduler = RateLimitScheduler(clock=clock.time, sleep=clock.sleep)
+    cache = ResponseCache(tmp_path / "http", max_bytes=max_bytes)
+    return GitHubClient(token="test", base_url=github.url, scheduler=scheduler, cache=cache)
+
+
+def running_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def test_not_modified_is_served_from_disk(github, clock, tmp_path):
+    def repo(handler):
+        if handler.headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, None
+        return 200, {"ETag": '"v1"', "Content-Type": "application/json"}, {"full_name": "a/b", "stargazers_count": 7}
+
+    github.script["/repos/a/b"] = repo
+    client = make_client(github, clock, tmp_path)
+
+    first = client.get_repo("a/b")
+    second = client.get_repo("a/b")
+
+    assert first == second == {"full_name": "a/b", "stargazers_count": 7}
+    assert "If-None-Match" not in github.requests[0][1]
+    assert github.requests[1][1]["If-None-Match"] == '"v1"'
+
+    # a fresh client (next day's run) revalidates from the same directory
+    again = make_client(github, clock, tmp_path)
+    assert again.get_repo("a/b")["stargazers_count"] == 7
+    assert github.requests[2][1]["If-None-Match"] == '"v1"'
+
+
+def test_changed_resource_replaces_entry(github, clock, tmp_path):
+    github.script["/repos/a/b"] = [
+        (200, {"ETag": '"v1"'}, {"stargazers_count": 1}),
+        (200, {"ETag": '"v2"'}, {"stargazers_count": 2}),
+        (304, {}, None),
+    ]
+    client = make_client(github, clock, tmp_path)
+
+    assert client.get_repo("a/b")["stargazers_count"] == 1
+    assert client.get_repo("a/b")["stargazers_count"] == 2
+    assert client.get_repo("a/b")["stargazers_count"] == 2
+    assert github.requests[2][1]["If-None-Match"] == '"v2"'
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, github, clock):
+    github.script["/repos/a/one"] = [(200, {"ETag": '"1"'}, {"pad": "x" * 400})]
+    github.script["/repos/a/two"] = [(200, {"ETag": '"2"'}, {"pad": "y" * 400})]
+    github.script["/repos/a/three"] = [(200, {"ETag": '"3"'}, {"pad": "z" * 400})]
+    client = make_client(github, clock, tmp_path, max_bytes=1500)
+    cache = client.cache
+
+    client.get_repo("a/one")
+    client.get_repo("a/two")
+    client.get_repo("a/one")  # touch: "two" is now the oldest
+    client.get_repo("a/three")
+
+    assert cache.get(cache.key(client.url("repos/a/two"))) is None
+    assert cache.get(cache.key(client.url("repos/a/one"))) is not None
+    assert cache.get(cache.key(client.url("repos/a/three"))) is not None
+    assert sum(p.stat().st_size for p in (tmp_path / "http").glob("*.json")) <= 1500
+
+
+def test_async_client_shares_the_cache(github, clock, tmp_path):
+    def repo(handler):
+        if handler.headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, None
+        return 200, {"ETag": '"v1"', "Content-Type": "application/json"}, {"stargazers_count": 7}
+
+    github.script["/repos/a/b"] = repo
+    make_client(github, clock, tmp_path).get_repo("a/b")
+
+    on_loop = []
+
+    class WatchedCache(ResponseCache):
+        def get(self, key):
+            on_loop.append(running_loop())
+            return super().get(key)
+
+        def put(self, key, resp):
+            on_loop.append(running_loop())
+            return super().put(key, resp)
+
+    async def fetch_twice():
+        scheduler = RateLimitScheduler(clock=clock.time)
+        cache = WatchedCache(tmp_path / "http")
+        async with AsyncGitHubClient(base_url=github.url, scheduler=scheduler, cache=cache) as client:
+            return await client.gather(client.get_repo, ["a/b", "a/b"])
+
+    assert asyncio.run(fetch_twice()) == [{"stargazers_count": 7}] * 2
+    assert [headers.get("If-None-Match") for _, headers in github.requests] == [None, '"v1"', '"v1"']
+    # disk reads happen on worker threads, not on the event loop
+    assert on_loop == [False, False]
@@ -0,0 +1,84 @@
+import pytest
+import requests
+
+from src.github_api.client import GitHubClient
+from src.github_api.ratelimit import CORE, SEARCH, RateLimitScheduler
+
+
+def make_client(base_url, clock, **kwargs):
+    scheduler = RateLimitScheduler(clock=clock.time, sleep=clock.sleep, **kwargs)
+    return GitHubClient(token="test", base_url=base_url, scheduler=scheduler, max_workers=4)
+
+
+def test_retry_after_is_honoured(github, clock):
+    github.script["/repos/a/b"] = [
+        (429, {"Retry-After": "7"}, {"message": "slow down"}),
+        (200, {}, {"full_name": "a/b"}),
+    ]
+    client = make_client(github.url, clock)
+
+    assert client.get_repo("a/b") == {"full_name": "a/b"}
+    assert github.hits == ["/repos/a/b", "/repos/a/b"]
+    assert clock.sleeps == [pytest.approx(7)]
+
+
+def test_exhausted_budget_waits_for_reset(github, clock):
+    reset = clock.now + 120
+    exhausted = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(reset))}
+    github.script["/repos/a/b/commits"] = [
+        (403, exhausted, {"message": "API rate limit exceeded"}),
+        (200, {}, [{"sha": "1"}, {"sha": "2"}]),
+    ]
+    client = make_client(github.url, clock)
+
+    assert client.fetch_commit_count("a/b") == 2
+    assert len(github.hits) == 2
+    # waited out the window instead of recording a zero
+    assert clock.now >= reset
+
+
+def test_gives_up_after_max_retries(github, clock):
+    github.script["/repos/a/b"] = [(502, {}, {"message": "bad gateway"})]
+    client = make_client(github.url, clock, max_retries=3, backoff=0.5)
+
+    with pytest.raises(requests.HTTPError):
+        client.get_repo("a/b")
+    assert len(github.hits) == 4
+    assert clock.sleeps == [0.5, 1.0, 2.0]
+
+
+def test_empty_repository_counts_zero_commits(github, clock):
+    github.script["/repos/a/empty/commits"] = [(409, {}, {"message": "Git Repository is empty."})]
+    client = make_client(github.url, clock)
+
+    assert client.fetch_commit_count("a/empty") == 0
+
+
+def test_search_and_core_budgets_are_separate(github, clock):
+    reset = int(clock.now + 60)
+    github.script["/search/repositories"] = [
+        (200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset), "X-RateLimit-Resource": "search"}, {"items": []})
+    ]
+    github.script["/repos/a/b"] = [(200, {}, {"full_name": "a/b"})]
+    client = make_client(github.url, clock)
+
+    client.search_repositories("stars:>1")
+    client.get_repo("a/b")
+    assert clock.sleeps == []
+
+    client.scheduler.acquire(SEARCH)
+    assert clock.now == pytest.approx(reset)
+
+
+def test_low_budget_is_spread_over_the_window(clock):
+    scheduler = RateLimitScheduler(limits={CORE: (100, 100)}, clock=clock.time, sleep=clock.sleep)
+    scheduler.update(CORE, {"X-RateLimit-Remaining": "5", "X-RateLimit-Reset": str(clock.now + 50)})
+
+    for _ in range(5):
+        scheduler.acquire(CORE)
+
+    # 5 calls left for 50s: spaced out across the window rather than a burst,
+    # but still all sent before it resets
+    assert len(clock.sleeps) == 4
+    assert all(s >= 5 for s in clock.sleeps)
+    assert sum(clock.sleeps) <= 50
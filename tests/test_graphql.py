@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+
+from src.features import build_features
+from src.github_api import graphql
+from src.github_api.client import GitHubClient
+from src.github_api.ratelimit import RateLimitScheduler
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def load_fixture(name):
+    return json.loads((FIXTURES / name).read_text())
+
+
+def test_batch_query_aliases_every_repo():
+    query = graphql.build_batch_query(["psf/requests", "pallets/flask"])
+
+    assert 'r0: repository(owner: "psf", name: "requests")' in query
+    assert 'r1: repository(owner: "pallets", name: "flask")' in query
+    assert "history(since: $since) { totalCount }" in query
+
+
+def test_fetch_repos_from_recorded_response(github, clock):
+    sent = []
+
+    def respond(handler):
+        sent.append(json.loads(handler.body))
+        return 200, {"X-RateLimit-Resource": "graphql"}, load_fixture("graphql_batch_response.json")
+
+    github.script["/graphql"] = respond
+    client = GitHubClient(
+        token="test", base_url=github.url, scheduler=RateLimitScheduler(clock=clock.time, sleep=clock.sleep)
+    )
+
+    found = graphql.fetch_repos(client, ["psf/requests", "gone/away", "someone/empty-repo"])
+
+    assert len(sent) == 1
+    assert "since" in sent[0]["variables"]
+    assert sorted(found) == ["psf/requests", "someone/empty-repo"]
+    assert found["psf/requests"][1] == 142  # not capped at one page of 100
+    assert found["someone/empty-repo"][1] == 0
+
+
+def test_graphql_row_matches_rest_row(monkeypatch):
+    node = load_fixture("graphql_batch_response.json")["data"]["r0"]
+    item = graphql.to_rest_item(node)
+    commits = graphql.commit_count(node)
+
+    monkeypatch.setattr(build_features, "fetch_commit_count", lambda _: commits)
+    rest_row = build_features.build_feature_row(load_fixture("rest_search_item.json"))
+    graphql_row = build_features.build_feature_row(item, commits=commits)
+
+    assert graphql_row == rest_row
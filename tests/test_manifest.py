@@ -0,0 +1,53 @@
+from src.collector.manifest import Manifest
+from src.features import build_features
+from src.github_api.client import GitHubClient
+
+
+def test_fresh_done_failed_and_stale(tmp_path, clock):
+    manifest = Manifest(tmp_path / "manifest.sqlite", clock=clock.time)
+    manifest.done("page", "q|1", {"items": [1, 2]})
+    manifest.failed("page", "q|2", "boom")
+
+    assert manifest.fresh("page", "q|1", max_age=60) == {"items": [1, 2]}
+    assert manifest.fresh("page", "q|2", max_age=60) is None
+    assert manifest.fresh("page", "q|3", max_age=60) is None
+    assert manifest.summary("page") == {"done": 1, "failed": 1}
+
+    clock.sleep(61)
+    assert manifest.fresh("page", "q|1", max_age=60) is None
+    assert manifest.fresh("page", "q|1") == {"items": [1, 2]}
+
+    # survives a restart
+    reopened = Manifest(tmp_path / "manifest.sqlite", clock=clock.time)
+    assert reopened.fresh("page", "q|1") == {"items": [1, 2]}
+
+
+def test_rerun_only_retries_failed_repos(tmp_path, clock, monkeypatch):
+    items = [{"full_name": f"o/r{i}", "forks_count": 1} for i in range(5)]
+    calls = []
+    blips = {"o/r3"}
+
+    def fetch_commit_count(full_name):
+        calls.append(full_name)
+        if full_name in blips:
+            blips.discard(full_name)
+            raise RuntimeError("network blip")
+        return 7
+
+    monkeypatch.setattr(build_features, "fetch_commit_count", fetch_commit_count)
+    monkeypatch.setattr(build_features, "get_client", lambda _: GitHubClient(max_workers=1))
+    manifest = Manifest(tmp_path / "manifest.sqlite", clock=clock.time)
+
+    rows = build_features.build_feature_rows(items, manifest, max_age=3600)
+    assert [row["commits"] for row in rows] == [7, 7, 7, None, 7]
+
+    calls.clear()
+    rows = build_features.build_feature_rows(items, manifest, max_age=3600)
+    assert calls == ["o/r3"]
+    assert [row["commits"] for row in rows] == [7] * 5
+
+    # everything is refetched once it has gone stale
+    calls.clear()
+    clock.sleep(3601)
+    build_features.build_feature_rows(items, manifest, max_age=3600)
+    assert len(calls) == 5
@@ -0,0 +1,56 @@
+import importlib.util
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# the production server is deployed on its own, not as part of src/
+BATCHER = Path(__file__).parents[1] / "app/githubstar/production_server/batcher.py"
+spec = importlib.util.spec_from_file_location("batcher", BATCHER)
+batcher = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(batcher)
+
+
+def test_concurrent_requests_share_one_predict_call():
+    calls = []
+
+    def predict(X):
+        calls.append(len(X))
+        return X.sum(axis=1)
+
+    micro = batcher.MicroBatcher(predict, max_wait=0.2)
+    results = {}
+    start = threading.Barrier(4)
+
+    def task(i):
+        start.wait()
+        results[i] = micro.predict(np.full((i + 1, 3), float(i)))
+
+    threads = [threading.Thread(target=task, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == [1 + 2 + 3 + 4]
+    for i in range(4):
+        np.testing.assert_array_equal(results[i], np.full(i + 1, 3.0 * i))
+
+
+def test_errors_reach_every_caller():
+    def predict(X):
+        raise ValueError("bad model")
+
+    micro = batcher.MicroBatcher(predict, max_wait=0)
+    with pytest.raises(ValueError, match="bad model"):
+        micro.predict([[1.0, 2.0]])
+
+
+def test_closed_batcher_finishes_queue_and_scores_stragglers_alone():
+    micro = batcher.MicroBatcher(lambda X: X.sum(axis=1), max_wait=0)
+    np.testing.assert_array_equal(micro.predict([[1.0, 2.0]]), [3.0])
+    micro.close()
+    micro._thread.join(timeout=1)
+    assert not micro._thread.is_alive()
+    np.testing.assert_array_equal(micro.predict([[2.0, 2.0]]), [4.0])
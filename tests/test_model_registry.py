@@ -0,0 +1,54 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.svm import SVR
+
+from src.models.registry import ModelRegistry, RegistryModel
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 3))
+    return X, X[:, 0] - X[:, 1]
+
+
+def test_register_load_and_hot_reload(tmp_path, data, clock):
+    X, y = data
+    registry = ModelRegistry(tmp_path / "registry")
+    first = registry.register(
+        "stars", RandomForestRegressor(n_estimators=5, random_state=0).fit(X, y),
+        ["a", "b", "c"], metrics={"r2": 0.5}, promote=True,
+    )
+    source = RegistryModel(registry, "stars", check_interval=10, clock=clock.time)
+    old = source.get()
+    assert old.version == first and old.features == ["a", "b", "c"]
+    # small batches go through the memory-mapped compiled arrays
+    assert isinstance(old.compiled.threshold, np.memmap)
+    np.testing.assert_allclose(old.predict(X[:3]), old.model.predict(X[:3]))
+
+    second = registry.register("stars", SVR().fit(X, y), ["a", "b", "c"])
+    assert registry.versions("stars") == sorted([first, second])
+    assert registry.load("stars", second).compiled is None  # not compilable
+    registry.promote("stars", second)
+
+    # not rechecked until the interval has passed
+    assert source.get() is old
+    clock.now += 10
+    assert source.get().version == second
+    # a caller still holding the old version keeps scoring with it
+    assert old.predict(X[:1]).shape == (1,)
+
+    with pytest.raises(ValueError):
+        registry.promote("stars", "no-such-version")
+
+
+def test_falls_back_to_a_bare_pickle(tmp_path, data, clock):
+    X, y = data
+    path = tmp_path / "final_model.pkl"
+    joblib.dump(SVR().fit(X, y), path)
+    source = RegistryModel(ModelRegistry(tmp_path / "empty"), "stars", fallback_path=path, clock=clock.time)
+    model = source.get()
+    assert model.compiled is None and len(model.version) == 16
+    np.testing.assert_allclose(model.predict(X[:2]), joblib.load(path).predict(X[:2]))
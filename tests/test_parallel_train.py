@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from lightgbm import LGBMRegressor
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import GridSearchCV
+
+from xgboost import XGBRegressor
+
+from src.models.parallel_train import HalvingSearch, grow, thread_budget, train_models
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(120, 4)), columns=list("abcd"))
+    y = pd.Series(X["a"] * 2 - X["b"] + rng.normal(size=120) * 0.1)
+    return X[:90], X[90:], y[:90], y[90:]
+
+
+def test_budget_never_oversubscribes():
+    assert thread_budget(n_jobs=36, cores=8) == (8, 1)
+    assert thread_budget(n_jobs=2, cores=8) == (2, 4)
+    assert thread_budget(n_jobs=36, cores=8, workers=2) == (2, 4)
+
+
+def test_matches_grid_search(data):
+    X_train, X_test, y_train, y_test = data
+    models = {
+        "rf": RandomForestRegressor(n_estimators=10, random_state=0),
+        "linear": LinearRegression(),
+    }
+    grids = {"rf": {"max_depth": [2, 6], "min_samples_leaf": [1, 5]}}
+
+    results = train_models(models, grids, X_train, y_train, X_test, y_test, cv=3, cores=2)
+
+    grid = GridSearchCV(models["rf"], grids["rf"], cv=3, scoring="r2").fit(X_train, y_train)
+    assert results["rf"]["metrics"]["best_params"] == grid.best_params_
+    assert results["rf"]["metrics"]["cv_r2_log"] == pytest.approx(grid.best_score_)
+    # the refit model got the thread budget, not its default
+    assert results["rf"]["model"].n_jobs == 1
+    assert results["linear"]["metrics"]["test_r2_log"] > 0.9
+
+
+@pytest.mark.parametrize("estimator", [XGBRegressor(max_depth=2), LGBMRegressor(verbose=-1)])
+def test_grow_continues_boosting(data, estimator):
+    X, _, y, _ = data
+    init = grow(estimator, {"n_estimators": 10}, X, y)
+    grown = grow(estimator, {"n_estimators": 30}, X, y, init=init)
+    scratch = grow(estimator, {"n_estimators": 30}, X, y)
+    np.testing.assert_allclose(grown.predict(X), scratch.predict(X), rtol=1e-6)
+
+
+def test_halving_prunes_and_keeps_the_best_rung(data):
+    X_train, X_test, y_train, y_test = data
+    models = {"lgbm": LGBMRegressor(verbose=-1, min_child_samples=5)}
+    grid = {"lgbm": {"n_estimators": [90], "learning_rate": [0.01, 0.05, 0.1, 0.3], "max_depth": [2, 4]}}
+
+    search = HalvingSearch(models["lgbm"], grid["lgbm"], cv=3)
+    assert search.rungs == [10, 30, 90]
+    # the exhaustive search trains every n_estimators value of every candidate
+    baseline = {"n_estimators": [100, 300], "max_depth": [3, 6, -1], "learning_rate": [0.01, 0.1]}
+    assert HalvingSearch(models["lgbm"], baseline, cv=3).full_rounds == 6 * (100 + 300) * 3
+
+    results = train_models(models, grid, X_train, y_train, X_test, y_test, cores=2, search="halving")
+    best = results["lgbm"]["metrics"]["best_params"]
+    assert best["n_estimators"] in (10, 30, 90)
+    assert results["lgbm"]["model"].n_estimators == best["n_estimators"]
+    assert results["lgbm"]["metrics"]["cv_r2_log"] > 0.8
@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from src.collector.pipeline import BatchWriter, stream
+
+
+def test_streams_every_item_of_every_page():
+    pages = {p: [{"page": p, "i": i} for i in range(20)] for p in range(1, 6)}
+
+    rows = list(stream(pages, pages.get, lambda item: item["page"] * 100 + item["i"], workers=4, producers=2))
+
+    assert sorted(rows) == sorted(p * 100 + i for p in pages for i in range(20))
+
+
+def test_producers_stop_at_the_queue_bound():
+    fetched = []
+    lock = threading.Lock()
+
+    def fetch_page(page):
+        for i in range(50):
+            with lock:
+                fetched.append(i)
+            yield i
+
+    rows = stream(range(4), fetch_page, lambda item: item, workers=1, queue_size=5)
+    next(rows)
+    time.sleep(0.3)
+    # 200 items available, but only what fits in the two queues plus one in
+    # the hands of the producer, the worker and the caller has been pulled
+    assert len(fetched) <= 5 + 5 + 3
+    rows.close()
+
+
+def test_worker_errors_reach_the_caller():
+    def enrich(item):
+        if item == 7:
+            raise RuntimeError("boom")
+        return item
+
+    with pytest.raises(RuntimeError, match="boom"):
+        list(stream([range(10)], lambda page: page, enrich, workers=3))
+
+
+def test_batch_writer_flushes_fixed_size_batches(tmp_path):
+    path = tmp_path / "out.csv"
+    sizes = []
+
+    def transform(rows):
+        sizes.append(len(rows))
+        return pd.DataFrame(rows)
+
+    with BatchWriter(path, 4, transform) as writer:
+        for i in range(10):
+            writer.write({"x": i})
+        assert not path.exists()
+
+    assert sizes == [4, 4, 2]
+    assert pd.read_csv(path)["x"].tolist() == list(range(10))
@@ -0,0 +1,36 @@
+import numpy as np
+
+from src.FAST.prediction_cache import PredictionCache, row_keys
+
+
+def test_quantized_rows_hit_and_new_versions_miss(clock):
+    calls = []
+
+    def predict(X):
+        calls.append(len(X))
+        return X.sum(axis=1)
+
+    cache = PredictionCache(clock=clock.time)
+    X = np.array([[1.0, 2.0], [3.0, 4.0]])
+
+    np.testing.assert_array_equal(cache.predict(X, predict, "v1"), [3.0, 7.0])
+    # float noise below the quantum still hits; only the new row is predicted
+    noisy = np.array([[1.0 + 1e-9, 2.0], [5.0, 5.0], [3.0, 4.0]])
+    np.testing.assert_array_equal(cache.predict(noisy, predict, "v1"), [3.0, 10.0, 7.0])
+    assert calls == [2, 1]
+
+    cache.predict(X, predict, "v2")
+    assert calls == [2, 1, 2]
+    assert row_keys(X, "v1") != row_keys(X, "v2")
+
+
+def test_entries_expire_and_lru_is_bounded(clock):
+    cache = PredictionCache(max_entries=2, clock=clock.time)
+    cache.put_many(["a", "b"], [1, 2], ttl=60)
+    assert cache.get_many(["a", "b", "c"]) == [1, 2, None]
+
+    cache.put_many(["c"], [3])
+    assert cache.get_many(["a", "c"]) == [None, 3]
+
+    clock.sleep(61)
+    assert cache.get_many(["b", "c"]) == [None, 3]
@@ -0,0 +1,105 @@
+import asyncio
+import json
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from src.FAST import shay_app
+from src.features import feature_spec
+from src.github_api.async_client import AsyncGitHubClient
+from src.github_api.ratelimit import RateLimitScheduler
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class CountingModel:
+    version = "v1"
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, X):
+        self.calls.append(np.asarray(X).shape)
+        return np.full(len(X), np.log1p(99.0))
+
+
+def test_batch_endpoint_scores_everything_in_one_call(github, clock, monkeypatch):
+    item = json.loads((FIXTURES / "rest_search_item.json").read_text())
+    github.script["/repos/psf/requests"] = [(200, {}, item)]
+    github.script["/repos/psf/requests/commits"] = [(200, {}, [{}] * 7)]
+    github.script["/repos/gone/away"] = [(404, {}, {"message": "Not Found"})]
+    github.script["/repos/gone/away/commits"] = [(404, {}, {"message": "Not Found"})]
+    github.script["/repos/o/broken/commits"] = [(422, {}, {"message": "Unprocessable"})]
+    model = CountingModel()
+    monkeypatch.setattr(
+        shay_app,
+        "make_async_client",
+        lambda token_path=None: AsyncGitHubClient(
+            token="test", base_url=github.url, scheduler=RateLimitScheduler(clock=clock.time)
+        ),
+    )
+    loaded_on_loop = []
+
+    def get_model():
+        try:
+            asyncio.get_running_loop()
+            loaded_on_loop.append(True)
+        except RuntimeError:
+            pass
+        return model
+
+    monkeypatch.setattr(shay_app, "get_model", get_model)
+
+    features = dict.fromkeys(feature_spec.SERVING_FEATURES, 1.0)
+    with TestClient(shay_app.app) as api:
+        resp = api.post(
+            "/predict/batch",
+            json={
+                "repos": ["psf/requests", "gone/away"],
+                "items": [dict(item, full_name="o/raw", commits=3), dict(item, full_name="o/broken")],
+                "features": [features],
+            },
+        )
+        incomplete = api.post("/predict/batch", json={"features": [{"age_days": 1}]})
+        requests_before = len(github.requests)
+        again = api.post(
+            "/predict/batch", json={"repos": ["psf/requests"], "features": [features]}
+        )
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [r.get("repo") for r in body] == ["psf/requests", "gone/away", "o/raw", "o/broken", None]
+    assert body[0] == {"repo": "psf/requests", "actual_stars": 52874, "predicted_stars": 99}
+    assert "error" in body[1] and "predicted_stars" not in body[1]
+    # a failed commit count is an error, not a prediction from commits=0
+    assert "error" in body[3] and "predicted_stars" not in body[3]
+    assert body[4] == {"index": 0, "predicted_stars": 99}
+    assert model.calls == [(3, len(feature_spec.SERVING_FEATURES))]
+    # the raw item already had its commit count
+    assert github.hits.count("/repos/psf/requests/commits") == 1
+    assert incomplete.status_code == 422
+    # a (re)load of the model never blocks the event loop
+    assert not loaded_on_loop
+
+    # answered from the prediction cache: no GitHub calls, no model call
+    assert again.json() == [body[0], body[4]]
+    assert len(github.requests) == requests_before
+    assert len(model.calls) == 1
+
+
+def test_redis_backed_cache_calls_leave_the_event_loop():
+    def on_thread(shared):
+        app = SimpleNamespace(state=SimpleNamespace(prediction_cache=SimpleNamespace(shared=shared)))
+
+        async def main():
+            return await shay_app.cache_io(app, threading.get_ident), threading.get_ident()
+
+        return asyncio.run(main())
+
+    worker, loop = on_thread(shared=True)
+    assert worker != loop
+    worker, loop = on_thread(shared=False)
+    assert worker == loop
@@ -0,0 +1,107 @@
+import json
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src.collector.star_history import StarStore, star_velocity
+from src.collector.timestamp_store import DAY, TimestampStore, iso
+from src.github_api.cache import ResponseCache
+from src.github_api.client import GitHubClient
+from src.github_api.ratelimit import RateLimitScheduler
+
+
+def fake_stargazers(github, repo, stars):
+    """
+    Serve `stars` (login -> timestamp) oldest first, 100 per page, with a
+    Link header like GitHub's.
+    """
+
+    def respond(handler):
+        assert handler.headers["Accept"] == "application/vnd.github.star+json"
+        params = parse_qs(urlparse(handler.path).query)
+        page = int(params["page"][0])
+        listing = [
+            {"starred_at": iso(ts), "user": {"login": login}}
+            for login, ts in sorted(stars.items(), key=lambda s: s[1])
+        ]
+        last = max(1, -(-len(listing) // 100))
+        body = listing[(page - 1) * 100:page * 100]
+        etag = f'"{hash(json.dumps(body))}"'
+        if handler.headers.get("If-None-Match") == etag:
+            return 304, {"ETag": etag}, None
+        headers = {"ETag": etag}
+        if last > 1:
+            headers["Link"] = f'<{github.url}/repos/{repo}/stargazers?per_page=100&page={last}>; rel="last"'
+        return 200, headers, body
+
+    github.script[f"/repos/{repo}/stargazers"] = respond
+
+
+@pytest.fixture
+def setup(github, clock, tmp_path):
+    clock.now = datetime(2025, 6, 1, tzinfo=timezone.utc).timestamp()
+    client = GitHubClient(
+        base_url=github.url,
+        scheduler=RateLimitScheduler(clock=clock.time, sleep=clock.sleep),
+        max_workers=3,
+    )
+    return client, StarStore(tmp_path / "stars.sqlite", clock=clock.time)
+
+
+def test_reads_only_the_tail_pages(github, clock, setup):
+    client, store = setup
+    # 3000 stars over three years, one every ~9 hours; the last 90 days
+    # are on the last three pages
+    stars = {f"u{i}": clock.now - (3000 - i) * 9 * 3600 - 1 for i in range(3000)}
+    fake_stargazers(github, "o/r", stars)
+
+    df = star_velocity(client, store, ["o/r"])
+
+    pages = sorted(int(parse_qs(urlparse(path).query)["page"][0]) for path, _ in github.requests)
+    assert pages == [1, 28, 29, 30]
+    expected = {d: sum(ts >= clock.now - d * DAY for ts in stars.values()) / d for d in (7, 30, 90)}
+    assert df.iloc[0].to_dict() == {"full_name": "o/r", **{f"star_velocity_{d}d": v for d, v in expected.items()}}
+
+    # a day later only the new stars are added
+    clock.sleep(DAY)
+    stars.update({f"new{i}": clock.now - i * 3600 for i in range(1, 4)})
+    assert store.sync(client, "o/r") == 3
+
+
+def test_unreachable_tail_is_nan(github, setup):
+    client, store = setup
+    github.script["/repos/big/repo/stargazers"] = [
+        (200, {"Link": f'<{github.url}/repos/big/repo/stargazers?per_page=100&page=900>; rel="last"'}, [])
+    ]
+
+    df = star_velocity(client, store, ["big/repo"])
+    assert df["star_velocity_30d"].isna().all()
+
+
+def test_store_needs_fetch_and_key(tmp_path):
+    class NoKey(TimestampStore):
+        def fetch(self, client, repo, since):
+            return []
+
+    with pytest.raises(TypeError):
+        NoKey(tmp_path / "events.sqlite")
+
+
+def test_new_last_page_is_seen_through_the_cache(github, clock, tmp_path):
+    clock.now = datetime(2025, 6, 1, tzinfo=timezone.utc).timestamp()
+    client = GitHubClient(
+        base_url=github.url,
+        scheduler=RateLimitScheduler(clock=clock.time, sleep=clock.sleep),
+        max_workers=3,
+        cache=ResponseCache(tmp_path / "http"),
+    )
+    store = StarStore(tmp_path / "stars.sqlite", clock=clock.time)
+    stars = {f"u{i}": clock.now - (200 - i) * 3600 for i in range(200)}
+    fake_stargazers(github, "o/r", stars)
+    assert store.sync(client, "o/r") == 200
+
+    # page 1 is unchanged, but the stars land on a new page 3
+    clock.sleep(DAY)
+    stars.update({f"new{i}": clock.now - i for i in range(1, 6)})
+    assert store.sync(client, "o/r") == 5
@@ -0,0 +1,52 @@
+import os
+
+from src.github_api.client import GitHubClient, get_tokens, token_paths
+from src.github_api.ratelimit import CORE, RateLimitScheduler
+from src.github_api.token_pool import TokenPool
+
+
+def make_pool(clock, tokens=("a", "b")):
+    schedulers = [RateLimitScheduler(clock=clock.time, sleep=clock.sleep) for _ in tokens]
+    return TokenPool(tokens, schedulers)
+
+
+def test_picks_the_token_with_most_headroom(clock):
+    pool = make_pool(clock, ("a", "b", "c"))
+    reset = str(clock.now + 600)
+    pool.schedulers[0].update(CORE, {"X-RateLimit-Remaining": "900", "X-RateLimit-Reset": reset})
+    pool.schedulers[1].update(CORE, {"X-RateLimit-Remaining": "4000", "X-RateLimit-Reset": reset})
+    pool.schedulers[2].update(CORE, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset})
+
+    assert pool.reserve(CORE) == (1, 0.0)
+    # an exhausted pool waits for the first token to reset
+    pool.schedulers[0].block(CORE, 30)
+    pool.schedulers[1].block(CORE, 60)
+    index, delay = pool.reserve(CORE)
+    assert index == 0 and delay == 30
+
+
+def test_rate_limited_token_rotates_to_the_next(github, clock):
+    reset = str(int(clock.now + 3600))
+
+    def respond(handler):
+        if handler.headers["Authorization"] == "token a":
+            return 403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset}, {"message": "API rate limit exceeded"}
+        return 200, {"X-RateLimit-Remaining": "4999", "X-RateLimit-Reset": reset}, {"full_name": "o/r"}
+
+    github.script["/repos/o/r"] = respond
+    client = GitHubClient(base_url=github.url, tokens=make_pool(clock))
+
+    for _ in range(3):
+        assert client.get_repo("o/r") == {"full_name": "o/r"}
+    tokens = [headers["Authorization"] for _, headers in github.requests]
+    assert tokens == ["token a", "token b", "token b", "token b"]
+    # no waiting for token a's reset
+    assert clock.sleeps == []
+
+
+def test_pool_from_token_files(tmp_path, monkeypatch):
+    (tmp_path / "one.txt").write_text("t1\n")
+    (tmp_path / "two.txt").write_text("t2\nt3\n\nt1\n")
+    monkeypatch.setenv("GITHUB_TOKEN_PATHS", os.pathsep.join([str(tmp_path / "one.txt"), str(tmp_path / "two.txt")]))
+
+    assert get_tokens(token_paths()) == ["t1", "t2", "t3"]
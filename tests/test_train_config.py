@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.registry import ModelRegistry
+from src.models.train import load_config, main
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(80, 3)), columns=list("abc"))
+    df["full_name"] = [f"owner/repo{i}" for i in range(80)]
+    df["log1p_stars"] = df["a"] * 2 + rng.normal(size=80) * 0.1
+    df.to_parquet(tmp_path / "features.parquet")
+    config = {
+        "data": str(tmp_path / "features.parquet"),
+        "models": {
+            "linear": {},
+            "ridge": {"grid": {"alpha": [0.1, 10.0]}},
+        },
+        "parallel": {"cores": 1},
+        "registry": {"root": str(tmp_path / "registry"), "name": "test-{model}", "promote": True},
+    }
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(config))
+    return path
+
+
+def test_overrides_and_unknown_keys(config_path):
+    config = load_config(config_path, ["search.cv=5", "search.method=halving"])
+    assert config["search"] == {"method": "halving", "cv": 5, "factor": 3}
+    assert config["registry"]["name"] == "test-{model}"
+    with pytest.raises(ValueError):
+        load_config(config_path, ["epochs=3"])
+
+
+def test_run_writes_a_manifest(config_path, tmp_path):
+    manifest = main(["--config", str(config_path), "--runs-dir", str(tmp_path / "runs")])
+
+    assert manifest["data"]["features"] == ["a", "b", "c"]
+    assert list(manifest["stages"]) == ["load", "split", "train", "save", "total"]
+    assert set(manifest["models"]) == {"linear", "ridge"}
+    run_dir = tmp_path / "runs" / manifest["run_id"]
+    assert json.loads((run_dir / "manifest.json").read_text())["best"] == manifest["best"]
+    assert (run_dir / "config.json").exists()
+
+    registry = ModelRegistry(tmp_path / "registry")
+    best = manifest["models"][manifest["best"]]["registry"]
+    assert registry.current_version(f"test-{manifest['best']}") == best["version"]